@@ -0,0 +1,197 @@
+import threading
+import time
+
+import httpx
+import ollama
+
+from ollama_client import OllamaClient
+
+# Weight of the newest sample in each backend's moving average latency
+LATENCY_SMOOTHING = 0.3
+
+
+def is_backend_failure(error):
+    """Whether an error means the backend itself is down or overloaded, not that the request was bad"""
+    if isinstance(error, (ConnectionError, httpx.TransportError)):
+        return True
+    return isinstance(error, ollama.ResponseError) and error.status_code >= 500
+
+
+class Backend:
+    """One Ollama host with its load and health"""
+
+    def __init__(self, host, client, probe_client):
+        self.host = host
+        self.client = client
+        self.probe_client = probe_client
+        self.healthy = True
+        self.in_flight = 0
+        self.latency = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.last_error = None
+
+
+class BackendPool:
+    """
+    Spreads Ollama calls over several hosts.
+
+    Each call goes to the healthy backend with the fewest requests in flight,
+    preferring the lower recent latency (time to the first response chunk) on a
+    tie. A backend that fails is ejected at once and the call is retried on the
+    next one, as long as nothing was returned to the caller yet. A background
+    thread probes every backend and re-admits those that answer again. The pool
+    has the same chat/embed interface as OllamaClient.
+    """
+
+    def __init__(self, hosts, connect_timeout=5.0, read_timeout=120.0, max_connections=16,
+                 probe_interval=5.0, probe_timeout=2.0):
+        self.backends = [
+            Backend(host,
+                    OllamaClient(host, connect_timeout, read_timeout, max_connections),
+                    OllamaClient(host, probe_timeout, probe_timeout, 1))
+            for host in hosts
+        ]
+        self.probe_interval = probe_interval
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._prober = None
+
+    def start(self):
+        """Start probing backends in the background"""
+        if self._prober is None and self.probe_interval > 0:
+            self._prober = threading.Thread(target=self._probe_loop, name="shell-assist-backend-probe", daemon=True)
+            self._prober.start()
+        return self
+
+    def _probe_loop(self):
+        while not self._stop.wait(self.probe_interval):
+            self.probe()
+
+    def probe(self):
+        """Check every backend once, ejecting those that fail and re-admitting those that answer"""
+        for backend in self.backends:
+            try:
+                backend.probe_client.list_models()
+                healthy, error = True, None
+            except Exception as e:
+                healthy, error = False, e
+            with self._lock:
+                if healthy and not backend.healthy:
+                    print(f"Ollama backend {backend.host} is back")
+                elif not healthy and backend.healthy:
+                    print(f"Ollama backend {backend.host} failed its health check: {error}")
+                backend.healthy = healthy
+                if error is not None:
+                    backend.last_error = str(error)
+
+    def _acquire(self, tried):
+        """Pick and reserve the least-loaded healthy backend not tried yet"""
+        with self._lock:
+            candidates = [b for b in self.backends if b not in tried]
+            healthy = [b for b in candidates if b.healthy]
+            # With every backend ejected, still try one rather than failing without a request
+            pool = healthy or candidates
+            if not pool:
+                return None
+            backend = min(pool, key=lambda b: (b.in_flight, b.latency))
+            backend.in_flight += 1
+            backend.requests += 1
+            return backend
+
+    def _release(self, backend, latency=None, error=None):
+        with self._lock:
+            backend.in_flight -= 1
+            if latency is not None:
+                backend.latency += LATENCY_SMOOTHING * (latency - backend.latency) if backend.latency else latency
+            if error is not None:
+                backend.failures += 1
+                backend.last_error = str(error)
+                if backend.healthy:
+                    print(f"Ejecting Ollama backend {backend.host}: {error}")
+                backend.healthy = False
+
+    def _call(self, method, *args, **kwargs):
+        tried, tried_error = [], None
+        while True:
+            backend = self._acquire(tried)
+            if backend is None:
+                raise tried_error or ConnectionError("No Ollama backends configured")
+            tried.append(backend)
+            started = time.perf_counter()
+            try:
+                result = getattr(backend.client, method)(*args, **kwargs)
+            except Exception as e:
+                if not is_backend_failure(e):
+                    self._release(backend)
+                    raise
+                self._release(backend, error=e)
+                tried_error = e
+                continue
+            self._release(backend, time.perf_counter() - started)
+            return result
+
+    def _stream(self, *args, **kwargs):
+        tried, tried_error = [], None
+        while True:
+            backend = self._acquire(tried)
+            if backend is None:
+                raise tried_error or ConnectionError("No Ollama backends configured")
+            tried.append(backend)
+            started = time.perf_counter()
+            stream = backend.client.chat(*args, stream=True, **kwargs)
+            latency = error = None
+            # The backend counts as in flight until the stream is closed
+            try:
+                try:
+                    first = next(stream)
+                except StopIteration:
+                    return
+                except Exception as e:
+                    if not is_backend_failure(e):
+                        raise
+                    # Nothing was returned yet, so the next backend can take over
+                    error = tried_error = e
+                    continue
+                latency = time.perf_counter() - started
+                yield first
+                try:
+                    yield from stream
+                except Exception as e:
+                    if is_backend_failure(e):
+                        error = e
+                    raise
+                return
+            finally:
+                stream.close()
+                self._release(backend, latency, error)
+
+    def chat(self, model, messages, stream=False, **kwargs):
+        """Send a chat request to the least-loaded healthy backend"""
+        if stream:
+            return self._stream(model, messages, **kwargs)
+        return self._call('chat', model, messages, **kwargs)
+
+    def embed(self, model, input, **kwargs):
+        return self._call('embed', model, input, **kwargs)
+
+    def stats(self):
+        """Return health, load and latency per backend"""
+        with self._lock:
+            return {
+                backend.host: {
+                    'healthy': backend.healthy,
+                    'in_flight': backend.in_flight,
+                    'requests': backend.requests,
+                    'failures': backend.failures,
+                    'latency_ms': backend.latency * 1000,
+                    'last_error': backend.last_error,
+                }
+                for backend in self.backends
+            }
+
+    def close(self):
+        self._stop.set()
+        for backend in self.backends:
+            backend.client.close()
+            backend.probe_client.close()
@@ -0,0 +1,58 @@
+from concurrent.futures import wait, FIRST_COMPLETED
+
+import settings
+
+
+def read_batch_file(path):
+    """Read one request per line, skipping blank lines and # comments ('-' reads stdin)"""
+    if path == '-':
+        import sys
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path, 'r') as f:
+            lines = f.read().splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.strip().startswith('#')]
+
+
+def interpret_batch(requests, interpret_func, distro_info, user_info, pool, concurrency=None):
+    """
+    Interpret many requests on a worker pool with bounded parallelism.
+
+    At most `concurrency` requests are in flight at once, and never more than half
+    of the interpret workers, so a large batch cannot monopolize the shared pool
+    (unless it has a single worker). Yields (index, request, command_output, error)
+    tuples in input order, each as soon as it and every request before it have
+    finished.
+    """
+    concurrency = min(concurrency or settings.BATCH_CONCURRENCY, settings.INTERPRET_WORKERS // 2)
+    concurrency = max(1, concurrency)
+    pending = {}
+    finished = {}
+    next_to_submit = 0
+    next_to_yield = 0
+
+    def submit_more():
+        nonlocal next_to_submit
+        while next_to_submit < len(requests) and len(pending) < concurrency:
+            future = pool.submit(interpret_func, requests[next_to_submit], distro_info, user_info)
+            pending[future] = next_to_submit
+            next_to_submit += 1
+
+    try:
+        submit_more()
+        while next_to_yield < len(requests):
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                error = future.exception()
+                finished[index] = (None, error) if error else (future.result(), None)
+            submit_more()
+
+            while next_to_yield in finished:
+                command_output, error = finished.pop(next_to_yield)
+                yield next_to_yield, requests[next_to_yield], command_output, error
+                next_to_yield += 1
+    finally:
+        # Stop queued work if the consumer goes away early
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmark system prompt construction and the effect of keep_alive and warm-up.
+
+Prompt construction is measured locally. With --ollama, the script also compares
+the first and second request after a start (or an idle gap) as the baseline sent
+them, without keep_alive or warm-up, against the current code. --mock runs the
+same comparison against mock_ollama.py, simulating model load and prompt
+evaluation time, when no Ollama server is available.
+
+Usage:
+  python bench_prompt.py                 # construction only
+  python bench_prompt.py --ollama 5      # also run 5 rounds against the Ollama server
+  python bench_prompt.py --mock 5 --load-time 1.0 --prompt-eval-rate 400
+"""
+
+import argparse
+import sys
+import os
+import time
+import platform
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import settings
+from ollama_client import get_ollama_client
+from ollama_interface import (_build_system_prompt, get_system_prompt, warm_up,
+                              CommandOutput, COMMAND_OUTPUT_SCHEMA)
+from distro_detector import get_distro_info
+from user_info import get_user_info
+
+def rebuild_request(system, distro_info, user_info):
+    """What every request used to do: format the prompt and generate the schema"""
+    return _build_system_prompt(system, distro_info, user_info), CommandOutput.model_json_schema()
+
+def prebuilt_request(system, distro_info, user_info):
+    """What every request does now: look up the prebuilt prompt and schema"""
+    return get_system_prompt(system, distro_info, user_info), COMMAND_OUTPUT_SCHEMA
+
+def bench_construction(distro_info, user_info, iterations=2000):
+    """Compare rebuilding the prompt and schema on every call with the prebuilt ones"""
+    system = platform.system()
+    results = {}
+    for name, build in (('rebuilt', rebuild_request), ('prebuilt', prebuilt_request)):
+        build(system, distro_info, user_info)
+        started = time.perf_counter()
+        for _ in range(iterations):
+            build(system, distro_info, user_info)
+        results[name] = (time.perf_counter() - started) / iterations * 1e6
+    return results
+
+def _ask(client, system_prompt, keep_alive):
+    """Send one interpretation request; keep_alive None sends it as the baseline did"""
+    kwargs = {} if keep_alive is None else {'keep_alive': keep_alive}
+    started = time.perf_counter()
+    response = client.chat(settings.OLLAMA_MODEL,
+                           [{'role': 'system', 'content': system_prompt},
+                            {'role': 'user', 'content': 'show disk usage'}],
+                           format=COMMAND_OUTPUT_SCHEMA, **kwargs)
+    return {
+        'total_ms': (time.perf_counter() - started) * 1000,
+        'load_ms': (response['load_duration'] or 0) / 1e6,
+        'prompt_eval_ms': (response['prompt_eval_duration'] or 0) / 1e6,
+        'prompt_tokens': response['prompt_eval_count'] or 0,
+    }
+
+def bench_keep_warm(distro_info, user_info, rounds):
+    """
+    Compare the first two requests after a start, before and after keep_alive and warm-up.
+
+    The model is unloaded before every round: that is its state at startup, and after
+    an idle gap longer than Ollama's default keep_alive of 5 minutes. The baseline
+    then sends its requests without keep_alive. The current code has warmed the model
+    with the system prompt first, as main.py does in the background at startup, and
+    passes SHELL_ASSIST_KEEP_ALIVE (so a gap shorter than that finds it still loaded).
+    """
+    client = get_ollama_client()
+    system_prompt = get_system_prompt(platform.system(), distro_info, user_info)
+    results = {}
+    for mode in ('baseline', 'keep_alive + warm-up'):
+        samples = {'first': [], 'second': []}
+        for _ in range(rounds):
+            client.chat(settings.OLLAMA_MODEL, [], keep_alive=0)
+            keep_alive = None
+            if mode != 'baseline':
+                keep_alive = settings.OLLAMA_KEEP_ALIVE
+                warm_up(distro_info, user_info)
+            samples['first'].append(_ask(client, system_prompt, keep_alive))
+            samples['second'].append(_ask(client, system_prompt, keep_alive))
+        results[mode] = {request: {key: sum(sample[key] for sample in values) / len(values)
+                                   for key in values[0]}
+                         for request, values in samples.items()}
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark prompt construction, keep_alive and warm-up")
+    parser.add_argument('--ollama', type=int, metavar='ROUNDS', help="rounds against the Ollama server")
+    parser.add_argument('--mock', type=int, metavar='ROUNDS', help="rounds against a simulating mock server")
+    parser.add_argument('--load-time', type=float, default=1.0, help="mock seconds to load the model")
+    parser.add_argument('--prompt-eval-rate', type=float, default=400.0,
+                        help="mock prompt tokens evaluated per second")
+    args = parser.parse_args()
+
+    distro_info = get_distro_info()
+    user_info = get_user_info()
+    # Interpretations and the warm-up must use the same (full mode) prompt
+    settings.FAST_MODE = False
+    settings.ROUTER_ENABLED = False
+
+    print("🚀 Prompt Construction (µs per request)")
+    print("=" * 50)
+    for name, micros in bench_construction(distro_info, user_info).items():
+        print(f"{name:>15}: {micros:10.2f} µs")
+
+    rounds = args.ollama or args.mock
+    if not rounds:
+        return
+    server = None
+    if args.mock:
+        from mock_ollama import MockOllamaServer
+        server = MockOllamaServer(load_time=args.load_time, prompt_eval_rate=args.prompt_eval_rate).start()
+        settings.OLLAMA_HOST = server.url
+        settings.OLLAMA_HOSTS = [server.url]
+    try:
+        results = bench_keep_warm(distro_info, user_info, rounds)
+    finally:
+        if server is not None:
+            server.stop()
+
+    print()
+    source = (f"mock (load {args.load_time}s, {args.prompt_eval_rate:g} prompt tokens/s)"
+              if args.mock else settings.OLLAMA_HOST)
+    print(f"🚀 First requests after a start with {settings.OLLAMA_MODEL} on {source} (ms, mean of {rounds})")
+    print("=" * 86)
+    print(f"{'mode':<22}{'request':<9}{'total':>12}{'load':>12}{'prompt eval':>14}{'prompt tokens':>16}")
+    for mode, requests in results.items():
+        for request, stats in requests.items():
+            print(f"{mode:<22}{request:<9}{stats['total_ms']:>12.1f}{stats['load_ms']:>12.1f}"
+                  f"{stats['prompt_eval_ms']:>14.1f}{stats['prompt_tokens']:>16.0f}")
+
+if __name__ == "__main__":
+    main()
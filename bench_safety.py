@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for the command safety engine.
+
+Reports the per-check latency of is_safe_command in microseconds, both for the
+first evaluation of a command (tokenizing and matching every segment) and for
+repeated checks of the same command (memoized verdict).
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from command_executor import is_safe_command
+from safety_engine import clear_cache
+
+COMMANDS = [
+    "ls -la",
+    "df -h",
+    "du -sh ~/* | sort -h | tail -n 5",
+    "find . -name '*.py' | xargs grep -n 'TODO' && echo done",
+    "tar -czf ~/backup.tar.gz ~/Documents",
+    "ps aux | grep python | awk '{print $2}'",
+    "rm -rf /",
+    "echo hello > /etc/motd",
+]
+
+def bench(iterations=2000):
+    """Return (cold, warm) mean microseconds per check"""
+    cold = 0.0
+    for _ in range(iterations):
+        clear_cache()
+        started = time.perf_counter()
+        for command in COMMANDS:
+            is_safe_command(command)
+        cold += time.perf_counter() - started
+
+    warm = 0.0
+    for _ in range(iterations):
+        started = time.perf_counter()
+        for command in COMMANDS:
+            is_safe_command(command)
+        warm += time.perf_counter() - started
+
+    checks = iterations * len(COMMANDS)
+    return cold / checks * 1e6, warm / checks * 1e6
+
+if __name__ == "__main__":
+    cold, warm = bench()
+    print("🚀 Safety Engine Microbenchmark")
+    print("=" * 50)
+    print(f"Commands: {len(COMMANDS)}")
+    print(f"First check (parse + rules): {cold:8.2f} µs per check")
+    print(f"Repeated check (memoized):   {warm:8.2f} µs per check")
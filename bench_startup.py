@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark for main.py.
+
+Measures how long `python main.py --help` takes to finish and how long
+`python main.py --cli` takes to show its first prompt.
+
+Usage:
+  python bench_startup.py [runs]
+"""
+
+import sys
+import os
+import subprocess
+import statistics
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MAIN = os.path.join(HERE, 'main.py')
+CLI_PROMPT = b"What would you like me to help you with?"
+
+def time_help():
+    """Seconds until `main.py --help` exits"""
+    started = time.perf_counter()
+    subprocess.run([sys.executable, MAIN, '--help'], stdout=subprocess.DEVNULL,
+                   stderr=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - started
+
+def time_cli_prompt(timeout=30):
+    """Seconds until `main.py --cli` prints its first prompt"""
+    env = dict(os.environ, TERM='dumb', SHELL_ASSIST_WARMUP='0')
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, MAIN, '--cli'], stdin=subprocess.PIPE,
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, env=env)
+    output = b''
+    try:
+        while CLI_PROMPT not in output:
+            chunk = os.read(process.stdout.fileno(), 4096)
+            if not chunk:
+                raise RuntimeError("CLI exited before showing a prompt")
+            output += chunk
+            if time.perf_counter() - started > timeout:
+                raise RuntimeError("Timed out waiting for the CLI prompt")
+        return time.perf_counter() - started
+    finally:
+        process.kill()
+        process.wait()
+
+def summarize(samples):
+    return {
+        'median_ms': round(statistics.median(samples) * 1000, 1),
+        'min_ms': round(min(samples) * 1000, 1),
+        'max_ms': round(max(samples) * 1000, 1),
+    }
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print("🚀 Startup Benchmark")
+    print("=" * 50)
+    for name, measure in (('--help', time_help), ('--cli time-to-prompt', time_cli_prompt)):
+        stats = summarize([measure() for _ in range(runs)])
+        print(f"{name:>22}: median {stats['median_ms']:7.1f} ms "
+              f"(min {stats['min_ms']:.1f}, max {stats['max_ms']:.1f})")
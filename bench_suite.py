@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite for shell-assist's own overhead.
+
+Runs every benchmark against an in-process mock Ollama server (see mock_ollama.py),
+so no model is needed and results are repeatable. Reports p50/p95/p99 latency in
+milliseconds for prompt construction, parsing/validation, is_safe_command,
+execute_command, Ollama client connection reuse and the /interpret and /execute
+routes, as JSON.
+
+Usage:
+  python bench_suite.py                          # print a table and the JSON results
+  python bench_suite.py --output run.json        # save the results
+  python bench_suite.py --compare baseline.json  # show the change against an earlier run
+  python bench_suite.py --latency 0.05 --token-rate 500 --only route
+"""
+
+import argparse
+import contextlib
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from mock_ollama import MockOllamaServer, CANNED_RESPONSE
+
+SAFETY_COMMANDS = [
+    "ls -la",
+    "df -h",
+    "du -sh ~/* | sort -h | tail -n 5",
+    "find . -name '*.py' | xargs grep -n 'TODO' && echo done",
+    "tar -czf ~/backup.tar.gz ~/Documents",
+    "rm -rf /",
+]
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    index = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+def summarize(durations):
+    """Summarize durations (seconds) as milliseconds"""
+    values = sorted(d * 1000 for d in durations)
+    return {
+        'iterations': len(values),
+        'unit': 'ms',
+        'p50': percentile(values, 50),
+        'p95': percentile(values, 95),
+        'p99': percentile(values, 99),
+        'mean': sum(values) / len(values),
+        'min': values[0],
+        'max': values[-1],
+    }
+
+def measure(func, iterations, warmup=3):
+    """Call func repeatedly and return the per-call durations in seconds"""
+    for i in range(warmup):
+        func(i)
+    durations = []
+    for i in range(iterations):
+        started = time.perf_counter()
+        func(i)
+        durations.append(time.perf_counter() - started)
+    return durations
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip()
+    except (OSError, subprocess.TimeoutExpired):
+        return ''
+
+def build_benchmarks(scale):
+    """Return [(name, func(i), iterations)]; imports happen after OLLAMA_HOST is set"""
+    from command_executor import execute_command, is_safe_command
+    from json_extractor import StreamingJSONParser
+    from ollama_client import OllamaClient, get_ollama_client
+    from ollama_interface import (CommandOutput, _build_system_prompt, _parse_content,
+                                  get_system_prompt, interpret_command)
+    from safety_engine import clear_cache
+    from system_context import get_system_context
+    from web_app import app
+    import settings
+
+    system = platform.system()
+    distro_info, user_info = get_system_context()
+    client = app.test_client()
+
+    response_text = json.dumps(CANNED_RESPONSE)
+    chunks = [response_text[i:i + 4] for i in range(0, len(response_text), 4)]
+    wrapped_text = f"Here is the command:\n```json\n{json.dumps(CANNED_RESPONSE, indent=2)}\n```"
+
+    def parse_stream(i):
+        parser = StreamingJSONParser()
+        for chunk in chunks:
+            parser.feed(chunk)
+        CommandOutput(**parser.root)
+
+    def parse_fallback(i):
+        CommandOutput(**_parse_content(wrapped_text)[0])
+
+    def safety_cold(i):
+        clear_cache()
+        is_safe_command(SAFETY_COMMANDS[i % len(SAFETY_COMMANDS)])
+
+    def safety_warm(i):
+        is_safe_command(SAFETY_COMMANDS[i % len(SAFETY_COMMANDS)])
+
+    messages = [{'role': 'user', 'content': 'list my files'}]
+
+    def client_reuse(i):
+        get_ollama_client().chat(settings.OLLAMA_MODEL, messages)
+
+    def client_new(i):
+        # What a client per request costs: a new HTTP client and a new connection each time
+        client = OllamaClient(settings.OLLAMA_HOST)
+        client.chat(settings.OLLAMA_MODEL, messages)
+        client.close()
+
+    def route_interpret(i):
+        response = client.post('/interpret', json={'command': 'list my files'})
+        assert response.status_code == 200, response.data
+
+    def route_interpret_stream(i):
+        response = client.post('/interpret/stream', json={'command': 'list my files'})
+        assert b'event: done' in response.get_data()
+
+    def route_execute(i):
+        response = client.post('/execute', json={'command': 'echo hello'})
+        assert response.status_code == 200
+
+    return [
+        ('prompt.build', lambda i: _build_system_prompt(system, distro_info, user_info), 2000 * scale),
+        ('prompt.lookup', lambda i: get_system_prompt(system, distro_info, user_info), 2000 * scale),
+        ('parse.stream_validate', parse_stream, 1000 * scale),
+        ('parse.fallback_validate', parse_fallback, 1000 * scale),
+        ('safety.cold', safety_cold, 2000 * scale),
+        ('safety.warm', safety_warm, 2000 * scale),
+        ('execute.echo', lambda i: execute_command('echo hello', user_info), 50 * scale),
+        ('client.reuse', client_reuse, 300 * scale),
+        ('client.new', client_new, 300 * scale),
+        ('interpret.mock', lambda i: interpret_command('list my files', distro_info, user_info), 100 * scale),
+        ('route.interpret', route_interpret, 100 * scale),
+        ('route.interpret_stream', route_interpret_stream, 100 * scale),
+        ('route.execute', route_execute, 50 * scale),
+    ]
+
+def print_table(results, baseline=None, out=sys.stderr):
+    header = f"{'benchmark':<26}{'p50':>10}{'p95':>10}{'p99':>10}  (ms)"
+    if baseline:
+        header += f"{'p50 vs base':>14}{'p95 vs base':>14}"
+    print(header, file=out)
+    print("=" * len(header), file=out)
+    for name, stats in results.items():
+        line = f"{name:<26}{stats['p50']:>10.3f}{stats['p95']:>10.3f}{stats['p99']:>10.3f}      "
+        base = (baseline or {}).get(name)
+        if base:
+            for key in ('p50', 'p95'):
+                change = (stats[key] - base[key]) / base[key] * 100 if base[key] else 0.0
+                line += f"{change:>+13.1f}%"
+        print(line, file=out)
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark suite using a mock Ollama server")
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help="mock seconds before the first token (default 0: measure our overhead only)")
+    parser.add_argument('--token-rate', type=float, default=0.0,
+                        help="mock output tokens per second (default 0: unlimited)")
+    parser.add_argument('--scale', type=float, default=1.0, help="multiply every iteration count")
+    parser.add_argument('--only', help="run only benchmarks whose name contains this text")
+    parser.add_argument('--output', help="write the JSON results to this file instead of stdout")
+    parser.add_argument('--compare', help="earlier JSON results to compare against")
+    args = parser.parse_args()
+
+    server = MockOllamaServer(latency=args.latency, token_rate=args.token_rate).start()
+    # Point the ollama client at the mock and keep caches and shortcuts out of the measurements
+    os.environ['OLLAMA_HOST'] = server.url
+    os.environ['SHELL_ASSIST_CACHE'] = '0'
+    os.environ['SHELL_ASSIST_SEMANTIC_CACHE'] = '0'
+    os.environ['SHELL_ASSIST_INTENTS'] = '0'
+    os.environ['SHELL_ASSIST_WARMUP'] = '0'
+
+    results = {}
+    try:
+        # The routes log with print(); keep stdout for the JSON report
+        with contextlib.redirect_stdout(sys.stderr):
+            for name, func, iterations in build_benchmarks(args.scale):
+                if args.only and args.only not in name:
+                    continue
+                print(f"Running {name}...")
+                results[name] = summarize(measure(func, max(1, int(iterations))))
+    finally:
+        server.stop()
+        from worker_pools import shutdown_pools
+        shutdown_pools(wait=False)
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': f"{platform.system()} {platform.release()} {platform.machine()}",
+            'mock_latency': args.latency,
+            'mock_token_rate': args.token_rate,
+            'scale': args.scale,
+        },
+        'results': results,
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f).get('results')
+    print(file=sys.stderr)
+    print_table(results, baseline)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
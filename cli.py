@@ -15,6 +15,16 @@ from rich.align import Align
 from rich import box
 from colorama import init, Fore, Back, Style
 import platform
+import metrics
+import settings
+from interpret_cache import get_cache_stats
+from semantic_cache import get_semantic_cache_stats
+from intent_matcher import get_intent_stats
+from singleflight import get_single_flight_stats
+from model_router import get_router_stats
+from ollama_client import get_backend_stats
+from command_executor import describe_missing_programs
+from history_store import get_history_store
 
 # Initialize colorama for cross-platform color support
 init(autoreset=True)
@@ -24,7 +34,9 @@ class EnhancedCLI:
         self.console = Console()
         self.distro_info = distro_info
         self.user_info = user_info
-        self.command_history = []
+        self.history = get_history_store()
+        self.fast_mode = settings.FAST_MODE
+        self.last_command = None
         
     def print_banner(self):
         """Display a colorful banner"""
@@ -98,9 +110,18 @@ class EnhancedCLI:
 🎯 Available Commands:
 • help - Show this help message
 • history - Show command history
+• history <text> - Search the history for a request or command
+• !<#> - Run a command from the history again
 • clear - Clear the screen
 • exit/quit - Exit the application
 • info - Show system information
+• info --perf - Show where time was spent (model, parsing, safety check, execution)
+• cache - Show interpretation cache statistics
+• intents - Show which common requests were answered without the model
+• router - Show latency and escalation rate per model
+• backends - Show health and load of each Ollama host
+• fast - Toggle fast mode (command and risk only, details on request)
+• explain - Show detailed help for the last interpreted command
 
 💡 Tips:
 • Use natural language to describe what you want to do
@@ -109,22 +130,133 @@ class EnhancedCLI:
         """
         self.console.print(Panel(help_text, title="📚 Help", style="bold yellow"))
     
-    def print_command_history(self):
-        """Display command history"""
-        if not self.command_history:
-            self.console.print("📝 No commands in history yet.", style="dim")
+    def print_command_history(self, query: str = ""):
+        """Display recent command history, or the entries fuzzily matching a query"""
+        entries = self.history.search(query) if query else self.history.recent(10)
+        if not entries:
+            message = f"📝 Nothing in history matches '{query}'." if query else "📝 No commands in history yet."
+            self.console.print(message, style="dim")
             return
         
-        table = Table(title="📝 Command History", show_header=True, header_style="bold magenta")
+        title = f"📝 History matching '{query}'" if query else "📝 Command History"
+        table = Table(title=title, show_header=True, header_style="bold magenta")
         table.add_column("#", style="cyan", no_wrap=True)
+        table.add_column("Request", style="dim")
         table.add_column("Command", style="green")
         table.add_column("Status", style="yellow")
+        table.add_column("When", style="dim", no_wrap=True)
         
-        for i, (cmd, status) in enumerate(self.command_history[-10:], 1):  # Show last 10
+        for entry in entries:
+            status = entry['status']
             status_icon = "✅" if status == "success" else "❌" if status == "error" else "⚠️"
-            table.add_row(str(i), cmd[:50] + "..." if len(cmd) > 50 else cmd, status_icon)
+            if entry.get('returncode') not in (None, 0):
+                status_icon += f" {entry['returncode']}"
+            cmd = entry['command']
+            request = entry.get('request') or ''
+            table.add_row(str(entry['id']), request[:40] + "..." if len(request) > 40 else request,
+                          cmd[:50] + "..." if len(cmd) > 50 else cmd, status_icon,
+                          time.strftime('%Y-%m-%d %H:%M', time.localtime(entry['time'])))
         
         self.console.print(table)
+        self.console.print("💡 Type '!<#>' to run one of these commands again.", style="dim")
+    
+    def print_cache_stats(self):
+        """Display interpretation cache statistics"""
+        stats = get_cache_stats()
+        if not stats.get('enabled'):
+            self.console.print("🗄️  Interpretation cache is disabled.", style="dim")
+            return
+
+        table = Table(title="🗄️  Interpretation Cache", show_header=True, header_style="bold magenta")
+        table.add_column("Property", style="cyan", no_wrap=True)
+        table.add_column("Value", style="green")
+        table.add_row("Entries", f"{stats['entries']} / {stats['max_entries']}")
+        table.add_row("Hits", str(stats['hits']))
+        table.add_row("Misses", str(stats['misses']))
+        table.add_row("Hit Rate", f"{stats['hit_rate'] * 100:.1f}%")
+        table.add_row("Model Time Saved", f"{stats['saved_model_seconds']:.1f}s")
+        table.add_row("Location", stats['path'])
+        semantic = get_semantic_cache_stats()
+        if semantic.get('enabled'):
+            table.add_row("Similar Request Hits", f"{semantic['hits']} ({semantic['hit_rate'] * 100:.1f}%)")
+            table.add_row("Similar Request Entries", f"{semantic['entries']} / {semantic['max_entries']}")
+        coalescing = get_single_flight_stats()
+        if coalescing.get('enabled'):
+            table.add_row("Generations Saved by Coalescing", str(coalescing['saved_generations']))
+        self.console.print(table)
+    
+    def print_perf_summary(self):
+        """Display per-stage latency recorded during this session"""
+        summary = metrics.stage_summary()
+        if not summary:
+            self.console.print("⏱️  No timings recorded yet.", style="dim")
+            return
+
+        table = Table(title="⏱️  Performance by Stage (ms)", show_header=True, header_style="bold magenta")
+        table.add_column("Stage", style="cyan", no_wrap=True)
+        table.add_column("Count", style="green", justify="right")
+        table.add_column("Mean", style="green", justify="right")
+        table.add_column("p50", style="green", justify="right")
+        table.add_column("p95", style="yellow", justify="right")
+        table.add_column("p99", style="red", justify="right")
+        for stage, stats in summary.items():
+            table.add_row(stage, str(stats['count']), f"{stats['mean_ms']:.2f}", f"{stats['p50_ms']:.2f}",
+                          f"{stats['p95_ms']:.2f}", f"{stats['p99_ms']:.2f}")
+        self.console.print(table)
+
+    def print_intent_stats(self):
+        """Display how often requests were answered by the local intent matcher"""
+        stats = get_intent_stats()
+        if not stats.get('enabled'):
+            self.console.print("🎯 Intent matcher is disabled.", style="dim")
+            return
+
+        table = Table(title=f"🎯 Intent Matcher ({stats['hits']}/{stats['lookups']} hits, {stats['hit_rate'] * 100:.1f}%)",
+                      show_header=True, header_style="bold magenta")
+        table.add_column("Intent", style="cyan", no_wrap=True)
+        table.add_column("Hits", style="green")
+        for name, hits in sorted(stats['intents'].items(), key=lambda item: -item[1]):
+            table.add_row(name, str(hits))
+        self.console.print(table)
+
+    def print_backend_stats(self):
+        """Display health, load and latency of each load-balanced Ollama host"""
+        stats = get_backend_stats()
+        if not stats.get('enabled'):
+            self.console.print(f"🖥️  Using a single Ollama host: {stats['host']}", style="dim")
+            return
+
+        table = Table(title="🖥️  Ollama Backends", show_header=True, header_style="bold magenta")
+        table.add_column("Host", style="cyan", no_wrap=True)
+        table.add_column("Status")
+        table.add_column("In Flight", style="green")
+        table.add_column("Requests", style="green")
+        table.add_column("Failures", style="yellow")
+        table.add_column("Latency (ms)", style="green")
+        for host, backend in stats['backends'].items():
+            status = "[green]healthy[/green]" if backend['healthy'] else "[red]ejected[/red]"
+            table.add_row(host, status, str(backend['in_flight']), str(backend['requests']),
+                          str(backend['failures']), f"{backend['latency_ms']:.0f}")
+        self.console.print(table)
+
+    def print_router_stats(self):
+        """Display latency and escalation rate for each routed model"""
+        stats = get_router_stats()
+        if not stats.get('enabled'):
+            self.console.print("🔀 Model routing is disabled.", style="dim")
+            return
+
+        table = Table(title="🔀 Model Router", show_header=True, header_style="bold magenta")
+        table.add_column("Model", style="cyan", no_wrap=True)
+        table.add_column("Requests", style="green")
+        table.add_column("Mean (s)", style="green")
+        table.add_column("Escalated", style="yellow")
+        table.add_column("Reasons", style="dim")
+        for model, model_stats in stats['models'].items():
+            reasons = ', '.join(f"{reason}: {count}" for reason, count in model_stats['reasons'].items())
+            table.add_row(model, str(model_stats['requests']), f"{model_stats['mean_seconds']:.2f}",
+                          f"{model_stats['escalations']} ({model_stats['escalation_rate'] * 100:.1f}%)", reasons)
+        self.console.print(table)
     
     def get_risk_level(self, risk_score: int) -> tuple[str, str]:
         """Get risk level description and color based on risk score"""
@@ -157,32 +289,69 @@ class EnhancedCLI:
         
         # Show risk score if available
         if help_info and 'risk_score' in help_info:
-            risk_level, risk_color = self.get_risk_level(help_info['risk_score'])
-            risk_text = Text()
-            risk_text.append("⚠️ ", style="bold red")
-            risk_text.append("Risk Level: ", style="bold white")
-            risk_text.append(f"{risk_level} ({help_info['risk_score']}/10)", style=risk_color)
-            risk_panel = Panel(risk_text, style=risk_color, border_style=risk_color)
-            self.console.print(risk_panel)
+            self.print_risk_score(help_info['risk_score'])
         
         # Show notes if any
         if notes:
-            notes_text = Text()
-            notes_text.append("📝 ", style="bold yellow")
-            notes_text.append("Notes:", style="bold white")
-            notes_panel = Panel(notes, title=notes_text, style="bold yellow")
-            self.console.print(notes_panel)
+            self.print_notes(notes)
         
         # Show sudo warning if needed
         if requires_sudo:
-            sudo_warning = Text()
-            sudo_warning.append("⚠️ ", style="bold red")
-            sudo_warning.append("This command requires sudo privileges!", style="bold red")
-            self.console.print(Panel(sudo_warning, style="bold red", border_style="red"))
+            self.print_sudo_warning()
         
         # Show detailed help information if available
         if help_info:
             self.print_detailed_help(help_info)
+
+    def print_risk_score(self, risk_score: int):
+        """Display the risk score panel"""
+        risk_level, risk_color = self.get_risk_level(risk_score)
+        risk_text = Text()
+        risk_text.append("⚠️ ", style="bold red")
+        risk_text.append("Risk Level: ", style="bold white")
+        risk_text.append(f"{risk_level} ({risk_score}/10)", style=risk_color)
+        risk_panel = Panel(risk_text, style=risk_color, border_style=risk_color)
+        self.console.print(risk_panel)
+
+    def print_notes(self, notes: str):
+        """Display the notes panel"""
+        notes_text = Text()
+        notes_text.append("📝 ", style="bold yellow")
+        notes_text.append("Notes:", style="bold white")
+        notes_panel = Panel(notes, title=notes_text, style="bold yellow")
+        self.console.print(notes_panel)
+
+    def print_sudo_warning(self):
+        """Display the sudo warning panel"""
+        sudo_warning = Text()
+        sudo_warning.append("⚠️ ", style="bold red")
+        sudo_warning.append("This command requires sudo privileges!", style="bold red")
+        self.console.print(Panel(sudo_warning, style="bold red", border_style="red"))
+
+    def stream_interpretation(self, events):
+        """Render a streamed interpretation as it arrives and return the final CommandOutput"""
+        command_output = None
+        with self.console.status("[bold blue]🤖 Interpreting your request...", spinner="dots") as status:
+            for event, data in events:
+                if event == 'command':
+                    self.print_interpreted_command(data['command'])
+                    missing = describe_missing_programs(data['command'])
+                    if missing:
+                        self.print_notes(missing)
+                    status.update("[bold blue]📖 Loading help...")
+                elif event == 'field':
+                    field, value = data['field'], data['value']
+                    if field == 'requires_sudo' and value:
+                        self.print_sudo_warning()
+                    elif field == 'notes' and value:
+                        self.print_notes(value)
+                    elif field == 'help.risk_score':
+                        self.print_risk_score(value)
+                    elif field.startswith('help.'):
+                        self.print_detailed_help({field[len('help.'):]: value})
+                elif event == 'done':
+                    command_output = data
+        return command_output
     
     def print_detailed_help(self, help_info: dict):
         """Display detailed help information in an organized format"""
@@ -244,6 +413,14 @@ class EnhancedCLI:
             related_panel = Panel(related_content, title=related_text, style="bold yellow")
             self.console.print(related_panel)
     
+    def explain_command(self, help_func, command: str):
+        """Fetch and display the detailed help for a command"""
+        with self.console.status("[bold blue]📖 Loading help...", spinner="dots"):
+            command_help = help_func(command, self.distro_info, self.user_info)
+        help_info = command_help.model_dump()
+        self.print_risk_score(help_info['risk_score'])
+        self.print_detailed_help(help_info)
+
     def print_execution_result(self, result, command: str):
         """Display command execution results with formatting"""
         if isinstance(result, dict):
@@ -273,6 +450,45 @@ class EnhancedCLI:
             )
             self.console.print(result_panel)
     
+    def print_execution_stream(self, events, command: str):
+        """Display command output live as it is produced and return the final result"""
+        self.console.print(Text("⚡ Output:", style="bold green"))
+        result = {}
+        for event, data in events:
+            if event == 'stdout':
+                self.console.print(data, end="", markup=False, highlight=False)
+            elif event == 'stderr':
+                self.console.print(data, end="", style="yellow", markup=False, highlight=False)
+            elif event == 'exit':
+                result = data
+
+        returncode = result.get('returncode', 'Unknown')
+        if result.get('timed_out'):
+            summary = f"[bold red]Command timed out after {result.get('duration')}s and was stopped.[/bold red]"
+            style = "bold red"
+        elif returncode == 0:
+            summary = "[bold green]Command executed successfully![/bold green]"
+            style = "bold green"
+        else:
+            summary = "[bold yellow]Command finished with errors.[/bold yellow]"
+            style = "bold yellow"
+        if result.get('limit_exceeded') in ('cpu_seconds', 'file_bytes'):
+            limit = "CPU time" if result['limit_exceeded'] == 'cpu_seconds' else "file size"
+            summary += f"\n[bold red]Stopped by the sandbox {limit} limit.[/bold red]"
+        if result.get('truncated'):
+            summary += "\n[dim]Output was truncated.[/dim]"
+        details = f"[bold]Return Code:[/bold] {returncode}   [bold]Duration:[/bold] {result.get('duration', '?')}s"
+        usage = result.get('rusage')
+        if usage:
+            cpu = usage['user_seconds'] + usage['system_seconds']
+            details += f"   [bold]CPU:[/bold] {cpu:.2f}s   [bold]Max RSS:[/bold] {usage['max_rss_kb'] / 1024:.1f} MB"
+        self.console.print(Panel(
+            f"{summary}\n\n{details}",
+            title="✅ Execution Result",
+            style=style
+        ))
+        return result
+    
     def print_error(self, error_message: str):
         """Display error messages with formatting"""
         error_text = Text()
@@ -294,7 +510,60 @@ class EnhancedCLI:
         os.system('cls' if os.name == 'nt' else 'clear')
         self.print_banner()
     
-    def run_interactive_mode(self, interpret_command_func, execute_command_func, is_safe_command_func):
+    def confirm_and_execute(self, request, command, requires_sudo, is_safe_command_func,
+                            execute_command_func, execute_stream_func=None):
+        """Check, confirm and run a command, recording the outcome in the history"""
+        # Check if command is safe
+        if not is_safe_command_func(command):
+            self.print_error("This command requires manual intervention for safety reasons.")
+            self.history.record(request, command, "blocked")
+            return
+        
+        # Ask for confirmation
+        if requires_sudo:
+            proceed = Confirm.ask("⚠️ This command requires sudo privileges. Execute it?", default=False)
+        else:
+            proceed = Confirm.ask("Execute this command?", default=True)
+        
+        if not proceed:
+            self.console.print("❌ Command cancelled.", style="dim")
+            self.history.record(request, command, "cancelled")
+            return
+        
+        started = time.perf_counter()
+        if execute_stream_func is not None:
+            # Show output live as the command runs
+            result = self.print_execution_stream(execute_stream_func(command, self.user_info), command)
+        else:
+            # Execute command with loading animation
+            with self.console.status("[bold green]⚡ Executing command...", spinner="dots"):
+                result = execute_command_func(command, self.user_info, checked=True)
+            
+            # Display results
+            self.print_execution_result(result, command)
+        duration = time.perf_counter() - started
+        
+        # Add to history
+        status = "success" if (isinstance(result, dict) and result.get('returncode') == 0) or (not isinstance(result, dict) and "error" not in str(result).lower()) else "error"
+        returncode = result.get('returncode') if isinstance(result, dict) else None
+        self.history.record(request, command, status, round(duration, 3), returncode)
+    
+    def rerun_from_history(self, entry_id: str, is_safe_command_func, execute_command_func, execute_stream_func=None):
+        """Run a command from the history again without asking the model"""
+        entry = self.history.get(int(entry_id)) if entry_id.isdigit() else None
+        if entry is None:
+            self.console.print(f"📝 No history entry #{entry_id}.", style="dim")
+            return
+        command = entry['command']
+        self.console.print(Panel(f"[bold green]{command}[/bold green]", title=f"🔁 From history #{entry_id}",
+                                 subtitle=entry.get('request') or None, style="bold blue"))
+        self.last_command = command
+        requires_sudo = command.lstrip().startswith('sudo ')
+        self.confirm_and_execute(entry.get('request'), command, requires_sudo, is_safe_command_func,
+                                 execute_command_func, execute_stream_func)
+    
+    def run_interactive_mode(self, interpret_command_func, execute_command_func, is_safe_command_func,
+                             interpret_stream_func=None, execute_stream_func=None, help_func=None):
         """Run the enhanced interactive CLI mode"""
         self.clear_screen()
         self.print_system_info()
@@ -312,8 +581,12 @@ class EnhancedCLI:
                 elif user_input.lower() == 'help':
                     self.print_help()
                     continue
-                elif user_input.lower() == 'history':
-                    self.print_command_history()
+                elif user_input.lower() == 'history' or user_input.lower().startswith('history '):
+                    self.print_command_history(user_input[len('history'):].strip())
+                    continue
+                elif user_input.startswith('!') and len(user_input) > 1:
+                    self.rerun_from_history(user_input[1:].strip(), is_safe_command_func,
+                                            execute_command_func, execute_stream_func)
                     continue
                 elif user_input.lower() == 'clear':
                     self.clear_screen()
@@ -323,72 +596,92 @@ class EnhancedCLI:
                 elif user_input.lower() == 'info':
                     self.print_system_info()
                     continue
-                elif not user_input.strip():
+                elif user_input.lower() == 'info --perf':
+                    self.print_perf_summary()
                     continue
-                
-                # Show loading animation while interpreting
-                with self.console.status("[bold blue]🤖 Interpreting your request...", spinner="dots"):
-                    command_output = interpret_command_func(user_input, self.distro_info, self.user_info)
-                
-                command = command_output.command
-                notes = command_output.notes
-                requires_sudo = command_output.requires_sudo
-                
-                # Add sudo warning to notes if needed
-                if requires_sudo:
-                    if notes:
-                        notes = f"This command requires sudo privileges. {notes}"
+                elif user_input.lower() == 'cache':
+                    self.print_cache_stats()
+                    continue
+                elif user_input.lower() == 'intents':
+                    self.print_intent_stats()
+                    continue
+                elif user_input.lower() == 'router':
+                    self.print_router_stats()
+                    continue
+                elif user_input.lower() == 'backends':
+                    self.print_backend_stats()
+                    continue
+                elif user_input.lower() == 'fast':
+                    self.fast_mode = not self.fast_mode
+                    state = "on - details on request with 'explain'" if self.fast_mode else "off"
+                    self.console.print(f"⚡ Fast mode {state}", style="bold blue")
+                    continue
+                elif user_input.lower() == 'explain':
+                    if help_func is None or self.last_command is None:
+                        self.console.print("📖 No command to explain yet.", style="dim")
                     else:
-                        notes = "This command requires sudo privileges."
-                
-                # Display interpreted command
-                help_info = {
-                    'description': command_output.help.description,
-                    'parameters': command_output.help.parameters,
-                    'examples': command_output.help.examples,
-                    'risks': command_output.help.risks,
-                    'alternatives': command_output.help.alternatives,
-                    'related_commands': command_output.help.related_commands,
-                    'risk_score': command_output.help.risk_score
-                } if hasattr(command_output, 'help') and command_output.help else None
-                
-                self.print_interpreted_command(command, notes, requires_sudo, help_info)
-                
-                # Check if command is safe
-                if not is_safe_command_func(command):
-                    self.print_error("This command requires manual intervention for safety reasons.")
-                    self.command_history.append((command, "blocked"))
+                        self.explain_command(help_func, self.last_command)
                     continue
-                
-                # Ask for confirmation
-                if requires_sudo:
-                    proceed = Confirm.ask("⚠️ This command requires sudo privileges. Execute it?", default=False)
-                else:
-                    proceed = Confirm.ask("Execute this command?", default=True)
-                
-                if not proceed:
-                    self.console.print("❌ Command cancelled.", style="dim")
-                    self.command_history.append((command, "cancelled"))
+                elif not user_input.strip():
                     continue
                 
-                # Execute command with loading animation
-                with self.console.status("[bold green]⚡ Executing command...", spinner="dots"):
-                    result = execute_command_func(command, self.user_info)
-                
-                # Display results
-                self.print_execution_result(result, command)
+                if interpret_stream_func is not None:
+                    # Render the command as soon as it is generated, then the help as it arrives
+                    command_output = self.stream_interpretation(
+                        interpret_stream_func(user_input, self.distro_info, self.user_info, self.fast_mode))
+                    if command_output is None:
+                        continue
+                    command = command_output.command
+                    requires_sudo = command_output.requires_sudo
+                else:
+                    # Show loading animation while interpreting
+                    with self.console.status("[bold blue]🤖 Interpreting your request...", spinner="dots"):
+                        command_output = interpret_command_func(user_input, self.distro_info, self.user_info,
+                                                                self.fast_mode)
+                    
+                    command = command_output.command
+                    notes = command_output.notes
+                    requires_sudo = command_output.requires_sudo
+                    
+                    # Add sudo warning to notes if needed
+                    if requires_sudo:
+                        if notes:
+                            notes = f"This command requires sudo privileges. {notes}"
+                        else:
+                            notes = "This command requires sudo privileges."
+
+                    # Point out programs that are not installed
+                    missing = describe_missing_programs(command)
+                    if missing:
+                        notes = f"{notes} {missing}" if notes else missing
+                    
+                    # Display interpreted command
+                    help_info = {
+                        'description': command_output.help.description,
+                        'parameters': command_output.help.parameters,
+                        'examples': command_output.help.examples,
+                        'risks': command_output.help.risks,
+                        'alternatives': command_output.help.alternatives,
+                        'related_commands': command_output.help.related_commands,
+                        'risk_score': command_output.help.risk_score
+                    } if hasattr(command_output, 'help') and command_output.help else None
+                    
+                    self.print_interpreted_command(command, notes, requires_sudo, help_info)
+
+                self.last_command = command
+                if help_func is not None and not command_output.help.description:
+                    self.console.print("💡 Type 'explain' at the next prompt for detailed help.", style="dim")
                 
-                # Add to history
-                status = "success" if (isinstance(result, dict) and result.get('returncode') == 0) or (not isinstance(result, dict) and "error" not in str(result).lower()) else "error"
-                self.command_history.append((command, status))
+                self.confirm_and_execute(user_input, command, requires_sudo, is_safe_command_func,
+                                         execute_command_func, execute_stream_func)
                 
-            except KeyboardInterrupt:
+            except (KeyboardInterrupt, EOFError):
                 self.console.print("\n👋 Goodbye! Thanks for using Shell Assistant!", style="bold blue")
                 break
             except Exception as e:
                 self.print_error(f"An error occurred: {str(e)}")
                 if 'command' in locals():
-                    self.command_history.append((command, "error"))
+                    self.history.record(user_input, command, "error")
                 continue
             
             self.console.print()  # Add spacing between commands 
\ No newline at end of file
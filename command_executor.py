@@ -2,7 +2,16 @@ import subprocess
 import re
 import os
 import platform
-from user_info import is_in_home_directory
+import codecs
+import queue
+import signal
+import threading
+import time
+
+import metrics
+import settings
+from safety_engine import check_command, command_programs
+from path_index import get_path_index
 
 def filter_unnecessary_sudo(command):
     """Filter out unnecessary sudo usage based on platform"""
@@ -27,87 +36,163 @@ def filter_unnecessary_sudo(command):
 
 def is_safe_command(command):
     """Check if command is safe to execute based on platform"""
-    system = platform.system()
-
-    # Platform-specific dangerous patterns
-    if system == "Darwin":  # macOS
-        dangerous_patterns = [
-            r'rm\s+-rf\s+/',
-            r'sudo\s+rm',
-            r'mkfs',
-            r'dd\s+if=',
-            r'passwd',
-            r'chmod\s+777',
-            r'>\s+/System',
-            r'>\s+/Library',
-            r'>\s+/Applications',
-            r'sudo\s+rm\s+-rf\s+/',
-            r'diskutil\s+eraseDisk',
-            r'fdisk',
-            r'format'
-        ]
-    else:  # Linux
-        dangerous_patterns = [
-            r'rm\s+-rf\s+/',
-            r'sudo\s+rm',
-            r'mkfs',
-            r'dd\s+if=',
-            r'passwd',
-            r'chmod\s+777',
-            r'>\s+/etc',
-            r'>\s+/boot'
-        ]
-
-    for pattern in dangerous_patterns:
-        if re.search(pattern, command):
-            return False
-
-    # Check if command tries to access outside home directory
-    command_parts = command.split()
-    for part in command_parts:
-        if os.path.isabs(part) and not is_in_home_directory(part):
-            return False
-
-    # Check if command exists on macOS and suggest Homebrew if missing
-    if system == "Darwin":
-        cmd = command.split()[0]
-        preferred_cmd = get_preferred_command(cmd)
-        if not command_exists(preferred_cmd):
-            return False  # Not safe if command doesn't exist
-
-    return True
+    with metrics.span('safety.check'):
+        return check_command(command).safe
+
+def _command_env(user_info):
+    """Environment for executed commands"""
+    env = os.environ.copy()
+    env['HOME'] = user_info['home']
+    env['USER'] = user_info['username']
+    return env
+
+def _read_pipe(name, pipe, events):
+    """Forward raw chunks from a pipe to the event queue until EOF"""
+    try:
+        for chunk in iter(lambda: os.read(pipe.fileno(), 4096), b''):
+            events.put((name, chunk))
+    except OSError:
+        pass
+    finally:
+        pipe.close()
+        events.put((name, None))
+
+def _kill_process_group(process):
+    """Kill the command and anything it spawned"""
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+def execute_command_stream(command, user_info, timeout=None, max_output_bytes=None):
+    """
+    Execute a command and yield its output incrementally.
+
+    Yields ('stdout', text) and ('stderr', text) as output arrives, then a final
+    ('exit', {...}) with the return code, duration and whether the command timed
+    out or its output was truncated. The command is killed after `timeout` seconds;
+    output beyond `max_output_bytes` is discarded (but still drained). With
+    SANDBOX_ENABLED the command runs under resource limits (see sandbox.py).
+    """
+    if timeout is None:
+        timeout = settings.EXECUTE_TIMEOUT
+    if max_output_bytes is None:
+        max_output_bytes = settings.EXECUTE_MAX_OUTPUT_BYTES
+
+    if settings.SANDBOX_ENABLED:
+        from sandbox import run_sandboxed
+        for event, data in run_sandboxed(command, user_info['home'], _command_env(user_info),
+                                         timeout, max_output_bytes):
+            if event == 'exit':
+                metrics.observe('execute.run', data['duration'])
+            yield event, data
+        return
+
+    started = time.monotonic()
+    with metrics.span('execute.spawn'):
+        process = subprocess.Popen(command, shell=True,
+                                   stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE,
+                                   cwd=user_info['home'],
+                                   env=_command_env(user_info),
+                                   start_new_session=True)
+
+    events = queue.Queue()
+    decoders = {name: codecs.getincrementaldecoder('utf-8')(errors='replace') for name in ('stdout', 'stderr')}
+    for name, pipe in (('stdout', process.stdout), ('stderr', process.stderr)):
+        threading.Thread(target=_read_pipe, args=(name, pipe, events), daemon=True).start()
+
+    open_pipes = 2
+    output_bytes = 0
+    timed_out = False
+    truncated = False
+    deadline = started + timeout if timeout else None
 
-def execute_command(command, user_info):
-    """Execute command with platform-specific considerations"""
-    if not is_safe_command(command):
+    try:
+        while open_pipes:
+            wait = None if deadline is None else deadline - time.monotonic()
+            if wait is not None and wait <= 0:
+                if timed_out:
+                    # Something outside the process group still holds the pipes open
+                    break
+                timed_out = True
+                _kill_process_group(process)
+                deadline = time.monotonic() + 1
+                continue
+            try:
+                name, chunk = events.get(timeout=wait)
+            except queue.Empty:
+                continue
+
+            if chunk is None:
+                open_pipes -= 1
+                text = decoders[name].decode(b'', final=True)
+                if text and not truncated:
+                    yield name, text
+                continue
+
+            if truncated:
+                continue
+            if max_output_bytes and output_bytes + len(chunk) > max_output_bytes:
+                chunk = chunk[:max_output_bytes - output_bytes]
+                truncated = True
+            output_bytes += len(chunk)
+            text = decoders[name].decode(chunk)
+            if text:
+                yield name, text
+            if truncated:
+                yield 'stderr', f"\n[output truncated after {max_output_bytes} bytes]\n"
+
+        returncode = process.wait()
+    finally:
+        if process.poll() is None:
+            _kill_process_group(process)
+            process.wait()
+
+    duration = time.monotonic() - started
+    metrics.observe('execute.run', duration)
+    yield 'exit', {
+        'returncode': returncode,
+        'duration': round(duration, 3),
+        'timed_out': timed_out,
+        'truncated': truncated
+    }
+
+def execute_command(command, user_info, timeout=None, max_output_bytes=None, checked=False):
+    """
+    Execute command with platform-specific considerations.
+
+    Pass checked=True when the caller has just run is_safe_command on the same command.
+    """
+    if not checked and not is_safe_command(command):
         return "This command requires authentication or is not safe to execute."
 
     try:
-        # Change to user's home directory before executing
-        os.chdir(user_info['home'])
-
-        # Set environment variables for better compatibility
-        env = os.environ.copy()
-        env['HOME'] = user_info['home']
-        env['USER'] = user_info['username']
-
-        # Execute the command and capture output
-        result = subprocess.run(command, shell=True,
-                                capture_output=True,
-                                text=True,
-                                env=env)
+        stdout = []
+        stderr = []
+        result = {}
+        for event, data in execute_command_stream(command, user_info, timeout, max_output_bytes):
+            if event == 'stdout':
+                stdout.append(data)
+            elif event == 'stderr':
+                stderr.append(data)
+            else:
+                result = data
+
+        if result.get('timed_out'):
+            stderr.append(f"\nCommand timed out after {timeout or settings.EXECUTE_TIMEOUT} seconds\n")
 
         return {
-            'stdout': result.stdout,
-            'stderr': result.stderr,
-            'returncode': result.returncode
+            'stdout': ''.join(stdout),
+            'stderr': ''.join(stderr),
+            **result
         }
     except Exception as e:
         return f"Error executing command: {str(e)}"
 
 def command_exists(cmd):
     """Check if a command exists in $PATH"""
-    return subprocess.call(["which", cmd], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL) == 0
+    return get_path_index().exists(cmd)
 
 def get_preferred_command(cmd):
     """On macOS, prefer GNU/coreutils if available (e.g., gls for ls)"""
@@ -118,3 +203,26 @@ def get_preferred_command(cmd):
             return gnu_cmd
     return cmd
 
+def find_missing_programs(command):
+    """Return {program: [close matches]} for every program in command that is not installed"""
+    missing = {}
+    for program in command_programs(command):
+        if program not in missing and not command_exists(program):
+            missing[program] = get_path_index().suggest(program)
+    return missing
+
+def describe_missing_programs(command, missing=None):
+    """
+    Describe programs the command needs that are not installed, with suggestions.
+
+    Pass the result of find_missing_programs as `missing` to avoid looking them up again.
+    """
+    if missing is None:
+        missing = find_missing_programs(command)
+    notes = []
+    for program, suggestions in missing.items():
+        if suggestions:
+            notes.append(f"'{program}' is not installed. Did you mean: {', '.join(suggestions)}?")
+        else:
+            notes.append(f"'{program}' is not installed.")
+    return ' '.join(notes)
@@ -0,0 +1,38 @@
+"""
+Shared pytest fixtures
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+import ollama_client
+import settings
+from mock_ollama import MockOllamaServer
+
+@pytest.fixture
+def mock_ollama(monkeypatch):
+    """
+    Start a mock Ollama server and make it the shared client; returns the server.
+
+    Keyword arguments go to MockOllamaServer. The caches and the intent matcher
+    are turned off so every request reaches the server; tests can turn them back on.
+    """
+    started = []
+
+    def start(**options):
+        server = MockOllamaServer(**options).start()
+        client = ollama_client.OllamaClient(server.url)
+        monkeypatch.setattr(ollama_client, '_client', client)
+        started.append((server, client))
+        return server
+
+    monkeypatch.setattr(settings, 'CACHE_ENABLED', False)
+    monkeypatch.setattr(settings, 'INTENT_MATCHER_ENABLED', False)
+    monkeypatch.setattr(settings, 'SEMANTIC_CACHE_ENABLED', False)
+    yield start
+    for server, client in started:
+        client.close()
+        server.stop()
@@ -0,0 +1,219 @@
+"""
+Resident shell-assist daemon serving requests over a Unix domain socket.
+
+Keeps the detected system context, built prompts, Ollama connections, caches
+and the safety engine warm between requests, so clients (see daemon_client.py)
+skip Python imports and detection entirely.
+
+Protocol: the client sends one JSON object per line and reads JSON lines back.
+Every request ends with a line containing "ok"; execute requests first stream
+{"event": "stdout"|"stderr", "data": ...} lines. Requests:
+  {"op": "interpret", "request": "...", "fast": true}   (omit or null for FAST_MODE)
+  {"op": "execute", "command": "...", "timeout": 60}
+  {"op": "stats"}
+  {"op": "ping"}
+"""
+
+import json
+import os
+import platform
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+
+import settings
+
+
+class _Handler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.active_connections += 1
+        try:
+            for line in self.rfile:
+                if not line.strip():
+                    continue
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("request must be a JSON object")
+                except ValueError as e:
+                    self._send({'ok': False, 'error': f"Invalid request: {e}"})
+                    continue
+                server.count(request.get('op'))
+                try:
+                    for response in server.dispatch(request):
+                        self._send(response)
+                except (BrokenPipeError, ConnectionResetError):
+                    return
+                except Exception as e:
+                    self._send({'ok': False, 'error': str(e)})
+        finally:
+            with server.lock:
+                server.active_connections -= 1
+
+    def _send(self, payload):
+        self.wfile.write(json.dumps(payload).encode('utf-8') + b"\n")
+        self.wfile.flush()
+
+
+class ShellAssistDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Threaded Unix socket server; each connection may send any number of requests"""
+
+    daemon_threads = True
+
+    def __init__(self, path):
+        self.path = path
+        self.started = time.time()
+        self.lock = threading.Lock()
+        self.active_connections = 0
+        self.requests = {}
+        _remove_stale_socket(path)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Only the owner may connect: requests can run commands as this user
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(path, _Handler)
+        finally:
+            os.umask(old_umask)
+
+    def warm_up(self):
+        """Load everything a request needs before accepting connections"""
+        from command_executor import is_safe_command
+        from intent_matcher import get_intent_matcher
+        from interpret_cache import get_interpretation_cache
+        from ollama_client import get_ollama_client
+        from ollama_interface import get_system_prompt, warm_up
+        from system_context import get_system_context
+
+        distro_info, user_info = get_system_context()
+        get_system_prompt(platform.system(), distro_info, user_info, settings.FAST_MODE)
+        get_intent_matcher()
+        get_interpretation_cache()
+        get_ollama_client()
+        is_safe_command("ls -la")
+        if settings.WARMUP_ENABLED:
+            threading.Thread(target=warm_up, args=(distro_info, user_info), daemon=True).start()
+
+    def count(self, op):
+        with self.lock:
+            self.requests[str(op)] = self.requests.get(str(op), 0) + 1
+
+    def dispatch(self, request):
+        """Yield the response lines for one request"""
+        op = request.get('op')
+        if op == 'interpret':
+            yield self._interpret(request)
+        elif op == 'execute':
+            yield from self._execute(request)
+        elif op == 'stats':
+            yield {'ok': True, **self.stats()}
+        elif op == 'ping':
+            yield {'ok': True, 'pid': os.getpid()}
+        else:
+            yield {'ok': False, 'error': f"Unknown op: {op}"}
+
+    def _interpret(self, request):
+        from ollama_interface import interpret_command
+        from responses import format_interpretation
+        from system_context import get_system_context
+        from worker_pools import get_interpret_pool, run_in_pool
+
+        user_input = request.get('request') or ''
+        if not user_input.strip():
+            return {'ok': False, 'error': "'request' is required"}
+        distro_info, user_info = get_system_context()
+        command_output = run_in_pool(get_interpret_pool(), interpret_command,
+                                     user_input, distro_info, user_info, request.get('fast'))
+        return {'ok': True, 'interpretation': format_interpretation(command_output),
+                'requires_sudo': command_output.requires_sudo}
+
+    def _execute(self, request):
+        from command_executor import execute_command_stream, is_safe_command
+        from system_context import get_system_context
+        from worker_pools import get_execute_pool, stream_in_pool
+
+        command = request.get('command') or ''
+        if not is_safe_command(command):
+            yield {'ok': False, 'status': 'blocked',
+                   'error': "This command requires manual intervention for safety reasons."}
+            return
+        user_info = get_system_context()[1]
+        result = {}
+        events = stream_in_pool(get_execute_pool(),
+                                lambda: execute_command_stream(command, user_info, request.get('timeout')))
+        for event, data in events:
+            if event == 'exit':
+                result = data
+            else:
+                yield {'event': event, 'data': data}
+        yield {'ok': True, 'execution': result}
+
+    def stats(self):
+        """Uptime, connection and request counts, and cache statistics"""
+        from interpret_cache import get_cache_stats
+        from intent_matcher import get_intent_stats
+        from semantic_cache import get_semantic_cache_stats
+        from singleflight import get_single_flight_stats
+
+        with self.lock:
+            connections, requests = self.active_connections, dict(self.requests)
+        return {
+            'pid': os.getpid(),
+            'uptime_seconds': round(time.time() - self.started, 3),
+            'active_connections': connections,
+            'requests': requests,
+            'cache': get_cache_stats(),
+            'semantic_cache': get_semantic_cache_stats(),
+            'coalescing': get_single_flight_stats(),
+            'intents': get_intent_stats(),
+        }
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def _remove_stale_socket(path):
+    """Remove a socket file left by a daemon that is no longer running"""
+    if not os.path.exists(path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        os.unlink(path)
+    else:
+        raise RuntimeError(f"A shell-assist daemon is already listening on {path}")
+    finally:
+        probe.close()
+
+
+def serve(path=None):
+    """Run the daemon in the foreground until interrupted"""
+    from worker_pools import shutdown_pools
+
+    path = path or settings.DAEMON_SOCKET
+    server = ShellAssistDaemon(path)
+    # Remove the socket on `kill` as well as on Ctrl+C
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.warm_up()
+        print(f"shell-assist daemon listening on {path} (pid {os.getpid()})")
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        shutdown_pools(wait=False)
+
+
+if __name__ == '__main__':
+    serve()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Thin client for the shell-assist daemon (start it with `python main.py --daemon`).
+
+Imports only json, socket, sys and the small settings module, so it starts in
+a few milliseconds and leaves all work to the warm daemon.
+
+Usage:
+  python daemon_client.py "show disk usage"           # print the interpreted command
+  python daemon_client.py --exec "show disk usage"    # interpret and run it, printing its output
+  python daemon_client.py --exec --yes "..."          # also run commands that need sudo or are high risk
+  python daemon_client.py --json "show disk usage"    # print the daemon's JSON response
+  python daemon_client.py --stats                     # daemon uptime, requests and cache statistics
+
+Exit codes are the same as for the headless mode (see headless.py), plus 6 when
+the daemon is not running.
+"""
+
+import json
+import socket
+import sys
+
+import settings
+
+EXIT_OK = 0
+EXIT_COMMAND_FAILED = 1
+EXIT_USAGE = 2
+EXIT_INTERPRET_FAILED = 3
+EXIT_BLOCKED = 4
+EXIT_TIMED_OUT = 5
+EXIT_NO_DAEMON = 6
+
+CONFIRM_RISK_SCORE = 7
+
+
+class DaemonClient:
+    """One connection to the daemon, sending requests and reading their response lines"""
+
+    def __init__(self, path=None):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(path or settings.DAEMON_SOCKET)
+        self.reader = self.sock.makefile('rb')
+
+    def request(self, payload):
+        """Send a request and yield each response line, ending with the one containing 'ok'"""
+        self.sock.sendall(json.dumps(payload).encode('utf-8') + b"\n")
+        for line in self.reader:
+            response = json.loads(line)
+            yield response
+            if 'ok' in response:
+                return
+        raise ConnectionError("The daemon closed the connection")
+
+    def call(self, payload):
+        """Send a request and return its final response"""
+        for response in self.request(payload):
+            pass
+        return response
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+
+
+def main(argv):
+    flags = {arg for arg in argv if arg.startswith('--')}
+    words = [arg for arg in argv if not arg.startswith('--')]
+    unknown = flags - {'--exec', '--yes', '--json', '--stats', '--ping', '--fast'}
+    if unknown or (not words and not flags & {'--stats', '--ping'}):
+        print(__doc__.strip(), file=sys.stderr)
+        return EXIT_USAGE
+
+    try:
+        client = DaemonClient()
+    except OSError as e:
+        print(f"Cannot reach the shell-assist daemon at {settings.DAEMON_SOCKET}: {e}", file=sys.stderr)
+        print("Start it with: python main.py --daemon", file=sys.stderr)
+        return EXIT_NO_DAEMON
+
+    try:
+        if '--stats' in flags or '--ping' in flags:
+            print(json.dumps(client.call({'op': 'stats' if '--stats' in flags else 'ping'}), indent=2))
+            return EXIT_OK
+
+        # Without --fast the daemon's own FAST_MODE setting decides
+        response = client.call({'op': 'interpret', 'request': ' '.join(words),
+                                'fast': True if '--fast' in flags else None})
+        if '--json' in flags and '--exec' not in flags:
+            print(json.dumps(response))
+        if not response['ok']:
+            print(f"Error: {response['error']}", file=sys.stderr)
+            return EXIT_INTERPRET_FAILED
+        interpretation = response['interpretation']
+        command = interpretation['interpreted_command']
+        if '--exec' not in flags:
+            if '--json' not in flags:
+                print(command)
+            return EXIT_OK
+
+        print(f"$ {command}", file=sys.stderr)
+        risky = response['requires_sudo'] or interpretation['help']['risk_score'] >= CONFIRM_RISK_SCORE
+        if risky and '--yes' not in flags:
+            print("This command needs sudo or is high risk; pass --yes to run it.", file=sys.stderr)
+            return EXIT_BLOCKED
+
+        result = None
+        for line in client.request({'op': 'execute', 'command': command}):
+            if 'event' in line:
+                (sys.stdout if line['event'] == 'stdout' else sys.stderr).write(line['data'])
+            else:
+                result = line
+        sys.stdout.flush()
+        if not result['ok']:
+            print(result['error'], file=sys.stderr)
+            return EXIT_BLOCKED if result.get('status') == 'blocked' else EXIT_COMMAND_FAILED
+        execution = result['execution']
+        if execution.get('timed_out'):
+            return EXIT_TIMED_OUT
+        return EXIT_OK if execution.get('returncode') == 0 else EXIT_COMMAND_FAILED
+    finally:
+        client.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -1,63 +1,128 @@
 import subprocess
 import platform
 import os
+import json
+import plistlib
+from concurrent.futures import ThreadPoolExecutor
 
-def get_distro_info():
-    """Get system information compatible with both Linux and macOS"""
-    system = platform.system()
-    
-    if system == "Darwin":  # macOS
-        try:
-            # Get macOS version information
-            result = subprocess.run(['sw_vers'], 
-                                   capture_output=True, 
-                                   text=True)
-            if result.returncode == 0:
-                return f"macOS System Information:\n{result.stdout}"
-        except FileNotFoundError:
-            pass
-        
-        # Fallback for macOS
-        try:
-            result = subprocess.run(['system_profiler', 'SPSoftwareDataType'], 
-                                   capture_output=True, 
-                                   text=True)
-            if result.returncode == 0:
-                return f"macOS System Profile:\n{result.stdout}"
-        except FileNotFoundError:
-            pass
-        
+import settings
+
+MACOS_VERSION_PLIST = '/System/Library/CoreServices/SystemVersion.plist'
+OS_RELEASE = '/etc/os-release'
+
+def _run_probe(args, timeout):
+    """Run a detection command, returning its output or None"""
+    try:
+        result = subprocess.run(args,
+                                capture_output=True,
+                                text=True,
+                                timeout=timeout)
+    except (FileNotFoundError, subprocess.TimeoutExpired, OSError):
+        return None
+    if result.returncode == 0:
+        return result.stdout
+    return None
+
+def _probe_sw_vers(timeout):
+    # Get macOS version information
+    output = _run_probe(['sw_vers'], timeout)
+    return f"macOS System Information:\n{output}" if output else None
+
+def _probe_system_profiler(timeout):
+    output = _run_probe(['system_profiler', 'SPSoftwareDataType'], timeout)
+    return f"macOS System Profile:\n{output}" if output else None
+
+def _probe_lsb_release(timeout):
+    # Using lsb_release for distribution detection
+    return _run_probe(['lsb_release', '-a'], timeout)
+
+def _probe_os_release(timeout):
+    try:
+        with open(OS_RELEASE, 'r') as f:
+            return f.read()
+    except OSError:
+        return None
+
+def _probe_neofetch(timeout):
+    return _run_probe(['neofetch', '--stdout'], timeout)
+
+# Probes grouped into tiers: every probe in a tier runs in parallel and the first
+# successful one (in listed order) wins. Slow probes sit in a later tier so they
+# only run when every fast source has failed.
+_PROBE_TIERS = {
+    'Darwin': [[_probe_sw_vers], [_probe_system_profiler]],
+    'Linux': [[_probe_lsb_release, _probe_os_release], [_probe_neofetch]],
+}
+
+def _detect(system, timeout):
+    """Run the probe tiers for this platform and return the best result"""
+    for tier in _PROBE_TIERS.get(system, []):
+        with ThreadPoolExecutor(max_workers=len(tier)) as pool:
+            futures = [pool.submit(probe, timeout) for probe in tier]
+            for future in futures:
+                output = future.result()
+                if output:
+                    return output
+
+    if system == "Darwin":
         # Basic macOS info
         return f"macOS {platform.mac_ver()[0]}"
-    
-    elif system == "Linux":
-        try:
-            # Using lsb_release for distribution detection
-            result = subprocess.run(['lsb_release', '-a'], 
-                                   capture_output=True, 
-                                   text=True)
-            if result.returncode == 0:
-                return result.stdout
-        except FileNotFoundError:
-            pass
-        
-        # Fallback to neofetch if lsb_release isn't available
-        try:
-            result = subprocess.run(['neofetch', '--stdout'], 
-                                   capture_output=True, 
-                                   text=True)
-            if result.returncode == 0:
-                return result.stdout
-        except FileNotFoundError:
-            pass
-        
-        # Another fallback option
-        try:
-            with open('/etc/os-release', 'r') as f:
-                return f.read()
-        except:
-            pass
-    
+
     # Generic fallback
     return f"{system} {platform.release()}"
 
+def system_fingerprint(system=None):
+    """
+    Cheap fingerprint that changes when the OS is upgraded.
+
+    Uses the macOS build number from SystemVersion.plist, or the mtime of
+    /etc/os-release on Linux, plus the kernel release. No subprocesses.
+    """
+    system = system or platform.system()
+    if system == "Darwin":
+        try:
+            with open(MACOS_VERSION_PLIST, 'rb') as f:
+                version = plistlib.load(f)
+            marker = version.get('ProductBuildVersion', '')
+        except (OSError, plistlib.InvalidFileException):
+            marker = platform.mac_ver()[0]
+    else:
+        try:
+            marker = str(os.stat(OS_RELEASE).st_mtime_ns)
+        except OSError:
+            marker = ''
+    return f"{system}:{platform.release()}:{marker}"
+
+def _load_cached(fingerprint):
+    try:
+        with open(settings.SYSTEM_PROFILE_PATH, 'r') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if isinstance(cached, dict) and cached.get('fingerprint') == fingerprint:
+        return cached.get('distro_info')
+    return None
+
+def _store_cached(fingerprint, distro_info):
+    try:
+        os.makedirs(os.path.dirname(settings.SYSTEM_PROFILE_PATH), exist_ok=True)
+        tmp_path = f"{settings.SYSTEM_PROFILE_PATH}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'fingerprint': fingerprint, 'distro_info': distro_info}, f)
+        os.replace(tmp_path, settings.SYSTEM_PROFILE_PATH)
+    except OSError:
+        pass
+
+def get_distro_info():
+    """Get system information compatible with both Linux and macOS"""
+    system = platform.system()
+
+    if not settings.SYSTEM_PROFILE_CACHE:
+        return _detect(system, settings.DISTRO_PROBE_TIMEOUT)
+
+    fingerprint = system_fingerprint(system)
+    distro_info = _load_cached(fingerprint)
+    if distro_info is None:
+        distro_info = _detect(system, settings.DISTRO_PROBE_TIMEOUT)
+        _store_cached(fingerprint, distro_info)
+    return distro_info
@@ -0,0 +1,111 @@
+"""
+Headless one-shot mode for scripts and pipelines.
+
+Interprets a single request and prints the result as JSON (or NDJSON events
+with --ndjson), without rich, colorama or any prompts. With --exec the command
+is also run after the safety check; commands that need sudo or have a risk
+score of at least CONFIRM_RISK_SCORE only run with --yes.
+
+Exit codes:
+  0  interpreted, or the command ran and exited with 0
+  1  the command ran and exited with a non-zero code (see "returncode")
+  2  invalid arguments
+  3  the request could not be interpreted
+  4  the command was blocked by the safety check, or needs --yes
+  5  the command timed out
+"""
+
+import argparse
+import contextlib
+import json
+import sys
+
+EXIT_OK = 0
+EXIT_COMMAND_FAILED = 1
+EXIT_USAGE = 2
+EXIT_INTERPRET_FAILED = 3
+EXIT_BLOCKED = 4
+EXIT_TIMED_OUT = 5
+
+# Commands at or above this risk score are only run with --yes
+CONFIRM_RISK_SCORE = 7
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog='main.py', description="Interpret a request without the interactive UI")
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument('--interpret', metavar='REQUEST', help="print the interpreted command as JSON")
+    action.add_argument('--exec', metavar='REQUEST', dest='execute', help="interpret the request and run the command")
+    parser.add_argument('--fast', action='store_true', help="generate only the command, sudo flag and risk score")
+    parser.add_argument('--yes', action='store_true', help="run commands that need sudo or are high risk")
+    parser.add_argument('--ndjson', action='store_true', help="print one JSON event per line as results arrive")
+    parser.add_argument('--timeout', type=float, help="seconds before the command is killed")
+    return parser.parse_args(argv)
+
+
+def run(argv=None, out=None):
+    """Run one headless request and return the exit code"""
+    args = parse_args(argv)
+    out = out or sys.stdout
+
+    def emit(payload):
+        out.write(json.dumps(payload) + "\n")
+        out.flush()
+
+    # Progress messages printed by the model and execution layers go to stderr, keeping stdout parseable
+    with contextlib.redirect_stdout(sys.stderr):
+        return _run(args, emit)
+
+
+def _run(args, emit):
+    from command_executor import execute_command_stream, is_safe_command
+    from ollama_interface import interpret_command
+    from responses import format_interpretation
+    from system_context import get_system_context
+
+    request = args.interpret if args.interpret is not None else args.execute
+    report = {'request': request}
+
+    def finish(status, code, **fields):
+        report.update(status=status, **fields)
+        if args.ndjson:
+            emit({'event': 'result', 'status': status, **fields})
+        else:
+            emit(report)
+        return code
+
+    distro_info, user_info = get_system_context()
+    try:
+        command_output = interpret_command(request, distro_info, user_info, True if args.fast else None)
+    except Exception as e:
+        return finish('error', EXIT_INTERPRET_FAILED, error=str(e))
+
+    interpretation = format_interpretation(command_output)
+    report['interpretation'] = interpretation
+    if args.ndjson:
+        emit({'event': 'interpretation', **interpretation})
+    if args.interpret is not None:
+        return finish('interpreted', EXIT_OK)
+
+    command = command_output.command
+    if not is_safe_command(command):
+        return finish('blocked', EXIT_BLOCKED, error="This command requires manual intervention for safety reasons.")
+    if not args.yes and (command_output.requires_sudo or command_output.help.risk_score >= CONFIRM_RISK_SCORE):
+        return finish('needs_confirmation', EXIT_BLOCKED,
+                      error="This command needs sudo or is high risk; pass --yes to run it.")
+
+    stdout, stderr, result = [], [], {}
+    for event, data in execute_command_stream(command, user_info, args.timeout):
+        if event == 'exit':
+            result = data
+        elif args.ndjson:
+            emit({'event': event, 'data': data})
+        else:
+            (stdout if event == 'stdout' else stderr).append(data)
+
+    execution = result if args.ndjson else {'stdout': ''.join(stdout), 'stderr': ''.join(stderr), **result}
+    if result.get('timed_out'):
+        return finish('timed_out', EXIT_TIMED_OUT, execution=execution)
+    if result.get('returncode') != 0:
+        return finish('failed', EXIT_COMMAND_FAILED, execution=execution)
+    return finish('success', EXIT_OK, execution=execution)
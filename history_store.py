@@ -0,0 +1,146 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import settings
+
+
+def trigrams(text):
+    """Character trigrams of a lower-cased, space-padded text"""
+    text = f"  {' '.join(text.lower().split())} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class HistoryStore:
+    """
+    Command history kept in an append-only JSON Lines file.
+
+    The newest `max_entries` entries are held in a ring buffer with a trigram
+    index over the request and the command, so fuzzy searches only look at the
+    entries sharing trigrams with the query. When the file grows to twice
+    `max_entries` lines it is rewritten with just the entries in memory.
+    """
+
+    def __init__(self, path=None, max_entries=1000):
+        self.path = path
+        self.max_entries = max_entries
+        self._entries = deque()
+        self._by_id = {}
+        self._index = {}
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self._file_lines = 0
+        if path:
+            self._load()
+
+    def _load(self):
+        lines = deque(maxlen=self.max_entries)
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    lines.append(line)
+                    self._file_lines += 1
+        except FileNotFoundError:
+            return
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # A line cut short by a crash; skip it
+                continue
+            self._add(entry)
+        if self._file_lines >= 2 * self.max_entries:
+            self._compact()
+
+    def _compact(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for entry in self._entries:
+                f.write(json.dumps({key: value for key, value in entry.items() if key != 'id'}) + "\n")
+        os.replace(tmp_path, self.path)
+        self._file_lines = len(self._entries)
+
+    def _add(self, entry):
+        entry['id'] = self._next_id
+        self._next_id += 1
+        self._entries.append(entry)
+        self._by_id[entry['id']] = entry
+        for gram in trigrams(f"{entry.get('request') or ''} {entry['command']}"):
+            self._index.setdefault(gram, set()).add(entry['id'])
+        while len(self._entries) > self.max_entries:
+            self._remove(self._entries.popleft())
+
+    def _remove(self, entry):
+        del self._by_id[entry['id']]
+        for gram in trigrams(f"{entry.get('request') or ''} {entry['command']}"):
+            ids = self._index.get(gram)
+            if ids is not None:
+                ids.discard(entry['id'])
+                if not ids:
+                    del self._index[gram]
+
+    def record(self, request, command, status, duration=None, returncode=None):
+        """Append an entry and return it"""
+        entry = {
+            'time': time.time(),
+            'request': request,
+            'command': command,
+            'status': status,
+            'duration': duration,
+            'returncode': returncode,
+        }
+        with self._lock:
+            if self.path:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry) + "\n")
+                self._file_lines += 1
+            self._add(entry)
+            if self.path and self._file_lines >= 2 * self.max_entries:
+                self._compact()
+            return dict(entry)
+
+    def recent(self, limit=10):
+        """Return the newest entries, oldest first"""
+        with self._lock:
+            return [dict(entry) for entry in list(self._entries)[-limit:]]
+
+    def get(self, entry_id):
+        with self._lock:
+            entry = self._by_id.get(entry_id)
+            return dict(entry) if entry is not None else None
+
+    def search(self, query, limit=10, min_score=0.5):
+        """Return entries whose request or command fuzzily matches the query, best and newest first"""
+        query_grams = trigrams(query)
+        with self._lock:
+            counts = {}
+            for gram in query_grams:
+                for entry_id in self._index.get(gram, ()):
+                    counts[entry_id] = counts.get(entry_id, 0) + 1
+            ranked = sorted(((count / len(query_grams), entry_id) for entry_id, count in counts.items()
+                             if count / len(query_grams) >= min_score), reverse=True)
+            return [dict(self._by_id[entry_id], score=score) for score, entry_id in ranked[:limit]]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_history_store():
+    """Return the shared history store; it is kept in memory only when persistence is disabled"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            path = settings.HISTORY_PATH if settings.HISTORY_ENABLED else None
+            try:
+                _store = HistoryStore(path, settings.HISTORY_MAX_ENTRIES)
+            except OSError as e:
+                print(f"Warning: command history at {path} is unavailable, keeping it in memory: {e}")
+                _store = HistoryStore(None, settings.HISTORY_MAX_ENTRIES)
+        return _store
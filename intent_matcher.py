@@ -0,0 +1,383 @@
+import re
+import threading
+
+import settings
+from interpret_cache import normalize_input
+
+# Common requests answered locally without asking the model. Each intent lists the
+# phrasings it accepts (matched against the whole normalized request) and a command
+# per platform; 'Darwin' falls back to 'Linux' when both use the same command.
+INTENTS = [
+    {
+        'name': 'list_files',
+        'patterns': [
+            r'(list|show)( me)?( all)?( the)? files( and folders)?( in (the )?(current|this) (directory|folder)| here)?',
+            r'what files are (here|in (the )?(current|this) (directory|folder))',
+            r'list (the )?(current|this) (directory|folder)',
+        ],
+        'commands': {'Linux': 'ls -la'},
+        'help': {
+            'description': "Lists all files in the current directory, including hidden ones, with permissions, owner, size and modification time",
+            'parameters': ["-l: long listing format", "-a: include hidden files starting with '.'"],
+            'examples': ["ls -lah (human-readable sizes)", "ls -lt (sort by modification time)"],
+            'risks': ["None - read-only command"],
+            'alternatives': ["tree -L 1", "find . -maxdepth 1"],
+            'related_commands': ["cd", "tree", "find"],
+            'risk_score': 0,
+        },
+    },
+    {
+        'name': 'disk_usage',
+        'patterns': [
+            r'(show|check|display)( me)?( the)?( current)? disk (usage|space)',
+            r'disk (usage|space)',
+            r'how much (free )?disk space( is (left|free|available)| do i have)?',
+        ],
+        'commands': {'Linux': 'df -h'},
+        'help': {
+            'description': "Shows disk space usage for all mounted filesystems in human-readable format",
+            'parameters': ["-h: display sizes in human-readable units (K, M, G)"],
+            'examples': ["df -h ~", "df -h /"],
+            'risks': ["None - read-only command"],
+            'alternatives': ["du -sh * for directory-specific usage"],
+            'related_commands': ["du", "mount"],
+            'risk_score': 1,
+        },
+    },
+    {
+        'name': 'folder_size',
+        'patterns': [
+            r'how (big|large) is (the current|this) (directory|folder)',
+            r'(show|check)( me)? (the )?size of (the current|this) (directory|folder)',
+        ],
+        'commands': {'Linux': 'du -sh .'},
+        'help': {
+            'description': "Shows the total size of the current directory and everything in it",
+            'parameters': ["-s: print only the total", "-h: human-readable sizes"],
+            'examples': ["du -sh ~", "du -sh * (size of each entry)"],
+            'risks': ["Can take a while on very large directory trees"],
+            'alternatives': ["ncdu for an interactive view"],
+            'related_commands': ["df", "ls"],
+            'risk_score': 1,
+        },
+    },
+    {
+        'name': 'running_processes',
+        'patterns': [
+            r'(list|show|check|display)( me)?( all)?( the)?( running| system| active)? processes',
+            r'what(\'s| is) running',
+        ],
+        'commands': {'Linux': 'ps aux'},
+        'help': {
+            'description': "Lists every running process with its owner, CPU and memory usage",
+            'parameters': ["a: processes of all users", "u: user-oriented format", "x: include processes without a terminal"],
+            'examples': ["ps aux | grep python", "ps aux --sort=-%mem | head"],
+            'risks': ["None - read-only command"],
+            'alternatives': ["top", "htop"],
+            'related_commands': ["top", "kill", "pgrep"],
+            'risk_score': 1,
+        },
+    },
+    {
+        'name': 'memory_usage',
+        'patterns': [
+            r'(show|check|display)( me)?( the)? (memory|ram) usage',
+            r'how much (memory|ram)( is (free|used|available)| do i have)?',
+        ],
+        'commands': {'Linux': 'free -h', 'Darwin': 'vm_stat'},
+        'help': {
+            'description': "Shows how much memory is used, free and available",
+            'parameters': ["-h: human-readable sizes (Linux free)"],
+            'examples': ["free -h -s 5 (refresh every 5 seconds)", "vm_stat 5 (macOS, refresh every 5 seconds)"],
+            'risks': ["None - read-only command"],
+            'alternatives': ["top", "htop"],
+            'related_commands': ["top", "ps"],
+            'risk_score': 1,
+        },
+    },
+    {
+        'name': 'current_date',
+        'patterns': [
+            r'(show|display|print)( me)?( the)?( current)? (date|time|date and time)',
+            r'what(\'s| is)( the)?( current)? (date|time|date and time)',
+            r'what time is it',
+        ],
+        'commands': {'Linux': 'date'},
+        'help': {
+            'description': "Prints the current date and time",
+            'parameters': ["+FORMAT: custom output format"],
+            'examples': ["date +%Y-%m-%d", "date -u (UTC)"],
+            'risks': ["None - read-only command"],
+            'alternatives': ["cal"],
+            'related_commands': ["cal", "uptime"],
+            'risk_score': 0,
+        },
+    },
+    {
+        'name': 'current_directory',
+        'patterns': [
+            r'where am i',
+            r'(show|print|display)( me)?( the)? (current|working|current working) (directory|folder)',
+            r'what(\'s| is)( the)? (current|working|current working) (directory|folder)',
+        ],
+        'commands': {'Linux': 'pwd'},
+        'help': {
+            'description': "Prints the full path of the current working directory",
+            'parameters': [],
+            'examples': ["pwd -P (resolve symlinks)"],
+            'risks': ["None - read-only command"],
+            'alternatives': ["echo $PWD"],
+            'related_commands': ["cd", "ls"],
+            'risk_score': 0,
+        },
+    },
+    {
+        'name': 'username',
+        'patterns': [
+            r'who am i',
+            r'(show|what(\'s| is))( me)? my (username|user name)',
+        ],
+        'commands': {'Linux': 'whoami'},
+        'help': {
+            'description': "Prints the name of the current user",
+            'parameters': [],
+            'examples': ["id (user and group IDs)"],
+            'risks': ["None - read-only command"],
+            'alternatives': ["id -un", "echo $USER"],
+            'related_commands': ["id", "groups", "who"],
+            'risk_score': 0,
+        },
+    },
+    {
+        'name': 'uptime',
+        'patterns': [
+            r'(show|check|display)( me)?( the)?( system)? uptime',
+            r'how long has (the|this) (system|computer|machine) been (up|running|on)',
+        ],
+        'commands': {'Linux': 'uptime'},
+        'help': {
+            'description': "Shows how long the system has been running, the number of users and the load averages",
+            'parameters': [],
+            'examples': ["uptime -p (Linux, pretty format)"],
+            'risks': ["None - read-only command"],
+            'alternatives': ["w"],
+            'related_commands': ["w", "top"],
+            'risk_score': 0,
+        },
+    },
+    {
+        'name': 'system_info',
+        'patterns': [
+            r'(show|display|check)( me)?( the)? system (info|information|details)',
+            r'(show|what(\'s| is))( me)?( the)? kernel version',
+        ],
+        'commands': {'Linux': 'uname -a'},
+        'help': {
+            'description': "Prints the kernel name, hostname, kernel release and version, and machine architecture",
+            'parameters': ["-a: print all available information"],
+            'examples': ["uname -r (kernel release only)", "uname -m (architecture only)"],
+            'risks': ["None - read-only command"],
+            'alternatives': ["hostnamectl (Linux)", "sw_vers (macOS)"],
+            'related_commands': ["hostname", "uptime"],
+            'risk_score': 0,
+        },
+    },
+    {
+        'name': 'cpu_info',
+        'patterns': [
+            r'(show|display|check)( me)?( the)? (cpu|processor) (info|information|details)',
+            r'what (cpu|processor) do i have',
+        ],
+        'commands': {'Linux': 'lscpu', 'Darwin': 'sysctl -n machdep.cpu.brand_string'},
+        'help': {
+            'description': "Shows the CPU model and its characteristics",
+            'parameters': [],
+            'examples': ["nproc (number of cores, Linux)", "sysctl -n hw.ncpu (number of cores, macOS)"],
+            'risks': ["None - read-only command"],
+            'alternatives': ["top"],
+            'related_commands': ["nproc", "uname"],
+            'risk_score': 0,
+        },
+    },
+    {
+        'name': 'ip_address',
+        'patterns': [
+            r'(show|display|what(\'s| is))( me)? my (local )?ip( address(es)?)?',
+            r'(show|list)( me)?( the)? network interfaces',
+        ],
+        'commands': {'Linux': 'ip addr show', 'Darwin': 'ifconfig'},
+        'help': {
+            'description': "Shows the network interfaces and their IP addresses",
+            'parameters': [],
+            'examples': ["ip -brief addr (Linux, compact)", "ipconfig getifaddr en0 (macOS, Wi-Fi address)"],
+            'risks': ["None - read-only command"],
+            'alternatives': ["hostname -I (Linux)"],
+            'related_commands': ["ping", "ss", "netstat"],
+            'risk_score': 1,
+        },
+    },
+    {
+        'name': 'network_connectivity',
+        'patterns': [
+            r'(check|test)( the| my)? (network|internet)( connectivity| connection)?',
+            r'am i (online|connected( to the internet)?)',
+        ],
+        'commands': {'Linux': 'ping -c 4 8.8.8.8'},
+        'help': {
+            'description': "Sends four ICMP echo requests to a public DNS server to check internet connectivity",
+            'parameters': ["-c 4: stop after four packets"],
+            'examples': ["ping -c 4 example.com (also checks DNS)"],
+            'risks': ["Sends network traffic to an external host"],
+            'alternatives': ["curl -I https://example.com"],
+            'related_commands': ["traceroute", "curl"],
+            'risk_score': 5,
+        },
+    },
+    {
+        'name': 'listening_ports',
+        'patterns': [
+            r'(show|list|check)( me)?( all)?( the)? (open|listening) ports',
+            r'what ports are (open|listening)',
+        ],
+        'commands': {'Linux': 'ss -tuln', 'Darwin': 'lsof -i -P -n | grep LISTEN'},
+        'help': {
+            'description': "Lists the TCP and UDP ports that programs are listening on",
+            'parameters': ["-t/-u: TCP and UDP sockets", "-l: listening sockets only", "-n: numeric addresses and ports"],
+            'examples': ["ss -tulnp (Linux, include processes)"],
+            'risks': ["None - read-only command; some process names need elevated privileges"],
+            'alternatives': ["netstat -tuln"],
+            'related_commands': ["lsof", "netstat"],
+            'risk_score': 2,
+        },
+    },
+    {
+        'name': 'environment_variables',
+        'patterns': [
+            r'(show|list|print|display)( me)?( all)?( the)?( current)? environment( variables)?',
+        ],
+        'commands': {'Linux': 'env'},
+        'help': {
+            'description': "Prints all environment variables of the current shell",
+            'parameters': [],
+            'examples': ["env | grep PATH", "printenv HOME"],
+            'risks': ["Output may include secrets such as API tokens"],
+            'alternatives': ["printenv"],
+            'related_commands': ["export", "printenv"],
+            'risk_score': 1,
+        },
+    },
+    {
+        'name': 'python_files_here',
+        'patterns': [
+            r'(find|list|show)( me)?( all)?( the)? python files( here| in (the )?(current|this) (directory|folder))?',
+        ],
+        'commands': {'Linux': 'find . -type f -name "*.py"'},
+        'help': {
+            'description': "Finds all Python files in the current directory and its subdirectories",
+            'parameters': ["-type f: regular files only", "-name \"*.py\": match the .py extension"],
+            'examples': ["find . -name \"*.py\" -mtime -1 (changed in the last day)"],
+            'risks': ["None - read-only command"],
+            'alternatives': ["ls **/*.py (with globstar)"],
+            'related_commands': ["grep", "locate"],
+            'risk_score': 0,
+        },
+    },
+    {
+        'name': 'python_files_home',
+        'patterns': [
+            r'(find|list|show)( me)?( all)?( the)? python files in my home( directory| folder)?',
+        ],
+        'commands': {'Linux': 'find ~ -type f -name "*.py"'},
+        'help': {
+            'description': "Finds all Python files in your home directory and its subdirectories",
+            'parameters': ["~: start from the home directory", "-type f: regular files only", "-name \"*.py\": match the .py extension"],
+            'examples': ["find ~ -name \"*.py\" -not -path \"*/.venv/*\" (skip virtualenvs)"],
+            'risks': ["Can take a while on a large home directory"],
+            'alternatives': ["locate '*.py'"],
+            'related_commands': ["grep", "locate"],
+            'risk_score': 0,
+        },
+    },
+]
+
+# Polite prefixes and suffixes that do not change the meaning of a request
+_PREFIX = r'(?:(?:please|can you|could you|would you|kindly|hey)\s+)*'
+_SUFFIX = r'(?:\s+please)?'
+
+
+def _compile(intents):
+    """Combine every intent's patterns into one anchored alternation with a named group per intent"""
+    groups = []
+    for index, intent in enumerate(intents):
+        alternatives = '|'.join(f'(?:{pattern})' for pattern in intent['patterns'])
+        groups.append(f'(?P<i{index}>{alternatives})')
+    return re.compile(f"{_PREFIX}(?:{'|'.join(groups)}){_SUFFIX}")
+
+
+class IntentMatcher:
+    """Answers common requests from command templates, counting hits per intent"""
+
+    def __init__(self, intents=INTENTS):
+        self.intents = intents
+        self._pattern = _compile(intents)
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = {intent['name']: 0 for intent in intents}
+
+    def match(self, user_input, system, record=True):
+        """Return (intent name, CommandOutput fields) for a known request, or None; record=False leaves the counters alone"""
+        match = self._pattern.fullmatch(normalize_input(user_input))
+        intent = self.intents[int(match.lastgroup[1:])] if match else None
+        if record:
+            with self._lock:
+                self.lookups += 1
+                if intent is not None:
+                    self.hits[intent['name']] += 1
+        if intent is None:
+            return None
+
+        commands = intent['commands']
+        return intent['name'], {
+            'command': commands.get(system, commands['Linux']),
+            'requires_sudo': False,
+            'notes': "Answered locally without asking the model",
+            'help': dict(intent['help']),
+        }
+
+    def stats(self):
+        """Return lookup and per-intent hit counters"""
+        with self._lock:
+            hits = dict(self.hits)
+            lookups = self.lookups
+        total = sum(hits.values())
+        return {
+            'lookups': lookups,
+            'hits': total,
+            'misses': lookups - total,
+            'hit_rate': total / lookups if lookups else 0.0,
+            'intents': hits,
+        }
+
+
+_matcher = None
+_matcher_lock = threading.Lock()
+
+
+def get_intent_matcher():
+    """Return the shared intent matcher, or None when it is disabled"""
+    global _matcher
+    if not settings.INTENT_MATCHER_ENABLED:
+        return None
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                _matcher = IntentMatcher()
+    return _matcher
+
+
+def get_intent_stats():
+    """Return intent matcher statistics, including when the matcher is disabled"""
+    matcher = get_intent_matcher()
+    if matcher is None:
+        return {'enabled': False}
+    return {'enabled': True, **matcher.stats()}
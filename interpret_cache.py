@@ -0,0 +1,191 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import settings
+
+
+def normalize_input(user_input):
+    """Normalize a request so trivial variations share a cache entry"""
+    text = re.sub(r'\s+', ' ', user_input.strip().lower())
+    return text.rstrip('.?!')
+
+
+def make_cache_key(user_input, platform_name, distro_info, user_info, model, prompt_version, normalize=True):
+    """Build a cache key from the request and everything that shapes the model's answer"""
+    parts = [
+        normalize_input(user_input) if normalize else user_input,
+        platform_name,
+        hashlib.sha256(str(distro_info).encode('utf-8')).hexdigest(),
+        user_info.get('username', ''),
+        user_info.get('home', ''),
+        model,
+        str(prompt_version),
+    ]
+    return hashlib.sha256(json.dumps(parts).encode('utf-8')).hexdigest()
+
+
+class InterpretationCache:
+    """SQLite-backed cache of interpreted commands with LRU and TTL eviction"""
+
+    def __init__(self, path, max_entries=5000, ttl_seconds=7 * 24 * 3600):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._lock = threading.Lock()
+
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS interpretations (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                generation_seconds REAL NOT NULL DEFAULT 0,
+                hit_count INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self._conn.execute(
+            'CREATE INDEX IF NOT EXISTS idx_interpretations_last_access ON interpretations (last_access)'
+        )
+        self._conn.commit()
+
+    def get(self, key, record=True):
+        """
+        Return the cached output dict for key, or None on a miss.
+
+        With record=False the lookup is left out of the hit/miss and time saved
+        counters, e.g. for speculative lookups of half-typed requests and for help
+        entries; a hit still refreshes the entry's LRU position.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value, created_at, generation_seconds FROM interpretations WHERE key = ?',
+                (key,)
+            ).fetchone()
+            if row is None:
+                if record:
+                    self.misses += 1
+                return None
+
+            value, created_at, generation_seconds = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self._conn.execute('DELETE FROM interpretations WHERE key = ?', (key,))
+                self._conn.commit()
+                if record:
+                    self.misses += 1
+                return None
+
+            self._conn.execute(
+                'UPDATE interpretations SET last_access = ?, hit_count = hit_count + 1 WHERE key = ?',
+                (now, key)
+            )
+            self._conn.commit()
+            if record:
+                self.hits += 1
+                self.saved_seconds += generation_seconds
+
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError:
+            self.delete(key)
+            return None
+
+    def put(self, key, value, generation_seconds=0.0):
+        """Store an output dict and evict the least recently used entries over the limit"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """INSERT OR REPLACE INTO interpretations
+                   (key, value, created_at, last_access, generation_seconds, hit_count)
+                   VALUES (?, ?, ?, ?, ?, 0)""",
+                (key, json.dumps(value), now, now, generation_seconds)
+            )
+            if self.ttl_seconds:
+                self._conn.execute(
+                    'DELETE FROM interpretations WHERE created_at < ?',
+                    (now - self.ttl_seconds,)
+                )
+            if self.max_entries:
+                self._conn.execute(
+                    """DELETE FROM interpretations WHERE key IN (
+                           SELECT key FROM interpretations ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                       )""",
+                    (self.max_entries,)
+                )
+            self._conn.commit()
+
+    def delete(self, key):
+        """Remove a single entry"""
+        with self._lock:
+            self._conn.execute('DELETE FROM interpretations WHERE key = ?', (key,))
+            self._conn.commit()
+
+    def clear(self):
+        """Remove every entry and reset the counters"""
+        with self._lock:
+            self._conn.execute('DELETE FROM interpretations')
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+            self.saved_seconds = 0.0
+
+    def stats(self):
+        """Return hit/miss counters and size information"""
+        with self._lock:
+            entries = self._conn.execute('SELECT COUNT(*) FROM interpretations').fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'enabled': True,
+            'path': self.path,
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'saved_model_seconds': round(self.saved_seconds, 3),
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_interpretation_cache():
+    """Return the shared cache, or None when caching is disabled or unavailable"""
+    global _cache
+    if not settings.CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = InterpretationCache(
+                    settings.CACHE_PATH,
+                    max_entries=settings.CACHE_MAX_ENTRIES,
+                    ttl_seconds=settings.CACHE_TTL_SECONDS
+                )
+            except (sqlite3.Error, OSError) as e:
+                print(f"Warning: interpretation cache disabled: {e}")
+                settings.CACHE_ENABLED = False
+                return None
+        return _cache
+
+
+def get_cache_stats():
+    """Return cache statistics, including when the cache is disabled"""
+    cache = get_interpretation_cache()
+    if cache is None:
+        return {'enabled': False}
+    return cache.stats()
@@ -0,0 +1,155 @@
+import json
+
+
+class StreamingJSONParser:
+    """Incrementally parse a streamed JSON object and report members as they complete.
+
+    Feed text chunks as they arrive; feed() returns a list of (path, value) pairs
+    for every object member whose value has been fully received, where path is a
+    tuple of keys such as ('command',) or ('help', 'risks'). Members nested inside
+    arrays are not reported individually; the enclosing array is reported once closed.
+
+    Text before the first '{' (prose, markdown fences) is skipped. If a balanced
+    {...} turns out not to be valid JSON, scanning restarts after its opening
+    brace. Once `complete` is True the rest of the generation can be discarded.
+    The text is scanned character by character, without regular expressions.
+    """
+
+    def __init__(self):
+        self.buffer = ''
+        self.pos = 0
+        self.stack = []
+        self.in_string = False
+        self.escape = False
+        self.string_start = None
+        self.reading_key = False
+        self.root = None
+
+    @property
+    def complete(self):
+        """True once a valid top-level object has been closed"""
+        return self.root is not None
+
+    def feed(self, chunk):
+        """Consume a chunk of text and return the members completed by it"""
+        self.buffer += chunk
+        completed = []
+        buf = self.buffer
+
+        while self.pos < len(buf) and not self.complete:
+            i = self.pos
+            c = buf[i]
+            self.pos += 1
+
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif c == '\\':
+                    self.escape = True
+                elif c == '"':
+                    self.in_string = False
+                    self._end_string(i, completed)
+                continue
+
+            if not self.stack:
+                # Skip anything before the top-level object starts
+                if c == '{':
+                    self.stack.append(self._new_frame('object', i))
+                continue
+
+            frame = self.stack[-1]
+            if c == '"':
+                self.in_string = True
+                self.string_start = i
+                self.reading_key = frame['type'] == 'object' and frame['expect'] == 'key'
+                if not self.reading_key and frame['value_start'] is None:
+                    frame['value_start'] = i
+            elif c in '{[':
+                if frame['value_start'] is None:
+                    frame['value_start'] = i
+                self.stack.append(self._new_frame('object' if c == '{' else 'array', i))
+            elif c in '}]':
+                self._finish_scalar(frame, i, completed)
+                self.stack.pop()
+                if not self.stack:
+                    root = self._loads(buf[frame['start']:i + 1])
+                    if isinstance(root, dict):
+                        self.root = root
+                    else:
+                        # Not JSON after all; look for the next object after this brace
+                        self.pos = frame['start'] + 1
+                else:
+                    self._finish_member(self.stack[-1], i + 1, completed)
+            elif c == ',':
+                self._finish_scalar(frame, i, completed)
+                frame['expect'] = 'key' if frame['type'] == 'object' else 'value'
+            elif c == ':':
+                frame['expect'] = 'value'
+            elif not c.isspace() and frame['value_start'] is None:
+                frame['value_start'] = i
+
+        return completed
+
+    @staticmethod
+    def _new_frame(kind, start):
+        return {
+            'type': kind,
+            'start': start,
+            'key': None,
+            'value_start': None,
+            'expect': 'key' if kind == 'object' else 'value',
+        }
+
+    @staticmethod
+    def _loads(text):
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            return None
+
+    def _end_string(self, end, completed):
+        frame = self.stack[-1]
+        if self.reading_key:
+            frame['key'] = self._loads(self.buffer[self.string_start:end + 1])
+            frame['expect'] = 'colon'
+            self.reading_key = False
+        elif frame['value_start'] == self.string_start:
+            self._finish_member(frame, end + 1, completed)
+
+    def _finish_scalar(self, frame, end, completed):
+        """Complete a number/true/false/null value terminated by ',' or a closing bracket"""
+        if frame['value_start'] is not None:
+            self._finish_member(frame, end, completed)
+
+    def _finish_member(self, frame, end, completed):
+        start = frame['value_start']
+        frame['value_start'] = None
+        if frame['type'] != 'object' or start is None:
+            return
+        if any(f['type'] != 'object' for f in self.stack):
+            return
+        value = self._loads(self.buffer[start:end].strip())
+        path = tuple(f['key'] for f in self.stack)
+        completed.append((path, value))
+
+
+def extract_json_object(text):
+    """
+    Recover the first valid top-level JSON object from model output.
+
+    Content inside a markdown code fence is preferred, then the whole text is
+    scanned. Returns a dict, or None if no complete object is found.
+    """
+    fence = text.find('```')
+    if fence != -1:
+        start = text.find('\n', fence)
+        end = text.find('```', start + 1) if start != -1 else -1
+        if start != -1 and end != -1:
+            parser = StreamingJSONParser()
+            parser.feed(text[start + 1:end])
+            if parser.complete:
+                return parser.root
+
+    parser = StreamingJSONParser()
+    parser.feed(text)
+    return parser.root if parser.complete else None
@@ -1,113 +1,22 @@
-import os
 import sys
-from flask import Flask, request, render_template, jsonify
-
-# Import our custom modules
-from distro_detector import get_distro_info
-from command_executor import execute_command, is_safe_command, filter_unnecessary_sudo
-from ollama_interface import interpret_command
-from user_info import get_user_info
-
-# Import enhanced CLI
-try:
-    from cli import EnhancedCLI
-    CLI_AVAILABLE = True
-except ImportError:
-    CLI_AVAILABLE = False
-    print("Warning: CLI mode not available. Install required packages: pip install rich colorama")
-
-app = Flask(__name__)
-
-# Get distribution and user info at startup
-DISTRO_INFO = get_distro_info()
-USER_INFO = get_user_info()
-
-print(f"Detected system distribution:\n{DISTRO_INFO}")
-print(f"User information:\n{USER_INFO}")
-
-@app.route('/')
-def index():
-    return render_template('index.html')
-
-@app.route('/interpret', methods=['POST'])
-def interpret():
-    user_input = request.json.get('command', '')
-    print(f"User input (interpret): {user_input}")
-    try:
-        command_output = interpret_command(user_input, DISTRO_INFO, USER_INFO)
-        command = command_output.command
-        notes = command_output.notes
-        if command_output.requires_sudo:
-            if notes:
-                notes = f"This command requires sudo privileges. {notes}"
-            else:
-                notes = "This command requires sudo privileges."
-        print(f"Interpreted command: {command}")
-        print(f"Notes: {notes}")
-        return jsonify({
-            'interpreted_command': command,
-            'notes': notes,
-            'help': {
-                'description': command_output.help.description,
-                'parameters': command_output.help.parameters,
-                'examples': command_output.help.examples,
-                'risks': command_output.help.risks,
-                'alternatives': command_output.help.alternatives,
-                'related_commands': command_output.help.related_commands,
-                'risk_score': command_output.help.risk_score
-            }
-        })
-    except Exception as e:
-        return jsonify({
-            'interpreted_command': f"echo 'Error: {str(e)}'",
-            'notes': f"An error occurred: {str(e)}",
-            'help': {
-                'description': 'Error occurred while interpreting command',
-                'parameters': [],
-                'examples': [],
-                'risks': ['Command may not work as expected'],
-                'alternatives': ['Try rephrasing your request'],
-                'related_commands': [],
-                'risk_score': 0
-            }
-        }), 400
-
-@app.route('/execute', methods=['POST'])
-def execute():
-    shell_command = request.json.get('command', '')
-    print(f"User input (execute): {shell_command}")
-    # Check if command is safe and execute
-    if not is_safe_command(shell_command):
-        result = "This command requires manual intervention for safety reasons."
-    else:
-        result = execute_command(shell_command, USER_INFO)
-    return jsonify({
-        'interpreted_command': shell_command,
-        'result': result
-    })
+import threading
 
-def cli_mode():
-    """CLI mode with colors, animations, and interactive elements"""
-    if not CLI_AVAILABLE:
-        print("CLI mode not available. Please install required packages:")
-        print("pip install rich colorama")
-        return
-    
-    cli = EnhancedCLI(DISTRO_INFO, USER_INFO)
-    cli.run_interactive_mode(interpret_command, execute_command, is_safe_command)
+# Heavy modules (Flask, ollama, pydantic, rich) are imported inside the mode that
+# needs them, so `--help` starts instantly and each mode loads only what it uses.
 
-if __name__ == '__main__':
-    # Check command line arguments
-    if len(sys.argv) > 1:
-        if sys.argv[1] == '--cli':
-            cli_mode()
-        elif sys.argv[1] == '--help':
-            print("""
+HELP_TEXT = """
 Shell Assistant - AI-Powered Command Helper
 
 Usage:
   python main.py                    # Start web interface
   python main.py --cli             # Start CLI mode (with colors and animations)
+  python main.py --batch FILE      # Interpret one request per line of FILE ('-' for stdin) as NDJSON
+  python main.py --interpret "REQUEST" [--fast] [--ndjson]
+                                   # Print the interpreted command as JSON, without the interactive UI
+  python main.py --exec "REQUEST" [--yes] [--fast] [--ndjson] [--timeout SECONDS]
+                                   # Interpret and run the command, printing JSON; see headless.py for exit codes
+  python main.py --daemon          # Keep a warm daemon on a Unix socket for daemon_client.py
+  python main.py --debug           # Start web interface with Flask's debug server and reloader
   python main.py --help            # Show this help message
 
 CLI Mode Features:
@@ -116,12 +25,138 @@ CLI Mode Features:
   • Command history tracking
   • System information display
   • Better error handling and user feedback
-            """)
+"""
+
+def start_warm_up():
+    """Load the model and evaluate the system prompt in the background"""
+    import settings
+    if not settings.WARMUP_ENABLED:
+        return
+
+    def run():
+        from ollama_interface import warm_up
+        from system_context import get_system_context
+        warm_up(*get_system_context())
+
+    threading.Thread(target=run, daemon=True).start()
+
+def interpret_command(user_input, distro_info, user_info, fast=None):
+    """Import the model interface on first use"""
+    from ollama_interface import interpret_command
+    return interpret_command(user_input, distro_info, user_info, fast)
+
+def interpret_command_stream(user_input, distro_info, user_info, fast=None):
+    """Import the model interface on first use"""
+    from ollama_interface import interpret_command_stream
+    return interpret_command_stream(user_input, distro_info, user_info, fast)
+
+def fetch_command_help(command, distro_info, user_info):
+    """Import the model interface on first use"""
+    from ollama_interface import fetch_command_help
+    return fetch_command_help(command, distro_info, user_info)
+
+def web_mode(debug=False):
+    """Serve the web interface, with a production WSGI server unless debugging"""
+    import settings
+    from system_context import get_system_context
+    from worker_pools import shutdown_pools
+    from web_app import app
+
+    distro_info, user_info = get_system_context()
+    print(f"Detected system distribution:\n{distro_info}")
+    print(f"User information:\n{user_info}")
+
+    start_warm_up()
+    if debug:
+        print(f"Starting development server on http://{settings.SERVER_HOST}:{settings.SERVER_PORT}")
+        app.run(host=settings.SERVER_HOST, port=settings.SERVER_PORT, debug=True)
+        return
+
+    print(f"Starting web interface on http://{settings.SERVER_HOST}:{settings.SERVER_PORT}")
+    print(f"Server threads: {settings.SERVER_THREADS}, "
+          f"interpret workers: {settings.INTERPRET_WORKERS}, execute workers: {settings.EXECUTE_WORKERS}")
+    try:
+        try:
+            from waitress import serve
+        except ImportError:
+            print("Warning: waitress not installed, using Flask's threaded server. Install it with: pip install waitress")
+            app.run(host=settings.SERVER_HOST, port=settings.SERVER_PORT,
+                    debug=False, use_reloader=False, threaded=True)
+        else:
+            serve(app, host=settings.SERVER_HOST, port=settings.SERVER_PORT,
+                  threads=settings.SERVER_THREADS)
+    finally:
+        shutdown_pools(wait=False)
+
+def batch_mode(path):
+    """Interpret every line of a file and print NDJSON results in input order"""
+    import json
+    from batch import interpret_batch, read_batch_file
+    from ollama_interface import interpret_command
+    from responses import format_batch_item
+    from system_context import get_system_context
+    from worker_pools import get_interpret_pool, shutdown_pools
+
+    try:
+        requests = read_batch_file(path)
+    except OSError as e:
+        print(f"Cannot read batch file: {e}", file=sys.stderr)
+        return 1
+
+    distro_info, user_info = get_system_context()
+    failures = 0
+    try:
+        results = interpret_batch(requests, interpret_command, distro_info, user_info, get_interpret_pool())
+        for index, user_input, command_output, error in results:
+            if error is not None:
+                failures += 1
+            print(json.dumps(format_batch_item(index, user_input, command_output, error)), flush=True)
+    finally:
+        shutdown_pools(wait=False)
+    return 1 if failures else 0
+
+def cli_mode():
+    """CLI mode with colors, animations, and interactive elements"""
+    try:
+        from cli import EnhancedCLI
+    except ImportError:
+        print("CLI mode not available. Please install required packages:")
+        print("pip install rich colorama")
+        return
+
+    from command_executor import execute_command, execute_command_stream, is_safe_command
+    from system_context import get_system_context
+
+    start_warm_up()
+    cli = EnhancedCLI(*get_system_context())
+    cli.run_interactive_mode(interpret_command, execute_command, is_safe_command,
+                             interpret_stream_func=interpret_command_stream,
+                             execute_stream_func=execute_command_stream,
+                             help_func=fetch_command_help)
+
+if __name__ == '__main__':
+    # Check command line arguments
+    if len(sys.argv) > 1:
+        if sys.argv[1] == '--cli':
+            cli_mode()
+        elif sys.argv[1] == '--batch':
+            if len(sys.argv) < 3:
+                print("Usage: python main.py --batch FILE")
+                sys.exit(2)
+            sys.exit(batch_mode(sys.argv[2]))
+        elif sys.argv[1] in ('--interpret', '--exec'):
+            from headless import run
+            sys.exit(run(sys.argv[1:]))
+        elif sys.argv[1] == '--daemon':
+            from daemon import serve
+            serve()
+        elif sys.argv[1] == '--debug':
+            web_mode(debug=True)
+        elif sys.argv[1] == '--help':
+            print(HELP_TEXT)
         else:
             print(f"Unknown option: {sys.argv[1]}")
             print("Use --help for available options")
     else:
-        print("Starting web interface on http://127.0.0.1:5000")
         print("Use --cli for the interactive CLI mode!")
-        app.run(debug=True)
-
+        web_mode()
@@ -0,0 +1,166 @@
+import math
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+
+import settings
+
+# Histogram bucket upper bounds in seconds, from sub-millisecond checks to long model generations
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Recent samples kept per stage for the percentiles shown in the CLI
+RECENT_SAMPLES = 1024
+
+_METRIC_HELP = {
+    'shell_assist_stage_seconds': ('histogram', "Time spent in each stage of interpreting and executing commands"),
+    'shell_assist_http_request_seconds': ('histogram', "Time to produce an HTTP response, by endpoint"),
+    'shell_assist_model_seconds': ('histogram', "Time spent waiting for each model"),
+    'shell_assist_interpretations_total': ('counter', "Interpretations by where the answer came from"),
+    'shell_assist_coalesced_total': ('counter', "Interpretations answered by sharing an identical in-flight one"),
+    'shell_assist_router_escalations_total': ('counter', "Answers from a smaller model redone by a larger one"),
+}
+
+
+class Histogram:
+    """Cumulative bucket counts plus a window of recent samples"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.recent.append(value)
+
+
+_histograms = {}
+_counters = {}
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def _recording():
+    return settings.METRICS_ENABLED and not getattr(_local, 'suppressed', False)
+
+
+@contextmanager
+def suppressed():
+    """Record nothing from this thread inside the block, e.g. for speculative work"""
+    previous = getattr(_local, 'suppressed', False)
+    _local.suppressed = True
+    try:
+        yield
+    finally:
+        _local.suppressed = previous
+
+
+def observe(stage, seconds, metric='shell_assist_stage_seconds', label='stage'):
+    """Record a duration for a stage"""
+    if not _recording():
+        return
+    key = (metric, label, stage)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = Histogram()
+        histogram.observe(seconds)
+
+
+@contextmanager
+def span(stage):
+    """Time the enclosed block as one observation of `stage`"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - started)
+
+
+def increment(metric, **labels):
+    """Add one to a counter"""
+    if not _recording():
+        return
+    key = (metric, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + 1
+
+
+def reset():
+    """Forget every recorded value"""
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+def _percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    index = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def stage_summary():
+    """Return {stage: {count, mean_ms, p50_ms, p95_ms, p99_ms}} over recent samples"""
+    with _lock:
+        snapshot = {stage: (h.count, h.sum, sorted(h.recent))
+                    for (metric, label, stage), h in _histograms.items()
+                    if metric == 'shell_assist_stage_seconds'}
+    summary = {}
+    for stage, (count, total, recent) in sorted(snapshot.items()):
+        summary[stage] = {
+            'count': count,
+            'mean_ms': total / count * 1000,
+            'p50_ms': _percentile(recent, 50) * 1000,
+            'p95_ms': _percentile(recent, 95) * 1000,
+            'p99_ms': _percentile(recent, 99) * 1000,
+        }
+    return summary
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus():
+    """Render every metric in the Prometheus text exposition format"""
+    with _lock:
+        histograms = sorted((key, list(h.counts), h.sum, h.count) for key, h in _histograms.items())
+        counters = sorted(_counters.items())
+
+    lines = []
+    described = set()
+
+    def describe(metric):
+        if metric not in described:
+            described.add(metric)
+            kind, text = _METRIC_HELP.get(metric, ('untyped', metric))
+            lines.append(f"# HELP {metric} {text}")
+            lines.append(f"# TYPE {metric} {kind}")
+
+    for (metric, label, value), counts, total, count in histograms:
+        describe(metric)
+        label_text = f'{label}="{_escape(value)}"'
+        cumulative = 0
+        for bound, bucket_count in zip(BUCKETS, counts):
+            cumulative += bucket_count
+            lines.append(f'{metric}_bucket{{{label_text},le="{bound}"}} {cumulative}')
+        lines.append(f'{metric}_bucket{{{label_text},le="+Inf"}} {count}')
+        lines.append(f'{metric}_sum{{{label_text}}} {_format_value(total)}')
+        lines.append(f'{metric}_count{{{label_text}}} {count}')
+
+    for (metric, labels), value in counters:
+        describe(metric)
+        label_text = ','.join(f'{name}="{_escape(label_value)}"' for name, label_value in labels)
+        lines.append(f'{metric}{{{label_text}}} {value}' if label_text else f'{metric} {value}')
+
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Mock Ollama server for benchmarks and tests that must not depend on a live model.
+
+Implements the parts of the Ollama HTTP API that shell-assist uses: /api/chat
+(streaming and non-streaming, honouring the requested JSON schema), /api/embed,
+/api/version and /api/tags. Answers are canned; latency before the first token
+and the token rate are configurable so model time can be simulated or removed.
+Optionally, loading a model and evaluating the part of the prompt that differs
+from the previous request take time too, and models are unloaded once their
+keep_alive expires, like Ollama.
+
+Usage:
+  python mock_ollama.py --port 11435 --latency 0.2 --token-rate 100
+  python mock_ollama.py --load-time 2 --prompt-eval-rate 400
+  OLLAMA_HOST=http://127.0.0.1:11435 python main.py --cli
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import socket
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Canned answer; fields are picked according to the schema in the request's 'format'
+CANNED_RESPONSE = {
+    'command': 'ls -la',
+    'requires_sudo': False,
+    'notes': 'Lists files in the current directory',
+    'risk_score': 0,
+    'help': {
+        'description': 'Lists all files in the current directory, including hidden ones',
+        'parameters': ['-l: long listing format', '-a: include hidden files'],
+        'examples': ['ls -lah', 'ls -lt'],
+        'risks': ['None - read-only command'],
+        'alternatives': ['tree -L 1'],
+        'related_commands': ['cd', 'find'],
+        'risk_score': 0,
+    },
+}
+
+EMBEDDING_DIM = 64
+
+# Roughly how many characters make up one token of the simulated output
+CHARS_PER_TOKEN = 4
+
+# Ollama unloads a model this many seconds after its last request unless told otherwise
+DEFAULT_KEEP_ALIVE = 300
+
+_DURATION_UNITS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def response_for_schema(schema, canned=CANNED_RESPONSE):
+    """Shape the canned answer to the properties the request's JSON schema asks for"""
+    if not isinstance(schema, dict) or 'properties' not in schema:
+        return canned
+    properties = schema['properties']
+    if 'command' not in properties and 'description' in properties:
+        # Help-only schema (fetch_command_help)
+        return {key: value for key, value in canned['help'].items() if key in properties}
+    return {key: value for key, value in canned.items() if key in properties}
+
+
+def parse_keep_alive(value):
+    """Seconds a model stays loaded for a request's keep_alive ('30m', 300, 0, -1)"""
+    if value is None:
+        return DEFAULT_KEEP_ALIVE
+    if isinstance(value, str):
+        for unit in ('ms', 's', 'm', 'h'):
+            if value.endswith(unit) and value[:-len(unit)].replace('.', '', 1).isdigit():
+                return float(value[:-len(unit)]) * _DURATION_UNITS[unit]
+        value = float(value)
+    return math.inf if value < 0 else float(value)
+
+
+def _common_prefix(a, b):
+    length = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        length += 1
+    return length
+
+
+def embed_text(text, dim=EMBEDDING_DIM):
+    """Deterministic bag-of-words embedding so identical words give similar vectors"""
+    vector = [0.0] * dim
+    for word in text.lower().split():
+        digest = hashlib.sha256(word.encode('utf-8')).digest()
+        vector[digest[0] % dim] += 1.0 if digest[1] % 2 else -1.0
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [x / norm for x in vector]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        # Like Ollama's Go server, don't hold back small writes (headers, then body) for Nagle's algorithm
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        return json.loads(body) if body else {}
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/api/version':
+            self._send_json({'version': '0.0.0-mock'})
+        elif self.path == '/api/tags':
+            self._send_json({'models': [{'name': name, 'model': name, 'size': 0}
+                                        for name in self.server.models]})
+        elif self.path == '/':
+            self.send_response(200)
+            self.send_header('Content-Length', '17')
+            self.end_headers()
+            self.wfile.write(b'Ollama is running')
+        else:
+            self._send_json({'error': 'not found'}, status=404)
+
+    def do_POST(self):
+        try:
+            request = self._read_json()
+        except ValueError:
+            self._send_json({'error': 'invalid JSON'}, status=400)
+            return
+        self.server.requests += 1
+        if self.path == '/api/chat':
+            self._chat(request)
+        elif self.path in ('/api/embed', '/api/embeddings'):
+            self._embed(request)
+        else:
+            self._send_json({'error': 'not found'}, status=404)
+
+    def _chat(self, request):
+        server = self.server
+        messages = request.get('messages') or []
+        prompt = ''.join(f"{m.get('role')}:{m.get('content') or ''}\n" for m in messages)
+        prompt_chars = len(prompt)
+        model = request.get('model', '')
+        keep_alive = parse_keep_alive(request.get('keep_alive'))
+        load_ns, cached_chars = server.load(model, prompt, keep_alive)
+        if not messages:
+            # Ollama loads (or with keep_alive 0 unloads) the model and returns straight away
+            self._send_json({'model': model, 'created_at': _now(),
+                             'message': {'role': 'assistant', 'content': ''}, 'done': True,
+                             'done_reason': 'unload' if keep_alive == 0 else 'load',
+                             'load_duration': load_ns})
+            return
+        content = json.dumps(response_for_schema(request.get('format'), server.canned))
+        num_predict = (request.get('options') or {}).get('num_predict')
+        if num_predict is not None and num_predict >= 0:
+            content = content[:num_predict * CHARS_PER_TOKEN]
+        tokens = [content[i:i + CHARS_PER_TOKEN] for i in range(0, len(content), CHARS_PER_TOKEN)]
+
+        started = time.perf_counter()
+        if server.latency:
+            time.sleep(server.latency)
+        # Like Ollama, only the part of the prompt after the cached prefix is evaluated
+        evaluated_tokens = (prompt_chars - cached_chars) // CHARS_PER_TOKEN
+        if server.prompt_eval_rate:
+            time.sleep(evaluated_tokens / server.prompt_eval_rate)
+        prompt_eval_ns = int((time.perf_counter() - started) * 1e9)
+        stats = {
+            'prompt_eval_count': evaluated_tokens,
+            'prompt_eval_duration': prompt_eval_ns,
+            'eval_count': len(tokens),
+            'load_duration': load_ns,
+        }
+
+        if request.get('stream', True) is False:
+            if server.token_rate:
+                time.sleep(len(tokens) / server.token_rate)
+            total_ns = int((time.perf_counter() - started) * 1e9)
+            self._send_json({
+                'model': model, 'created_at': _now(),
+                'message': {'role': 'assistant', 'content': content},
+                'done': True, 'done_reason': 'stop',
+                'total_duration': total_ns, 'eval_duration': total_ns - prompt_eval_ns, **stats,
+            })
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        try:
+            for token in tokens:
+                if server.token_rate:
+                    time.sleep(1.0 / server.token_rate)
+                self._write_chunk({'model': model, 'created_at': _now(),
+                                   'message': {'role': 'assistant', 'content': token}, 'done': False})
+            total_ns = int((time.perf_counter() - started) * 1e9)
+            self._write_chunk({'model': model, 'created_at': _now(),
+                               'message': {'role': 'assistant', 'content': ''},
+                               'done': True, 'done_reason': 'stop', 'total_duration': total_ns,
+                               'eval_duration': total_ns - prompt_eval_ns, **stats})
+            self.wfile.write(b'0\r\n\r\n')
+        except (BrokenPipeError, ConnectionResetError):
+            # The client stopped reading, e.g. once the JSON object was complete
+            self.close_connection = True
+
+    def _write_chunk(self, payload):
+        line = json.dumps(payload).encode('utf-8') + b'\n'
+        self.wfile.write(f'{len(line):x}\r\n'.encode('ascii') + line + b'\r\n')
+        self.wfile.flush()
+
+    def _embed(self, request):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        inputs = request.get('input', request.get('prompt', ''))
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        embeddings = [embed_text(text) for text in inputs]
+        if self.path == '/api/embeddings':
+            self._send_json({'embedding': embeddings[0]})
+        else:
+            self._send_json({'model': request.get('model', ''), 'embeddings': embeddings})
+
+
+class MockOllamaServer(ThreadingHTTPServer):
+    """Threaded mock Ollama server; use as a context manager to run it in the background"""
+
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, token_rate=0.0,
+                 canned=CANNED_RESPONSE, models=('deepseek-coder:6.7b', 'nomic-embed-text'),
+                 load_time=0.0, prompt_eval_rate=0.0):
+        super().__init__((host, port), _Handler)
+        self.latency = latency
+        self.token_rate = token_rate
+        self.load_time = load_time
+        self.prompt_eval_rate = prompt_eval_rate
+        # model -> (monotonic time it is unloaded, prompt whose evaluation is cached)
+        self.loaded = {}
+        self._loaded_lock = threading.Lock()
+        self.canned = canned
+        self.models = list(models)
+        self.requests = 0
+        self.connections = 0
+        self._thread = None
+
+    def load(self, model, prompt, keep_alive):
+        """
+        Make sure a model is loaded for a request, keeping it for `keep_alive` seconds.
+
+        Returns (load time in ns, number of prompt characters already evaluated).
+        """
+        now = time.monotonic()
+        with self._loaded_lock:
+            expires, cached_prompt = self.loaded.get(model, (0.0, ''))
+            is_loaded = expires > now
+            if keep_alive == 0:
+                self.loaded.pop(model, None)
+            else:
+                self.loaded[model] = (now + keep_alive, prompt or cached_prompt if is_loaded else prompt)
+        if is_loaded or (keep_alive == 0 and not prompt):
+            return 0, _common_prefix(prompt, cached_prompt) if is_loaded else 0
+        started = time.perf_counter()
+        if self.load_time:
+            time.sleep(self.load_time)
+        return int((time.perf_counter() - started) * 1e9), 0
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def handle_error(self, request, client_address):
+        # Clients dropping keep-alive connections is expected; report anything else
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Ollama server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=11435)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help="seconds before the first token (simulated prompt evaluation)")
+    parser.add_argument('--token-rate', type=float, default=0.0,
+                        help="output tokens per second (0 = as fast as possible)")
+    parser.add_argument('--load-time', type=float, default=0.0,
+                        help="seconds to load a model that is not loaded")
+    parser.add_argument('--prompt-eval-rate', type=float, default=0.0,
+                        help="prompt tokens evaluated per second past the cached prefix (0 = instant)")
+    args = parser.parse_args()
+
+    server = MockOllamaServer(args.host, args.port, latency=args.latency, token_rate=args.token_rate,
+                              load_time=args.load_time, prompt_eval_rate=args.prompt_eval_rate)
+    print(f"Mock Ollama listening on {server.url} (latency {args.latency}s, "
+          f"token rate {args.token_rate or 'unlimited'}/s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
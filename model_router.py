@@ -0,0 +1,121 @@
+import re
+import threading
+
+import settings
+
+# Words that signal a multi-step or conditional request
+_COMPLEX_WORDS = re.compile(
+    r"\b(and|then|but|except|unless|each|every|recursive(ly)?|older|newer|larger|bigger|smaller|"
+    r"than|between|sort(ed)?|replace|rename|extract|pipe|count|only|without|excluding|whose|which|"
+    r"if|while|loop|script|all|modified|containing)\b"
+)
+
+# Characters that usually come with paths, patterns or shell syntax
+_COMPLEX_CHARS = re.compile(r"[|<>\"'/*$`;&]")
+
+# Placeholders a model writes when it did not know what to put in the command
+_PLACEHOLDER = re.compile(r"<[A-Za-z_-]+>|\bpath/to\b|\byour[_-]\w+|\bexample\.com\b")
+
+
+def estimate_complexity(user_input):
+    """Score how hard a request is; 0 is a short single-step request"""
+    words = user_input.split()
+    score = len(words) // 6
+    score += len(_COMPLEX_WORDS.findall(user_input.lower()))
+    score += len(_COMPLEX_CHARS.findall(user_input))
+    return score
+
+
+def escalation_reason(command_output, max_risk):
+    """Return why a small model's answer should be redone by a larger model, or None"""
+    from command_executor import find_missing_programs, is_safe_command
+
+    command = command_output.command.strip()
+    if not command or _PLACEHOLDER.search(command) or find_missing_programs(command):
+        return 'low_confidence'
+    if command_output.help.risk_score >= max_risk or not is_safe_command(command):
+        return 'high_risk'
+    return None
+
+
+class ModelRouter:
+    """
+    Picks the model for a request from a pool ordered from smallest to largest.
+
+    Requests scoring at most `max_simple_score` start with the smallest model and
+    move up the pool whenever the answer is unparseable, low confidence or high
+    risk; everything else goes straight to the largest model.
+    """
+
+    def __init__(self, models, max_simple_score=1, max_risk=7):
+        self.models = list(models)
+        self.max_simple_score = max_simple_score
+        self.max_risk = max_risk
+        self._lock = threading.Lock()
+        self._stats = {model: {'requests': 0, 'seconds': 0.0, 'escalations': 0, 'reasons': {}}
+                       for model in self.models}
+
+    @property
+    def largest(self):
+        return self.models[-1]
+
+    def candidates(self, user_input):
+        """Return the models to try for a request, in order"""
+        if estimate_complexity(user_input) <= self.max_simple_score:
+            return self.models
+        return [self.largest]
+
+    def review(self, command_output):
+        """Return why an answer should be escalated, or None to accept it"""
+        return escalation_reason(command_output, self.max_risk)
+
+    def record(self, model, seconds, reason=None):
+        """Count a request answered (reason None) or escalated by a model"""
+        with self._lock:
+            stats = self._stats.setdefault(model, {'requests': 0, 'seconds': 0.0, 'escalations': 0, 'reasons': {}})
+            stats['requests'] += 1
+            stats['seconds'] += seconds
+            if reason is not None:
+                stats['escalations'] += 1
+                stats['reasons'][reason] = stats['reasons'].get(reason, 0) + 1
+
+    def stats(self):
+        """Return latency and escalation rates per model"""
+        with self._lock:
+            result = {}
+            for model, stats in self._stats.items():
+                requests = stats['requests']
+                result[model] = {
+                    'requests': requests,
+                    'mean_seconds': stats['seconds'] / requests if requests else 0.0,
+                    'escalations': stats['escalations'],
+                    'escalation_rate': stats['escalations'] / requests if requests else 0.0,
+                    'reasons': dict(stats['reasons']),
+                }
+            return result
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_model_router():
+    """Return the shared router, or None when routing is disabled"""
+    global _router
+    if not settings.ROUTER_ENABLED:
+        return None
+    with _router_lock:
+        if _router is None:
+            models = [m for m in settings.ROUTER_SMALL_MODELS if m != settings.OLLAMA_MODEL]
+            _router = ModelRouter(models + [settings.OLLAMA_MODEL],
+                                  max_simple_score=settings.ROUTER_MAX_SIMPLE_SCORE,
+                                  max_risk=settings.ROUTER_ESCALATE_RISK)
+        return _router
+
+
+def get_router_stats():
+    """Return per-model routing statistics, including when routing is disabled"""
+    router = get_model_router()
+    if router is None:
+        return {'enabled': False}
+    return {'enabled': True, 'models': router.stats()}
@@ -0,0 +1,112 @@
+import threading
+
+import settings
+
+
+def normalize_chat_response(response):
+    """
+    Flatten an Ollama chat response or stream chunk into a plain dict.
+
+    Returns {'content', 'done', 'prompt_eval_count', 'prompt_eval_duration',
+    'eval_count', 'load_duration', 'total_duration'}; counters are None when
+    Ollama did not send them.
+    """
+    message = response.get('message')
+    if isinstance(message, str):
+        content = message
+    elif message is not None:
+        content = message.get('content')
+    else:
+        content = response.get('response')
+    normalized = {'content': content or '', 'done': bool(response.get('done'))}
+    for key in ('prompt_eval_count', 'prompt_eval_duration', 'eval_count', 'load_duration', 'total_duration'):
+        normalized[key] = response.get(key)
+    return normalized
+
+
+def _normalized_stream(stream):
+    """Normalize each chunk of a streamed chat; closing it closes the HTTP response"""
+    try:
+        for chunk in stream:
+            yield normalize_chat_response(chunk)
+    finally:
+        stream.close()
+
+
+class OllamaClient:
+    """
+    One persistent HTTP client for every Ollama call.
+
+    The underlying httpx pool is thread-safe, so Flask worker threads share
+    kept-alive connections instead of opening one per request. Connecting fails
+    after `connect_timeout`; `read_timeout` bounds the wait for each piece of
+    the response rather than the whole generation.
+    """
+
+    def __init__(self, host=None, connect_timeout=5.0, read_timeout=120.0, max_connections=16):
+        # Imported here so requests answered without a model never load the HTTP stack
+        import httpx
+        import ollama
+
+        self.host = host
+        self._client = ollama.Client(
+            host=host,
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    def chat(self, model, messages, stream=False, **kwargs):
+        """Send a chat request; returns a normalized dict, or an iterator of them when streaming"""
+        response = self._client.chat(model=model, messages=messages, stream=stream, **kwargs)
+        if stream:
+            return _normalized_stream(response)
+        return normalize_chat_response(response)
+
+    def list_models(self):
+        """Return the names of the models available on the server"""
+        return [model.model for model in self._client.list().models]
+
+    def embed(self, model, input, **kwargs):
+        """Return one embedding vector per input text"""
+        return list(self._client.embed(model=model, input=input, **kwargs)['embeddings'])
+
+    def close(self):
+        self._client.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_ollama_client():
+    """Return the shared client, or a load-balancing pool when several hosts are configured"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            if len(settings.OLLAMA_HOSTS) > 1:
+                from backend_pool import BackendPool
+                _client = BackendPool(settings.OLLAMA_HOSTS, settings.OLLAMA_CONNECT_TIMEOUT,
+                                      settings.OLLAMA_READ_TIMEOUT, settings.OLLAMA_MAX_CONNECTIONS,
+                                      settings.OLLAMA_PROBE_INTERVAL, settings.OLLAMA_PROBE_TIMEOUT).start()
+            else:
+                _client = OllamaClient(settings.OLLAMA_HOSTS[0] if settings.OLLAMA_HOSTS else settings.OLLAMA_HOST,
+                                       settings.OLLAMA_CONNECT_TIMEOUT, settings.OLLAMA_READ_TIMEOUT,
+                                       settings.OLLAMA_MAX_CONNECTIONS)
+        return _client
+
+
+def get_backend_stats():
+    """Return per-backend health and load when several Ollama hosts are load balanced"""
+    client = get_ollama_client()
+    if not hasattr(client, 'backends'):
+        return {'enabled': False, 'host': client.host}
+    return {'enabled': True, 'backends': client.stats()}
+
+
+def close_ollama_client():
+    """Close the shared client's connections; the next call creates a new one"""
+    global _client
+    with _client_lock:
+        client, _client = _client, None
+    if client is not None:
+        client.close()
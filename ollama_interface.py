@@ -1,8 +1,24 @@
-import ollama
 from pydantic import BaseModel, Field
 import json
 import platform
-import re
+import threading
+import time
+
+import metrics
+import settings
+from interpret_cache import get_interpretation_cache, make_cache_key
+from intent_matcher import get_intent_matcher
+from semantic_cache import get_semantic_cache
+from model_router import get_model_router
+from singleflight import get_single_flight
+from ollama_client import get_ollama_client
+from json_extractor import StreamingJSONParser, extract_json_object
+
+# Bump whenever the system prompt or schema changes so cached answers are not reused
+PROMPT_VERSION = 1
+
+# Chunks read after the answer's JSON object closes, waiting for Ollama's final statistics
+TRAILING_CHUNKS = 4
 
 class CommandHelp(BaseModel):
     """Schema for detailed command help information"""
@@ -21,14 +37,150 @@ class CommandOutput(BaseModel):
     notes: str = Field(default="", description="Optional notes about the command execution")
     help: CommandHelp = Field(default_factory=lambda: CommandHelp(), description="Detailed help information for the command")
 
-def interpret_command(user_input, distro_info, user_info):
+class CommandSummary(BaseModel):
+    """Schema for fast mode, where the help is fetched separately on demand"""
+    command: str = Field(description="The exact shell command to execute without any conversational text")
+    requires_sudo: bool = Field(default=False, description="Whether this command requires sudo privileges")
+    risk_score: int = Field(default=0, description="Risk score from 0-10, where 0 is safe and 10 is extremely dangerous")
+
+# The schemas never change, so build them once rather than on every request
+COMMAND_OUTPUT_SCHEMA = CommandOutput.model_json_schema()
+COMMAND_SUMMARY_SCHEMA = CommandSummary.model_json_schema()
+COMMAND_HELP_SCHEMA = CommandHelp.model_json_schema()
+
+_system_prompts = {}
+_system_prompts_lock = threading.Lock()
+
+# Prompt evaluation statistics reported by Ollama, used to check prefix reuse
+_prompt_eval_stats = {'requests': 0, 'prompt_tokens': 0, 'prompt_eval_ns': 0, 'last': None}
+_prompt_eval_lock = threading.Lock()
+
+def get_system_prompt(system, distro_info, user_info, fast=False):
     """
-    Interpret natural language input and convert it to a shell command
-    using structured output to ensure clean command responses.
+    Return the system prompt for this platform and user, building it only once.
+
+    The prompt is byte-for-byte identical across requests so Ollama can reuse the
+    evaluated prefix from its KV cache while the model stays loaded.
     """
-    system = platform.system()
-    
-    # Create platform-specific system prompt
+    key = (system, str(distro_info), user_info['username'], user_info['home'],
+           tuple(user_info['folders'].keys()), fast)
+    return _cached_prompt(key, lambda: _build_system_prompt(system, distro_info, user_info, fast))
+
+def get_help_prompt(system, distro_info):
+    """Return the system prompt used to explain a command, building it only once"""
+    key = ('help', system, str(distro_info))
+    return _cached_prompt(key, lambda: _build_help_prompt(system, distro_info))
+
+def _cached_prompt(key, build):
+    prompt = _system_prompts.get(key)
+    if prompt is None:
+        with _system_prompts_lock:
+            prompt = _system_prompts.get(key)
+            if prompt is None:
+                prompt = build()
+                _system_prompts[key] = prompt
+    return prompt
+
+def _record_prompt_eval(response):
+    """Record prompt evaluation counters from a final normalized Ollama response or stream chunk"""
+    count = response['prompt_eval_count']
+    duration = response['prompt_eval_duration']
+    if count is None or duration is None:
+        return
+    with _prompt_eval_lock:
+        _prompt_eval_stats['requests'] += 1
+        _prompt_eval_stats['prompt_tokens'] += count
+        _prompt_eval_stats['prompt_eval_ns'] += duration
+        _prompt_eval_stats['last'] = {'prompt_tokens': count, 'prompt_eval_ms': duration / 1e6}
+
+def get_prompt_eval_stats():
+    """Return cumulative prompt evaluation statistics"""
+    with _prompt_eval_lock:
+        stats = dict(_prompt_eval_stats)
+    requests = stats['requests']
+    stats['mean_prompt_eval_ms'] = stats['prompt_eval_ns'] / requests / 1e6 if requests else 0.0
+    return stats
+
+def _chat(system_prompt, user_input, schema=COMMAND_OUTPUT_SCHEMA, model=None, **kwargs):
+    """Send a chat request with the stable system prompt first and keep the model loaded"""
+    return get_ollama_client().chat(
+        model=model or settings.OLLAMA_MODEL,
+        messages=[
+            {'role': 'system', 'content': system_prompt},
+            {'role': 'user', 'content': user_input}
+        ],
+        format=schema,
+        keep_alive=settings.OLLAMA_KEEP_ALIVE,
+        **kwargs
+    )
+
+def warm_up(distro_info, user_info):
+    """Build the system prompt and have Ollama load the models and evaluate the prompt prefix"""
+    system_prompt = get_system_prompt(platform.system(), distro_info, user_info, settings.FAST_MODE)
+    router = get_model_router()
+    for model in (router.models if router is not None else [settings.OLLAMA_MODEL]):
+        try:
+            get_ollama_client().chat(
+                model=model,
+                messages=[{'role': 'system', 'content': system_prompt}],
+                keep_alive=settings.OLLAMA_KEEP_ALIVE,
+                options={'num_predict': 1}
+            )
+        except Exception as e:
+            print(f"Warning: warm-up of {model} failed: {e}")
+
+_RISK_SCALE = """     * 0-2: Safe commands (read-only, basic info)
+     * 3-4: Low risk (file operations in user space)
+     * 5-6: Medium risk (system queries, network access)
+     * 7-8: High risk (system modifications, package installs)
+     * 9-10: Extreme risk (system-critical operations, data deletion)"""
+
+_HELP_ANSWER_RULE = """ALWAYS provide detailed help information including:
+   - Clear description of what the command does
+   - Key parameters and their purposes
+   - Example variations
+   - Potential risks
+   - Alternative approaches
+   - Related commands
+   - Risk score (0-10) where:
+""" + _RISK_SCALE
+
+_FAST_ANSWER_RULE = """Keep the answer short: only the command, whether it needs sudo and a risk score (0-10) where:
+""" + _RISK_SCALE
+
+_FULL_RESPONSE_FORMAT = """Respond ONLY with a valid JSON object matching this exact schema:
+{
+  "command": "the exact shell command to execute",
+  "requires_sudo": false,
+  "notes": "{notes}",
+  "help": {
+    "description": "detailed description of what the command does and why it's useful",
+    "parameters": ["list of key parameters and their purposes"],
+    "examples": ["example variations of the command"],
+    "risks": ["potential risks or side effects"],
+    "alternatives": ["alternative commands or approaches"],
+    "related_commands": ["related commands that might be useful"],
+    "risk_score": 0
+  }
+}"""
+
+_FAST_RESPONSE_FORMAT = """Respond ONLY with a valid JSON object matching this exact schema:
+{
+  "command": "the exact shell command to execute",
+  "requires_sudo": false,
+  "risk_score": 0
+}"""
+
+def _build_system_prompt(system, distro_info, user_info, fast=False):
+    """Build the platform-specific system prompt, asking only for the essentials in fast mode"""
+    if fast:
+        answer_rule = _FAST_ANSWER_RULE
+        response_format = _FAST_RESPONSE_FORMAT
+    else:
+        answer_rule = _HELP_ANSWER_RULE
+        notes = "brief explanation of what the command does" if system == "Darwin" else "optional explanation"
+        response_format = _FULL_RESPONSE_FORMAT.replace('{notes}', notes)
+
     if system == "Darwin":  # macOS
         system_prompt = f"""You are a macOS command generator that converts natural language to precise shell commands.
 
@@ -65,35 +217,9 @@ CRITICAL RULES FOR macOS COMMANDS:
 
 4. NEVER use sudo unless absolutely necessary for system modifications.
 
-5. ALWAYS provide detailed help information including:
-   - Clear description of what the command does
-   - Key parameters and their purposes
-   - Example variations
-   - Potential risks
-   - Alternative approaches
-   - Related commands
-   - Risk score (0-10) where:
-     * 0-2: Safe commands (read-only, basic info)
-     * 3-4: Low risk (file operations in user space)
-     * 5-6: Medium risk (system queries, network access)
-     * 7-8: High risk (system modifications, package installs)
-     * 9-10: Extreme risk (system-critical operations, data deletion)
+5. {answer_rule}
 
-Respond ONLY with a valid JSON object matching this exact schema:
-{{
-  "command": "the exact shell command to execute",
-  "requires_sudo": false,
-  "notes": "brief explanation of what the command does",
-  "help": {{
-    "description": "detailed description of what the command does and why it's useful",
-    "parameters": ["list of key parameters and their purposes"],
-    "examples": ["example variations of the command"],
-    "risks": ["potential risks or side effects"],
-    "alternatives": ["alternative commands or approaches"],
-    "related_commands": ["related commands that might be useful"],
-    "risk_score": 0
-  }}
-}}
+{response_format}
 
 NO markdown, NO explanations, NO code blocks - ONLY the JSON object."""
 
@@ -113,7 +239,23 @@ IMPORTANT RULES FOR LINUX:
 2. Only mark requires_sudo as true when absolutely necessary (system modifications, package installs, etc.)
 3. Use appropriate Linux commands and tools
 4. Prefer user-space operations over system operations
-5. ALWAYS provide detailed help information including:
+5. {answer_rule}
+
+{response_format}
+
+NO markdown, NO explanations, NO code blocks - ONLY the JSON object."""
+
+    return system_prompt
+
+def _build_help_prompt(system, distro_info):
+    """Build the prompt used to explain a single command on demand"""
+    platform_name = "macOS" if system == "Darwin" else "Linux"
+    return f"""You are a {platform_name} shell expert who explains shell commands.
+
+System information:
+{distro_info}
+
+The user sends a single shell command. Explain it with:
    - Clear description of what the command does
    - Key parameters and their purposes
    - Example variations
@@ -121,110 +263,377 @@ IMPORTANT RULES FOR LINUX:
    - Alternative approaches
    - Related commands
    - Risk score (0-10) where:
-     * 0-2: Safe commands (read-only, basic info)
-     * 3-4: Low risk (file operations in user space)
-     * 5-6: Medium risk (system queries, network access)
-     * 7-8: High risk (system modifications, package installs)
-     * 9-10: Extreme risk (system-critical operations, data deletion)
+{_RISK_SCALE}
 
 Respond ONLY with a valid JSON object matching this exact schema:
 {{
-  "command": "the exact shell command to execute",
-  "requires_sudo": false,
-  "notes": "optional explanation",
-  "help": {{
-    "description": "detailed description of what the command does and why it's useful",
-    "parameters": ["list of key parameters and their purposes"],
-    "examples": ["example variations of the command"],
-    "risks": ["potential risks or side effects"],
-    "alternatives": ["alternative commands or approaches"],
-    "related_commands": ["related commands that might be useful"],
-    "risk_score": 0
-  }}
+  "description": "detailed description of what the command does and why it's useful",
+  "parameters": ["list of key parameters and their purposes"],
+  "examples": ["example variations of the command"],
+  "risks": ["potential risks or side effects"],
+  "alternatives": ["alternative commands or approaches"],
+  "related_commands": ["related commands that might be useful"],
+  "risk_score": 0
 }}
 
 NO markdown, NO explanations, NO code blocks - ONLY the JSON object."""
 
+def _parse_content(content):
+    """Parse model output into a dict, returning (parsed_content, cacheable)"""
+    cacheable = True
+    if isinstance(content, str):
+        try:
+            parsed_content = json.loads(content)
+        except json.JSONDecodeError:
+            # If content is not valid JSON, try to extract it
+            # Sometimes the model wraps JSON in markdown code blocks or prose
+            parsed_content = extract_json_object(content)
+            if parsed_content is None:
+                # If no JSON found, create a fallback response
+                cacheable = False
+                parsed_content = {
+                    "command": f"echo 'Unable to parse command from: {content[:100]}...'",
+                    "requires_sudo": False,
+                    "notes": "Failed to parse model response as JSON",
+                    "help": {
+                        "description": "This is a fallback command due to parsing issues",
+                        "parameters": [],
+                        "examples": [],
+                        "risks": ["Command may not work as expected"],
+                        "alternatives": ["Try rephrasing your request"],
+                        "related_commands": [],
+                        "risk_score": 0
+                    }
+                }
+    else:
+        parsed_content = content
+
+    return parsed_content, cacheable
+
+def _answering_models():
+    """Identify the model, or routed pool of models, whose answers are cached"""
+    router = get_model_router()
+    if router is None:
+        return settings.OLLAMA_MODEL
+    return ','.join(router.models)
+
+def _interpretation_key(user_input, system, distro_info, user_info, fast=False):
+    """Key identifying requests that get the same answer"""
+    prompt_version = f"{PROMPT_VERSION}-fast" if fast else PROMPT_VERSION
+    return make_cache_key(user_input, system, distro_info, user_info, _answering_models(), prompt_version)
+
+def _lookup_cache(user_input, system, distro_info, user_info, fast=False, record=True):
+    """Return (cache, cache_key, cached CommandOutput or None)"""
+    cache = get_interpretation_cache()
+    if cache is None:
+        return None, None, None
+
+    cache_key = _interpretation_key(user_input, system, distro_info, user_info, fast)
+    cached = cache.get(cache_key, record=record)
+    if cached is not None:
+        try:
+            return cache, cache_key, CommandOutput(**cached)
+        except Exception:
+            cache.delete(cache_key)
+    return cache, cache_key, None
+
+def _lookup_semantic_cache(user_input, system, distro_info, user_info, fast=False, record=True):
+    """Return (semantic cache, context, request vector, cached CommandOutput or None)"""
+    semantic = get_semantic_cache()
+    if semantic is None:
+        return None, None, None, None
+
+    prompt_version = f"{PROMPT_VERSION}-fast" if fast else PROMPT_VERSION
+    # The key of an empty request identifies everything but the request itself
+    context = make_cache_key('', system, distro_info, user_info, _answering_models(), prompt_version)
     try:
-        # Get the schema for structured output
-        schema = CommandOutput.model_json_schema()
-        
-        # Call Ollama with structured output
-        response = ollama.chat(
-            model='deepseek-coder:6.7b',
-            messages=[
-                {'role': 'system', 'content': system_prompt},
-                {'role': 'user', 'content': user_input}
-            ],
-            format=schema
-        )
-        
-        # Handle different response formats (compatibility fix)
-        content = None
-        
-        # Try new API format first (ollama >= 0.4.0)
-        if hasattr(response, 'message') and hasattr(response.message, 'content'):
-            content = response.message.content
-        # Try alternative new API format
-        elif hasattr(response, 'message') and isinstance(response.message, dict):
-            content = response.message.get('content')
-        # Try old API format (ollama <= 0.1.x) - Dictionary response
-        elif isinstance(response, dict):
-            if 'message' in response and isinstance(response['message'], dict):
-                content = response['message'].get('content')
-            elif 'message' in response and isinstance(response['message'], str):
-                content = response['message']
-            elif 'content' in response:
-                content = response['content']
-            elif 'response' in response:  # Some versions use 'response' key
-                content = response['response']
-            else:
-                # Last resort - try to extract any text content
-                content = str(response)
-        else:
-            # Fallback for unknown formats
-            content = str(response)
+        vector = semantic.embed(user_input)
+    except Exception as e:
+        print(f"Warning: semantic cache lookup failed: {e}")
+        return None, None, None, None
+
+    found = semantic.search(vector, context, user_input, record=record)
+    if found is not None:
+        try:
+            return semantic, context, vector, CommandOutput(**found[0])
+        except Exception:
+            pass
+    return semantic, context, vector, None
+
+def interpret_command(user_input, distro_info, user_info, fast=None):
+    """
+    Interpret natural language input and convert it to a shell command
+    using structured output to ensure clean command responses.
+
+    In fast mode only the command, requires_sudo and the risk score are generated;
+    the rest of the help is left empty for fetch_command_help to fill in on demand.
+    """
+    for event, data in interpret_command_stream(user_input, distro_info, user_info, fast):
+        if event == 'done':
+            return data
+    raise ValueError("Model did not return valid output")
+
+def _replay_events(command_output):
+    """Yield the stream events for an already complete CommandOutput"""
+    yield 'command', {'command': command_output.command, 'elapsed': 0.0}
+    yield 'field', {'field': 'requires_sudo', 'value': command_output.requires_sudo}
+    yield 'field', {'field': 'notes', 'value': command_output.notes}
+    for name, value in command_output.help.model_dump().items():
+        yield 'field', {'field': f'help.{name}', 'value': value}
+    yield 'done', command_output
+
+def _to_command_output(parsed_content, fast):
+    """Build a CommandOutput, lifting the top-level risk score of a fast mode answer into help"""
+    if fast and 'help' not in parsed_content:
+        summary = CommandSummary(**parsed_content)
+        return CommandOutput(command=summary.command,
+                             requires_sudo=summary.requires_sudo,
+                             help=CommandHelp(description="", risk_score=summary.risk_score))
+    return CommandOutput(**parsed_content)
+
+def interpret_command_stream(user_input, distro_info, user_info, fast=None, speculative=False):
+    """
+    Streaming variant of interpret_command.
 
-        # Parse the JSON content
-        if isinstance(content, str):
+    Yields (event, data) tuples as the model generates its answer:
+      ('command', {'command': ..., 'elapsed': seconds}) as soon as the command is complete
+      ('field', {'field': 'notes' | 'help.risks' | ..., 'value': ...}) for each later field
+      ('done', CommandOutput) once the full answer has been validated
+
+    A speculative interpretation of a partially typed request counts no cache or
+    intent lookups, is not shared with identical requests and stores nothing.
+    Instead a model answer is preceded by ('store', callable); calling it puts the
+    answer in the caches, for when the speculation turns out to be used.
+    """
+    if fast is None:
+        fast = settings.FAST_MODE
+    system = platform.system()
+    record = not speculative
+
+    matcher = get_intent_matcher()
+    if matcher is not None:
+        with metrics.span('interpret.intent_match'):
+            matched = matcher.match(user_input, system, record=record)
+        if matched is not None:
+            metrics.increment('shell_assist_interpretations_total', source='intent')
+            yield from _replay_events(CommandOutput(**matched[1]))
+            return
+
+    with metrics.span('interpret.cache_lookup'):
+        cache, cache_key, cached = _lookup_cache(user_input, system, distro_info, user_info, fast, record)
+    if cached is not None:
+        metrics.increment('shell_assist_interpretations_total', source='cache')
+        yield from _replay_events(cached)
+        return
+
+    single_flight = get_single_flight()
+    if single_flight is None or speculative:
+        yield from _interpret_uncached(user_input, system, distro_info, user_info, fast, cache, cache_key,
+                                       speculative)
+        return
+    # Identical requests arriving while this one is generated share its answer
+    flight_key = cache_key or _interpretation_key(user_input, system, distro_info, user_info, fast)
+    yield from single_flight.stream(flight_key, lambda: _interpret_uncached(
+        user_input, system, distro_info, user_info, fast, cache, cache_key))
+
+def _interpret_uncached(user_input, system, distro_info, user_info, fast, cache, cache_key, speculative=False):
+    """Answer a request that missed the exact cache, from the semantic cache or a model"""
+    with metrics.span('interpret.semantic_lookup'):
+        semantic, context, vector, similar = _lookup_semantic_cache(user_input, system, distro_info, user_info,
+                                                                    fast, not speculative)
+    if similar is not None:
+        metrics.increment('shell_assist_interpretations_total', source='semantic_cache')
+        yield from _replay_events(similar)
+        return
+
+    router = get_model_router()
+    model = settings.OLLAMA_MODEL
+    if router is not None:
+        # Try the smaller models first for simple requests, keeping their events until the answer is accepted
+        candidates = router.candidates(user_input)
+        for model in candidates[:-1]:
+            started = time.perf_counter()
             try:
-                parsed_content = json.loads(content)
-            except json.JSONDecodeError:
-                # If content is not valid JSON, try to extract it
-                # Sometimes the model wraps JSON in markdown code blocks
-                json_match = re.search(r'``````', content, re.DOTALL)
-                if json_match:
-                    parsed_content = json.loads(json_match.group(1))
-                else:
-                    # Try to find any JSON-like structure
-                    json_match = re.search(r'(\{.*?\})', content, re.DOTALL)
-                    if json_match:
-                        parsed_content = json.loads(json_match.group(1))
-                    else:
-                        # If no JSON found, create a fallback response
-                        parsed_content = {
-                            "command": f"echo 'Unable to parse command from: {content[:100]}...'",
-                            "requires_sudo": False,
-                            "notes": "Failed to parse model response as JSON",
-                            "help": {
-                                "description": "This is a fallback command due to parsing issues",
-                                "parameters": [],
-                                "examples": [],
-                                "risks": ["Command may not work as expected"],
-                                "alternatives": ["Try rephrasing your request"],
-                                "related_commands": [],
-                                "risk_score": 0
-                            }
-                        }
+                generation = _generate(user_input, system, distro_info, user_info, fast, model, strict=True)
+                events, result = _collect(generation)
+                reason = router.review(result[0])
+            except ValueError:
+                events, result, reason = None, None, 'unparseable'
+            if not speculative:
+                router.record(model, time.perf_counter() - started, reason)
+            if reason is None:
+                yield from events
+                yield from _finish(result, user_input, cache, cache_key, semantic, context, vector, speculative)
+                return
+            metrics.increment('shell_assist_router_escalations_total', model=model, reason=reason)
+            print(f"Escalating from {model} ({reason})")
+        model = candidates[-1]
+
+    started = time.perf_counter()
+    result = yield from _generate(user_input, system, distro_info, user_info, fast, model)
+    if router is not None and not speculative:
+        router.record(model, time.perf_counter() - started)
+    yield from _finish(result, user_input, cache, cache_key, semantic, context, vector, speculative)
+
+def _read_final_stats(chunks):
+    """Read a few more chunks for the final one with the prompt evaluation counters"""
+    for _ in range(TRAILING_CHUNKS):
+        chunk = next(chunks, None)
+        if chunk is None:
+            return
+        _record_prompt_eval(chunk)
+        if chunk['done']:
+            return
+
+def _collect(generation):
+    """Run a generator to completion, returning (yielded items, return value)"""
+    events = []
+    while True:
+        try:
+            events.append(next(generation))
+        except StopIteration as stop:
+            return events, stop.value
+
+def _finish(result, user_input, cache, cache_key, semantic, context, vector, speculative=False):
+    """Store a generated answer in the caches, then yield its final events"""
+    command_output, cacheable, generation_seconds, streamed = result
+
+    def store():
+        with metrics.span('interpret.cache_store'):
+            if cache is not None and cacheable:
+                cache.put(cache_key, command_output.model_dump(), generation_seconds)
+            if semantic is not None and cacheable:
+                semantic.add(vector, context, user_input, command_output.model_dump())
+
+    if speculative:
+        # Left to whoever uses the speculation, so half-typed requests never reach the caches
+        yield 'store', store
+    else:
+        store()
+        metrics.increment('shell_assist_interpretations_total', source='model')
+
+    if not streamed:
+        # The command never streamed cleanly, so report what the fallback parser found
+        yield from _replay_events(command_output)
+        return
+    yield 'done', command_output
+
+def _generate(user_input, system, distro_info, user_info, fast, model, strict=False):
+    """
+    Ask a model for the answer, yielding 'command' and 'field' events as they stream in.
+
+    Returns (CommandOutput, cacheable, generation seconds, streamed). With `strict`,
+    output that cannot be parsed raises ValueError instead of becoming a fallback answer.
+    """
+    with metrics.span('interpret.prompt'):
+        system_prompt = get_system_prompt(system, distro_info, user_info, fast)
+    schema = COMMAND_SUMMARY_SCHEMA if fast else COMMAND_OUTPUT_SCHEMA
+
+    try:
+        started = time.perf_counter()
+        stream = _chat(system_prompt, user_input, schema=schema, model=model, stream=True)
+
+        parser = StreamingJSONParser()
+        content = ''
+        # Time spent waiting for the model and parsing its output; time spent by
+        # the consumer of this generator between events is not counted
+        model_seconds = 0.0
+        parse_seconds = 0.0
+        chunks = iter(stream)
+        try:
+            while True:
+                waited = time.perf_counter()
+                chunk = next(chunks, None)
+                parsing = time.perf_counter()
+                model_seconds += parsing - waited
+                if chunk is None:
+                    break
+                _record_prompt_eval(chunk)
+                text = chunk['content']
+                content += text
+                completed = parser.feed(text)
+                parse_seconds += time.perf_counter() - parsing
+                for path, value in completed:
+                    if path == ('command',):
+                        yield 'command', {'command': value, 'elapsed': time.perf_counter() - started}
+                    elif path == ('risk_score',):
+                        yield 'field', {'field': 'help.risk_score', 'value': value}
+                    elif len(path) == 1 and path != ('help',):
+                        yield 'field', {'field': path[0], 'value': value}
+                    elif len(path) == 2 and path[0] == 'help':
+                        yield 'field', {'field': f'help.{path[1]}', 'value': value}
+                if parser.complete:
+                    # The object is closed; anything else the model generates is discarded,
+                    # apart from the final chunk carrying Ollama's prompt statistics
+                    _read_final_stats(chunks)
+                    break
+        finally:
+            # Closing the response makes Ollama stop generating
+            close = getattr(stream, 'close', None)
+            if close is not None:
+                close()
+        generation_seconds = time.perf_counter() - started
+        metrics.observe('interpret.model', model_seconds)
+        metrics.observe(model, model_seconds, metric='shell_assist_model_seconds', label='model')
+
+        if parser.complete:
+            parsed_content, cacheable = parser.root, True
         else:
-            parsed_content = content
+            fallback_started = time.perf_counter()
+            parsed_content, cacheable = _parse_content(content)
+            parse_seconds += time.perf_counter() - fallback_started
+        metrics.observe('interpret.parse', parse_seconds)
+        if strict and not cacheable:
+            raise ValueError("unparseable output")
+
+        with metrics.span('interpret.validate'):
+            command_output = _to_command_output(parsed_content, fast)
 
-        # Validate with Pydantic
-        command_output = CommandOutput(**parsed_content)
-        
-        return command_output
-        
     except json.JSONDecodeError as e:
         raise ValueError(f"Model returned invalid JSON: {e}")
     except Exception as e:
         raise ValueError(f"Model did not return valid output: {e}")
+
+    return command_output, cacheable, generation_seconds, parser.complete
+
+def fetch_command_help(command, distro_info, user_info):
+    """
+    Generate the detailed CommandHelp for a command, e.g. after a fast mode interpretation.
+
+    Results are cached per exact command string.
+    """
+    system = platform.system()
+    cache = get_interpretation_cache()
+    cache_key = None
+    if cache is not None:
+        cache_key = make_cache_key(command, system, distro_info, user_info, settings.OLLAMA_MODEL,
+                                   f"help-{PROMPT_VERSION}", normalize=False)
+        # Not counted, so the hit rate shown in /stats and /metrics stays that of interpretations
+        cached = cache.get(cache_key, record=False)
+        if cached is not None:
+            try:
+                return CommandHelp(**cached)
+            except Exception:
+                cache.delete(cache_key)
+
+    try:
+        started = time.perf_counter()
+        response = _chat(get_help_prompt(system, distro_info), command, schema=COMMAND_HELP_SCHEMA)
+        generation_seconds = time.perf_counter() - started
+        metrics.observe('help.model', generation_seconds)
+        _record_prompt_eval(response)
+
+        content = response['content']
+        try:
+            parsed_content = json.loads(content)
+        except json.JSONDecodeError:
+            parsed_content = extract_json_object(content)
+        if not isinstance(parsed_content, dict):
+            raise ValueError("no JSON object in the response")
+        command_help = CommandHelp(**parsed_content)
+    except Exception as e:
+        raise ValueError(f"Model did not return valid help: {e}")
+
+    if cache is not None:
+        cache.put(cache_key, command_help.model_dump(), generation_seconds)
+    return command_help
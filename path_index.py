@@ -0,0 +1,110 @@
+import difflib
+import os
+import threading
+import time
+
+
+class PathIndex:
+    """
+    In-process index of the executables on $PATH.
+
+    The index is built by scanning every $PATH directory once. Lookups are
+    dictionary hits; at most once per `check_interval` seconds the directory
+    mtimes (and $PATH itself) are re-checked and the index rebuilt if anything
+    changed, e.g. after a package install.
+    """
+
+    def __init__(self, path=None, check_interval=1.0):
+        self._fixed_path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._executables = {}
+        self._names = []
+        self._mtimes = {}
+        self._path = None
+        self._checked_at = 0.0
+
+    def _current_path(self):
+        if self._fixed_path is not None:
+            return self._fixed_path
+        return os.environ.get('PATH', os.defpath)
+
+    @staticmethod
+    def _dir_mtime(directory):
+        try:
+            return os.stat(directory).st_mtime_ns
+        except OSError:
+            return None
+
+    def _scan(self, path):
+        executables = {}
+        mtimes = {}
+        for directory in path.split(os.pathsep):
+            if not directory or directory in mtimes:
+                continue
+            mtimes[directory] = self._dir_mtime(directory)
+            try:
+                entries = os.scandir(directory)
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    # Earlier $PATH entries win, like the shell
+                    if entry.name in executables:
+                        continue
+                    try:
+                        if entry.is_file() and os.access(entry.path, os.X_OK):
+                            executables[entry.name] = entry.path
+                    except OSError:
+                        continue
+
+        self._executables = executables
+        self._names = sorted(executables)
+        self._mtimes = mtimes
+        self._path = path
+
+    def _is_stale(self, path):
+        if path != self._path:
+            return True
+        return any(self._dir_mtime(directory) != mtime for directory, mtime in self._mtimes.items())
+
+    def refresh(self, force=False):
+        """Rebuild the index if $PATH or any of its directories changed"""
+        now = time.monotonic()
+        if not force and self._path is not None and now - self._checked_at < self.check_interval:
+            return
+        with self._lock:
+            path = self._current_path()
+            if force or self._is_stale(path):
+                self._scan(path)
+            self._checked_at = now
+
+    def lookup(self, name):
+        """Return the full path of an executable, or None"""
+        if os.sep in name:
+            return name if os.path.isfile(name) and os.access(name, os.X_OK) else None
+        self.refresh()
+        return self._executables.get(name)
+
+    def exists(self, name):
+        """Check if an executable is available"""
+        return self.lookup(name) is not None
+
+    def suggest(self, name, limit=3):
+        """Suggest installed executables with names close to `name`"""
+        self.refresh()
+        return difflib.get_close_matches(name, self._names, n=limit, cutoff=0.75)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_path_index():
+    """Return the shared PATH index"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = PathIndex()
+    return _index
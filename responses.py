@@ -0,0 +1,71 @@
+import json
+
+from command_executor import describe_missing_programs, find_missing_programs
+
+
+def sudo_notes(notes, requires_sudo):
+    """Prefix the notes with a sudo warning when needed"""
+    if requires_sudo:
+        if notes:
+            return f"This command requires sudo privileges. {notes}"
+        return "This command requires sudo privileges."
+    return notes
+
+
+def format_interpretation(command_output):
+    """Convert a CommandOutput into the JSON shape returned by /interpret"""
+    notes = sudo_notes(command_output.notes, command_output.requires_sudo)
+    missing = find_missing_programs(command_output.command)
+    description = describe_missing_programs(command_output.command, missing)
+    if description:
+        notes = f"{notes} {description}" if notes else description
+    return {
+        'interpreted_command': command_output.command,
+        'notes': notes,
+        'missing_programs': missing,
+        # Fast mode answers carry only the risk score; the rest comes from /help
+        'help_pending': not command_output.help.description,
+        'help': format_help(command_output.help)
+    }
+
+
+def format_help(command_help):
+    """Convert a CommandHelp into the JSON shape used by /interpret and /help"""
+    return {
+        'description': command_help.description,
+        'parameters': command_help.parameters,
+        'examples': command_help.examples,
+        'risks': command_help.risks,
+        'alternatives': command_help.alternatives,
+        'related_commands': command_help.related_commands,
+        'risk_score': command_help.risk_score
+    }
+
+
+def format_error(e):
+    """JSON shape returned by /interpret when interpretation fails"""
+    return {
+        'interpreted_command': f"echo 'Error: {str(e)}'",
+        'notes': f"An error occurred: {str(e)}",
+        'help': {
+            'description': 'Error occurred while interpreting command',
+            'parameters': [],
+            'examples': [],
+            'risks': ['Command may not work as expected'],
+            'alternatives': ['Try rephrasing your request'],
+            'related_commands': [],
+            'risk_score': 0
+        }
+    }
+
+
+def format_batch_item(index, user_input, command_output, error):
+    """JSON shape of a single /interpret/batch result"""
+    if error is not None:
+        return {'index': index, 'request': user_input, 'error': str(error)}
+    return {'index': index, 'request': user_input, **format_interpretation(command_output)}
+
+
+def sse_event(event, data):
+    """Encode a server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
@@ -0,0 +1,254 @@
+import os
+import platform
+import re
+import shlex
+from collections import namedtuple
+from functools import lru_cache
+
+from user_info import is_in_home_directory
+
+SafetyVerdict = namedtuple('SafetyVerdict', ['safe', 'reason'])
+
+SAFE = SafetyVerdict(True, '')
+
+# Platform-specific dangerous patterns, matched against each normalized pipeline segment
+_DANGEROUS_PATTERNS = {
+    'Darwin': [
+        r'rm\s+-rf\s+/',
+        r'sudo\s+rm',
+        r'mkfs',
+        r'dd\s+if=',
+        r'passwd',
+        r'chmod\s+777',
+        r'>\s+/System',
+        r'>\s+/Library',
+        r'>\s+/Applications',
+        r'sudo\s+rm\s+-rf\s+/',
+        r'diskutil\s+eraseDisk',
+        r'fdisk',
+        r'format'
+    ],
+    'Linux': [
+        r'rm\s+-rf\s+/',
+        r'sudo\s+rm',
+        r'mkfs',
+        r'dd\s+if=',
+        r'passwd',
+        r'chmod\s+777',
+        r'>\s+/etc',
+        r'>\s+/boot'
+    ],
+}
+
+# Tokens that separate one simple command from the next
+_SEGMENT_SEPARATORS = frozenset(['|', '||', '&&', ';', ';;', '&', '|&', '(', ')'])
+
+# Wrappers that run the following word as the actual program
+_COMMAND_PREFIXES = frozenset(['sudo', 'env', 'nohup', 'time', 'nice', 'command', 'exec', 'xargs'])
+
+# Shell builtins and keywords are never found on $PATH
+SHELL_BUILTINS = frozenset([
+    'cd', 'echo', 'export', 'source', '.', 'alias', 'unalias', 'set', 'unset', 'exit', 'return',
+    'read', 'eval', 'type', 'hash', 'history', 'jobs', 'fg', 'bg', 'wait', 'ulimit', 'umask',
+    'pushd', 'popd', 'dirs', 'shift', 'test', '[', '[[', ']]', 'if', 'then', 'else', 'elif', 'fi',
+    'for', 'while', 'until', 'do', 'done', 'case', 'esac', 'function', 'true', 'false', 'printf',
+    'pwd', 'kill', 'trap', 'declare', 'local', 'readonly', 'let', 'builtin', '{', '}', '!',
+])
+
+_ASSIGNMENT = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*=')
+
+# Shells whose -c argument is itself a command line
+_SHELLS = frozenset(['sh', 'bash', 'zsh', 'dash', 'ksh'])
+
+# ssh options that take a value, so the word after them is not the host
+_SSH_OPTIONS_WITH_VALUE = frozenset('bBcDEeFIiJLlmOopQRSWw')
+
+# Absolute paths inside a word: key=/path, or a quoted script such as "cat /etc/shadow"
+_EMBEDDED_PATH = re.compile(r'(?:^|(?<=[\s=\'"(<>]))/[^\s\'";|&()<>]*')
+
+# Devices that redirections may always read from or write to
+_REDIRECT_DEVICES = frozenset(['/dev/null', '/dev/stdin', '/dev/stdout', '/dev/stderr'])
+
+# How many levels of sh -c "bash -c '...'" are followed before giving up
+_MAX_NESTING = 4
+
+
+def _compile_rules(system):
+    """Combine the platform's patterns into a single compiled alternation"""
+    patterns = _DANGEROUS_PATTERNS['Darwin' if system == 'Darwin' else 'Linux']
+    return re.compile('|'.join(f'(?:{pattern})' for pattern in patterns))
+
+
+_SYSTEM = platform.system()
+_RULES = _compile_rules(_SYSTEM)
+
+
+def tokenize(command):
+    """
+    Split a command into shell words and operators.
+
+    Quotes are removed from words, and operators such as |, &&, ; and >
+    become separate tokens. Newlines and backticks are treated as command
+    separators. Raises ValueError on unbalanced quotes.
+    """
+    lexer = shlex.shlex(command.replace('\n', ';').replace('`', ';'), posix=True, punctuation_chars=True)
+    lexer.whitespace_split = True
+    lexer.commenters = ''
+    return list(lexer)
+
+
+def split_segments(tokens):
+    """Group tokens into the simple commands of every pipeline and && / ; chain"""
+    segments = []
+    current = []
+    for token in tokens:
+        if token in _SEGMENT_SEPARATORS:
+            if current:
+                segments.append(current)
+            current = []
+        elif token != '$':
+            current.append(token)
+    if current:
+        segments.append(current)
+    return segments
+
+
+def _program_index(segment):
+    """Position of the program a simple command runs, skipping assignments and wrappers"""
+    for index, token in enumerate(segment):
+        if _ASSIGNMENT.match(token) or token in _COMMAND_PREFIXES or token.startswith('-'):
+            continue
+        if token[0] in '<>' or token.isdigit():
+            return None
+        return index
+    return None
+
+
+def program_name(segment):
+    """Return the program a simple command runs, skipping assignments and wrappers"""
+    index = _program_index(segment)
+    return None if index is None else segment[index]
+
+
+def nested_commands(segment):
+    """Return the command lines a segment hands to another shell: sh -c '...' or ssh host '...'"""
+    index = _program_index(segment)
+    if index is None:
+        return []
+    name = os.path.basename(segment[index])
+    args = segment[index + 1:]
+    if name in _SHELLS:
+        for position, arg in enumerate(args):
+            if arg.startswith('-') and not arg.startswith('--') and 'c' in arg[1:]:
+                return args[position + 1:position + 2]
+        return []
+    if name == 'ssh':
+        position = 0
+        while position < len(args) and args[position].startswith('-'):
+            if len(args[position]) == 2 and args[position][1] in _SSH_OPTIONS_WITH_VALUE:
+                position += 1
+            position += 1
+        remote = args[position + 1:]
+        return [' '.join(remote)] if remote else []
+    return []
+
+
+def _is_redirect(token):
+    return bool(token) and set(token) <= set('<>&|') and ('<' in token or '>' in token)
+
+
+def _path_arguments(segment, nested=()):
+    """
+    Yield every absolute path a segment mentions, including key=/path forms and quoted scripts.
+
+    Leading VAR=value assignments only set the environment and redirections to
+    /dev/null and the standard streams touch no files, so neither counts. Words in
+    `nested` are scripts checked as commands of their own.
+    """
+    leading = True
+    previous = None
+    for token in segment:
+        if leading and _ASSIGNMENT.match(token):
+            previous = token
+            continue
+        leading = False
+        if os.path.isabs(token):
+            if not (token in _REDIRECT_DEVICES and previous is not None and _is_redirect(previous)):
+                yield token
+        elif token not in nested:
+            for match in _EMBEDDED_PATH.finditer(token):
+                before = token[:match.start()].rstrip()
+                if not (match.group(0) in _REDIRECT_DEVICES and before[-1:] in ('<', '>')):
+                    yield match.group(0)
+        previous = token
+
+
+@lru_cache(maxsize=4096)
+def _analyze(command, depth=0):
+    """
+    Return (verdict from the static rules, programs the command runs, absolute paths
+    it mentions), memoized per command. Nothing here looks at the filesystem, so a
+    memoized result never goes stale; check_command resolves the paths every time.
+    """
+    if depth > _MAX_NESTING:
+        return SafetyVerdict(False, 'nests shells too deeply'), (), ()
+    try:
+        tokens = tokenize(command)
+    except ValueError as e:
+        return SafetyVerdict(False, f"cannot be parsed safely: {e}"), (), ()
+
+    segments = split_segments(tokens)
+    if not segments:
+        return SafetyVerdict(False, 'empty command'), (), ()
+
+    programs = []
+    paths = []
+    verdict = SAFE
+    for segment in segments:
+        program = program_name(segment)
+        if program and program not in SHELL_BUILTINS and program[0] not in '$~':
+            programs.append(program)
+        match = _RULES.search(' '.join(segment))
+        if match and verdict.safe:
+            verdict = SafetyVerdict(False, f"matches dangerous pattern '{match.group(0).strip()}'")
+        scripts = nested_commands(segment)
+        paths.extend(_path_arguments(segment, scripts))
+        # A script handed to another shell is checked like a command of its own
+        for nested in scripts:
+            nested_verdict, nested_programs, nested_paths = _analyze(nested, depth + 1)
+            if verdict.safe and not nested_verdict.safe:
+                verdict = nested_verdict
+            programs.extend(nested_programs)
+            paths.extend(nested_paths)
+    return verdict, tuple(programs), tuple(dict.fromkeys(paths))
+
+
+def command_programs(command):
+    """Return the external programs a command runs, in order"""
+    return _analyze(command)[1]
+
+
+def check_command(command):
+    """Evaluate every pipeline segment of a command, including scripts passed to sh -c or ssh"""
+    verdict, programs, paths = _analyze(command)
+    if not verdict.safe:
+        return verdict
+
+    # Resolved on every check, since a symlink may point somewhere else by now
+    for path in paths:
+        if not is_in_home_directory(path):
+            return SafetyVerdict(False, f"accesses '{path}' outside the home directory")
+
+    # Check if command exists on macOS; the PATH index notices newly installed tools
+    if _SYSTEM == "Darwin":
+        from command_executor import command_exists, get_preferred_command
+        for program in programs:
+            if not command_exists(get_preferred_command(program)):
+                return SafetyVerdict(False, f"'{program}' is not installed")
+
+    return SAFE
+
+
+def clear_cache():
+    """Forget memoized verdicts"""
+    _analyze.cache_clear()
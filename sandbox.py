@@ -0,0 +1,184 @@
+import codecs
+import os
+import resource
+import signal
+import subprocess
+import tempfile
+import time
+
+import settings
+
+# How often a running command's output files and exit status are checked
+POLL_INTERVAL = 0.02
+
+# Signals sent by the kernel when a limit is reached
+_LIMIT_SIGNALS = {signal.SIGXCPU: 'cpu_seconds', signal.SIGXFSZ: 'file_bytes'}
+
+
+def sandbox_limits():
+    """Per-command resource limits from settings; 0 leaves a resource unlimited"""
+    return {
+        'cpu_seconds': settings.SANDBOX_CPU_SECONDS,
+        'memory_bytes': settings.SANDBOX_MEMORY_BYTES,
+        'open_files': settings.SANDBOX_OPEN_FILES,
+        'file_bytes': settings.SANDBOX_MAX_FILE_BYTES,
+    }
+
+
+# rlimit, /bin/sh ulimit option and the size of one ulimit unit in bytes (POSIX sh counts
+# file sizes in 512-byte blocks)
+_RLIMITS = {
+    'cpu_seconds': (resource.RLIMIT_CPU, 't', 1),
+    'memory_bytes': (resource.RLIMIT_AS, 'v', 1024),
+    'open_files': (resource.RLIMIT_NOFILE, 'n', 1),
+    'file_bytes': (resource.RLIMIT_FSIZE, 'f', 512),
+}
+
+
+def _limit_prefix(limits):
+    """
+    Shell lines that lower the soft and hard limits before the command runs.
+
+    The shell sets them itself, since preexec_fn is not safe in the threaded web
+    server and daemon. The command runs in the same shell afterwards, so every
+    process it starts inherits them. A limit the platform does not support
+    (e.g. RLIMIT_AS on macOS) is skipped.
+    """
+    lines = []
+    for name, value in limits.items():
+        if not value:
+            continue
+        rlimit, option, unit = _RLIMITS[name]
+        # One more CPU second before the hard limit, so SIGXCPU arrives ahead of SIGKILL
+        hard = value + 1 if rlimit == resource.RLIMIT_CPU else value
+        current_hard = resource.getrlimit(rlimit)[1]
+        if current_hard != resource.RLIM_INFINITY:
+            value, hard = min(value, current_hard), min(hard, current_hard)
+        value, hard = max(1, value // unit), max(1, hard // unit)
+        # The soft limit goes first: a hard limit below the current soft one is rejected
+        lines.append(f"ulimit -S -{option} {value} 2>/dev/null; ulimit -H -{option} {hard} 2>/dev/null")
+    return ''.join(line + '\n' for line in lines)
+
+
+def _usage(rusage):
+    """Resource usage of a finished command as plain values"""
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    max_rss_kb = rusage.ru_maxrss // 1024 if os.uname().sysname == 'Darwin' else rusage.ru_maxrss
+    return {
+        'user_seconds': round(rusage.ru_utime, 3),
+        'system_seconds': round(rusage.ru_stime, 3),
+        'max_rss_kb': max_rss_kb,
+        'minor_faults': rusage.ru_minflt,
+        'major_faults': rusage.ru_majflt,
+        'block_reads': rusage.ru_inblock,
+        'block_writes': rusage.ru_oublock,
+        'voluntary_switches': rusage.ru_nvcsw,
+        'involuntary_switches': rusage.ru_nivcsw,
+    }
+
+
+def _kill_group(pid):
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def run_sandboxed(command, cwd, env, timeout, max_output_bytes, limits=None):
+    """
+    Run a command under resource limits and yield its output like execute_command_stream.
+
+    stdout and stderr go straight to temporary files rather than pipes, so large
+    outputs are spilled to disk instead of memory, and RLIMIT_FSIZE bounds them
+    along with any file the command writes. New output is read back and yielded
+    as it appears, up to `max_output_bytes`. The command runs in its own process
+    group, which is killed after `timeout` seconds, as soon as the output is
+    truncated and once the command exits.
+    The final ('exit', {...}) event adds the rusage of the run, the limits used
+    and which limit, if any, ended it.
+    """
+    limits = sandbox_limits() if limits is None else limits
+    started = time.monotonic()
+    deadline = started + timeout if timeout else None
+
+    with tempfile.TemporaryFile(prefix='shell-assist-out-') as stdout_file, \
+            tempfile.TemporaryFile(prefix='shell-assist-err-') as stderr_file:
+        process = subprocess.Popen(_limit_prefix(limits) + command, shell=True,
+                                   stdin=subprocess.DEVNULL,
+                                   stdout=stdout_file,
+                                   stderr=stderr_file,
+                                   cwd=cwd,
+                                   env=env,
+                                   start_new_session=True)
+
+        files = (('stdout', stdout_file.fileno()), ('stderr', stderr_file.fileno()))
+        offsets = {'stdout': 0, 'stderr': 0}
+        decoders = {name: codecs.getincrementaldecoder('utf-8')(errors='replace') for name, _ in files}
+        output_bytes = 0
+        truncated = False
+        timed_out = False
+        reaped = False
+
+        try:
+            while True:
+                pid, status, rusage = os.wait4(process.pid, os.WNOHANG)
+                reaped = pid != 0
+
+                for name, fd in files:
+                    while not truncated:
+                        chunk = os.pread(fd, 65536, offsets[name])
+                        if not chunk:
+                            break
+                        offsets[name] += len(chunk)
+                        if max_output_bytes and output_bytes + len(chunk) > max_output_bytes:
+                            chunk = chunk[:max_output_bytes - output_bytes]
+                            truncated = True
+                        output_bytes += len(chunk)
+                        text = decoders[name].decode(chunk)
+                        if text:
+                            yield name, text
+                        if truncated:
+                            # Nothing more will be shown, so stop the command filling the spill file
+                            _kill_group(process.pid)
+                            yield 'stderr', f"\n[output truncated after {max_output_bytes} bytes]\n"
+
+                if reaped:
+                    break
+                if deadline is not None and time.monotonic() >= deadline and not timed_out:
+                    timed_out = True
+                    _kill_group(process.pid)
+                    continue
+                time.sleep(POLL_INTERVAL)
+        finally:
+            # Nothing the command started may outlive it
+            _kill_group(process.pid)
+            if not reaped:
+                _, status, rusage = os.wait4(process.pid, 0)
+
+        for name, _ in files:
+            text = decoders[name].decode(b'', final=True)
+            if text and not truncated:
+                yield name, text
+
+    returncode = os.waitstatus_to_exitcode(status)
+    # Popen must not try to reap the process again
+    process.returncode = returncode
+    usage = _usage(rusage)
+    limit_exceeded = None
+    if timed_out:
+        limit_exceeded = 'timeout'
+    elif returncode < 0 or returncode > 128:
+        # Killed by a signal, either directly or as reported by the shell (128 + signal)
+        limit_exceeded = _LIMIT_SIGNALS.get(-returncode if returncode < 0 else returncode - 128)
+    if limit_exceeded is None and returncode and limits.get('cpu_seconds') and \
+            usage['user_seconds'] + usage['system_seconds'] >= limits['cpu_seconds']:
+        limit_exceeded = 'cpu_seconds'
+    yield 'exit', {
+        'returncode': returncode,
+        'duration': round(time.monotonic() - started, 3),
+        'timed_out': timed_out,
+        'truncated': truncated,
+        'limit_exceeded': limit_exceeded,
+        'limits': limits,
+        'rusage': usage,
+    }
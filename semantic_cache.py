@@ -0,0 +1,245 @@
+import atexit
+import json
+import math
+import os
+import re
+import threading
+from array import array
+
+import settings
+from interpret_cache import normalize_input
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Words carrying specifics (file names, paths, numbers, globs) must match exactly,
+# so "delete notes1.txt" never reuses the answer for "delete notes2.txt"
+_LITERAL_TOKEN = re.compile(r"""'[^']*'|"[^"]*"|\S*[\d./~*_\\-]\S*""")
+
+
+def literal_tokens(text):
+    """Return the specific tokens of a request that a cached answer must share"""
+    return sorted(set(_LITERAL_TOKEN.findall(text)))
+
+
+def _normalize_vector(vector):
+    norm = math.sqrt(sum(x * x for x in vector))
+    if norm == 0:
+        return None
+    return [x / norm for x in vector]
+
+
+def ollama_embedder(model):
+    """Return a function embedding text with a local Ollama embedding model"""
+    def embed(text):
+        from ollama_client import get_ollama_client
+        return get_ollama_client().embed(model, text, keep_alive=settings.OLLAMA_KEEP_ALIVE)[0]
+    return embed
+
+
+class SemanticCache:
+    """
+    Nearest-neighbour cache of interpretations keyed by request embeddings.
+
+    Unit-length vectors are kept in one flat float32 array, so a lookup is a single
+    pass of dot products, vectorised with numpy. Entries are only compared within
+    the same context, i.e. the same platform, user, model and prompt version. Without
+    numpy only the entries whose context and literal tokens match are scored, and
+    their vectors are copied out so the slow loop runs without holding the lock. The index is saved to a single file: a JSON header line
+    followed by the raw vectors. Saving happens on a background thread
+    `flush_delay` seconds after a change, so requests never wait for the write
+    and a burst of additions is written once.
+    """
+
+    def __init__(self, path, embed, threshold=0.92, max_entries=2000, flush_delay=1.0):
+        self.path = path
+        self.embed_func = embed
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.flush_delay = flush_delay
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._dirty = False
+        self._flush_timer = None
+        self._dim = None
+        self._vectors = array('f')
+        self._entries = []
+        self._load()
+
+    def embed(self, user_input):
+        """Embed a request as a unit vector, or None if the embedder returned nothing usable"""
+        vector = self.embed_func(normalize_input(user_input))
+        return _normalize_vector(vector) if vector else None
+
+    def search(self, vector, context, user_input, record=True):
+        """Return (value, similarity) of the closest entry above the threshold, or None"""
+        literals = literal_tokens(normalize_input(user_input))
+        scored = []
+        unscored = []
+        with self._lock:
+            if vector is not None and len(vector) == self._dim:
+                if numpy is not None:
+                    scored = self._matching_scores(vector, context, literals)
+                else:
+                    unscored = self._matching_vectors(context, literals)
+        # Pure-Python dot products, outside the lock
+        scored.extend((value, sum(a * b for a, b in zip(vector, stored))) for value, stored in unscored)
+
+        best = None
+        for value, similarity in scored:
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (value, similarity)
+        if record:
+            with self._lock:
+                if best is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+        return best
+
+    def _matching_scores(self, vector, context, literals):
+        """Return (value, cosine similarity) of entries above the threshold, scored with numpy"""
+        matrix = numpy.frombuffer(self._vectors, dtype=numpy.float32).reshape(-1, self._dim)
+        scores = matrix @ numpy.asarray(vector, dtype=numpy.float32)
+        matches = []
+        for index in numpy.flatnonzero(scores >= self.threshold):
+            entry = self._entries[index]
+            if entry['context'] == context and entry['literals'] == literals:
+                matches.append((entry['value'], float(scores[index])))
+        return matches
+
+    def _matching_vectors(self, context, literals):
+        """Return (value, copy of the vector) of the entries that could match"""
+        dim = self._dim
+        return [(entry['value'], self._vectors[index * dim:(index + 1) * dim])
+                for index, entry in enumerate(self._entries)
+                if entry['context'] == context and entry['literals'] == literals]
+
+    def add(self, vector, context, user_input, value):
+        """Store an interpretation under its request embedding; the index is saved shortly after"""
+        if vector is None:
+            return
+        with self._lock:
+            if self._dim != len(vector):
+                # A different embedding model; vectors are not comparable, so start over
+                self._dim = len(vector)
+                self._vectors = array('f')
+                self._entries = []
+            self._vectors.extend(vector)
+            self._entries.append({
+                'context': context,
+                'request': normalize_input(user_input),
+                'literals': literal_tokens(normalize_input(user_input)),
+                'value': value,
+            })
+            overflow = len(self._entries) - self.max_entries
+            if overflow > 0:
+                # Drop the oldest entries
+                del self._entries[:overflow]
+                del self._vectors[:overflow * self._dim]
+            self._schedule_flush()
+
+    def clear(self):
+        """Remove every entry"""
+        with self._lock:
+            self._vectors = array('f')
+            self._entries = []
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        """Mark the index changed and start a background save unless one is pending; needs the lock"""
+        self._dirty = True
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(self.flush_delay, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def flush(self):
+        """Write pending changes to disk now"""
+        with self._save_lock:
+            with self._lock:
+                if self._flush_timer is not None:
+                    self._flush_timer.cancel()
+                    self._flush_timer = None
+                if not self._dirty:
+                    return
+                self._dirty = False
+                # Entries are never modified once added, so a shallow copy is a consistent snapshot
+                dim, entries, vectors = self._dim, list(self._entries), self._vectors.tobytes()
+            self._save(dim, entries, vectors)
+
+    def stats(self):
+        """Return entry count and hit statistics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'threshold': self.threshold,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'path': self.path,
+            }
+
+    def _load(self):
+        try:
+            with open(self.path, 'rb') as f:
+                header = json.loads(f.readline())
+                vectors = array('f')
+                vectors.frombytes(f.read())
+        except (OSError, ValueError):
+            return
+        entries = header.get('entries', [])
+        dim = header.get('dim')
+        if not dim or len(vectors) != dim * len(entries):
+            return
+        self._dim = dim
+        self._vectors = vectors
+        self._entries = entries
+
+    def _save(self, dim, entries, vectors):
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(json.dumps({'dim': dim, 'entries': entries}).encode('utf-8'))
+                f.write(b'\n')
+                f.write(vectors)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Warning: could not save semantic cache: {e}")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_semantic_cache():
+    """Return the shared semantic cache, or None when it is disabled"""
+    global _cache
+    if not settings.SEMANTIC_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = SemanticCache(
+                settings.SEMANTIC_CACHE_PATH,
+                ollama_embedder(settings.SEMANTIC_CACHE_MODEL),
+                threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+                max_entries=settings.SEMANTIC_CACHE_MAX_ENTRIES
+            )
+            # Write additions still waiting for the background save
+            atexit.register(_cache.flush)
+        return _cache
+
+
+def get_semantic_cache_stats():
+    """Return semantic cache statistics, including when the cache is disabled"""
+    cache = get_semantic_cache()
+    if cache is None:
+        return {'enabled': False}
+    return {'enabled': True, **cache.stats()}
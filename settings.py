@@ -0,0 +1,140 @@
+import os
+
+
+def _env_bool(name, default):
+    """Read a boolean flag from the environment"""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def _env_int(name, default):
+    """Read an integer setting from the environment"""
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _env_float(name, default):
+    """Read a float setting from the environment"""
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+# Model used for command interpretation
+OLLAMA_MODEL = os.environ.get('SHELL_ASSIST_MODEL', 'deepseek-coder:6.7b')
+
+# Ollama server and the shared client's connection settings; the read timeout applies
+# to each piece of a response, not to the whole generation
+OLLAMA_HOST = os.environ.get('SHELL_ASSIST_OLLAMA_HOST', os.environ.get('OLLAMA_HOST', 'http://127.0.0.1:11434'))
+OLLAMA_CONNECT_TIMEOUT = _env_float('SHELL_ASSIST_OLLAMA_CONNECT_TIMEOUT', 5.0)
+OLLAMA_READ_TIMEOUT = _env_float('SHELL_ASSIST_OLLAMA_READ_TIMEOUT', 120.0)
+OLLAMA_MAX_CONNECTIONS = _env_int('SHELL_ASSIST_OLLAMA_MAX_CONNECTIONS', 16)
+
+# Several comma-separated Ollama hosts are load balanced, with unhealthy ones taken out of rotation
+OLLAMA_HOSTS = [host.strip() for host in os.environ.get('SHELL_ASSIST_OLLAMA_HOSTS', OLLAMA_HOST).split(',')
+                if host.strip()]
+OLLAMA_PROBE_INTERVAL = _env_float('SHELL_ASSIST_OLLAMA_PROBE_INTERVAL', 5.0)
+OLLAMA_PROBE_TIMEOUT = _env_float('SHELL_ASSIST_OLLAMA_PROBE_TIMEOUT', 2.0)
+
+# How long Ollama keeps the model (and its evaluated prompt prefix) loaded between requests
+OLLAMA_KEEP_ALIVE = os.environ.get('SHELL_ASSIST_KEEP_ALIVE', '30m')
+
+# Load the model and evaluate the system prompt in the background at startup
+WARMUP_ENABLED = _env_bool('SHELL_ASSIST_WARMUP', True)
+
+# Generate only the command, sudo flag and risk score; detailed help is fetched on demand
+FAST_MODE = _env_bool('SHELL_ASSIST_FAST_MODE', False)
+
+# Route simple requests to smaller models (smallest first), escalating to SHELL_ASSIST_MODEL
+# when the answer is unparseable, low confidence or at least ROUTER_ESCALATE_RISK
+ROUTER_ENABLED = _env_bool('SHELL_ASSIST_ROUTER', False)
+ROUTER_SMALL_MODELS = [m.strip() for m in os.environ.get('SHELL_ASSIST_SMALL_MODELS', 'qwen2.5-coder:1.5b').split(',')
+                       if m.strip()]
+ROUTER_MAX_SIMPLE_SCORE = _env_int('SHELL_ASSIST_ROUTER_MAX_SIMPLE_SCORE', 1)
+ROUTER_ESCALATE_RISK = _env_int('SHELL_ASSIST_ROUTER_ESCALATE_RISK', 7)
+
+# Answer common requests ("show disk usage", "list files") from local templates without the model
+INTENT_MATCHER_ENABLED = _env_bool('SHELL_ASSIST_INTENTS', True)
+
+# Web server
+SERVER_HOST = os.environ.get('SHELL_ASSIST_HOST', '127.0.0.1')
+SERVER_PORT = _env_int('SHELL_ASSIST_PORT', 5000)
+SERVER_THREADS = _env_int('SHELL_ASSIST_SERVER_THREADS', 16)
+
+# Worker pools bounding concurrent Ollama generations and shell commands
+INTERPRET_WORKERS = _env_int('SHELL_ASSIST_INTERPRET_WORKERS', 4)
+EXECUTE_WORKERS = _env_int('SHELL_ASSIST_EXECUTE_WORKERS', 4)
+
+# Let identical requests that arrive while one is being generated share its answer
+COALESCE_ENABLED = _env_bool('SHELL_ASSIST_COALESCE', True)
+
+# Interpret requests in the web UI while they are being typed (the page opts in per user);
+# at most SPECULATIVE_MAX_CONCURRENT of these generations run at once
+SPECULATIVE_ENABLED = _env_bool('SHELL_ASSIST_SPECULATIVE', True)
+SPECULATIVE_MAX_CONCURRENT = _env_int('SHELL_ASSIST_SPECULATIVE_MAX_CONCURRENT', 2)
+# Longest a submitted request waits for its still running speculation before interpreting normally
+SPECULATIVE_WAIT = _env_float('SHELL_ASSIST_SPECULATIVE_WAIT', 30.0)
+
+# Record per-stage latency histograms, exported on /metrics
+METRICS_ENABLED = _env_bool('SHELL_ASSIST_METRICS', True)
+
+# Command execution limits
+EXECUTE_TIMEOUT = _env_float('SHELL_ASSIST_EXECUTE_TIMEOUT', 300)
+EXECUTE_MAX_OUTPUT_BYTES = _env_int('SHELL_ASSIST_EXECUTE_MAX_OUTPUT', 1024 * 1024)
+
+# Run commands under per-command resource limits, with output spilled to temporary files;
+# the exit event then also reports the rusage of the run. 0 leaves a resource unlimited
+SANDBOX_ENABLED = _env_bool('SHELL_ASSIST_SANDBOX', False)
+SANDBOX_CPU_SECONDS = _env_int('SHELL_ASSIST_SANDBOX_CPU_SECONDS', 300)
+SANDBOX_MEMORY_BYTES = _env_int('SHELL_ASSIST_SANDBOX_MEMORY', 4 * 1024 ** 3)
+SANDBOX_OPEN_FILES = _env_int('SHELL_ASSIST_SANDBOX_OPEN_FILES', 1024)
+SANDBOX_MAX_FILE_BYTES = _env_int('SHELL_ASSIST_SANDBOX_MAX_FILE', 1024 ** 3)
+
+# Batch interpretation; a batch uses at most half of the interpret workers so other
+# requests are still served while it runs
+BATCH_CONCURRENCY = _env_int('SHELL_ASSIST_BATCH_CONCURRENCY', max(1, INTERPRET_WORKERS // 2))
+BATCH_MAX_ITEMS = _env_int('SHELL_ASSIST_BATCH_MAX_ITEMS', 500)
+
+# Where shell-assist keeps its on-disk caches
+CACHE_DIR = os.environ.get(
+    'SHELL_ASSIST_CACHE_DIR',
+    os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache')), 'shell-assist')
+)
+
+# Unix socket of the resident daemon (python main.py --daemon)
+DAEMON_SOCKET = os.environ.get(
+    'SHELL_ASSIST_DAEMON_SOCKET',
+    os.path.join(os.environ.get('XDG_RUNTIME_DIR') or CACHE_DIR, 'shell-assist.sock')
+)
+
+# Cached system detection
+SYSTEM_PROFILE_CACHE = _env_bool('SHELL_ASSIST_PROFILE_CACHE', True)
+SYSTEM_PROFILE_PATH = os.environ.get('SHELL_ASSIST_PROFILE_PATH', os.path.join(CACHE_DIR, 'system_profile.json'))
+DISTRO_PROBE_TIMEOUT = _env_float('SHELL_ASSIST_PROBE_TIMEOUT', 2.0)
+
+# Persistent interpretation cache
+CACHE_ENABLED = _env_bool('SHELL_ASSIST_CACHE', True)
+CACHE_PATH = os.environ.get('SHELL_ASSIST_CACHE_PATH', os.path.join(CACHE_DIR, 'interpretations.sqlite3'))
+CACHE_MAX_ENTRIES = _env_int('SHELL_ASSIST_CACHE_MAX_ENTRIES', 5000)
+CACHE_TTL_SECONDS = _env_int('SHELL_ASSIST_CACHE_TTL', 7 * 24 * 3600)
+
+# Command history of the interactive CLI, kept as JSON Lines
+HISTORY_ENABLED = _env_bool('SHELL_ASSIST_HISTORY', True)
+HISTORY_PATH = os.environ.get(
+    'SHELL_ASSIST_HISTORY_PATH',
+    os.path.join(os.environ.get('XDG_DATA_HOME', os.path.expanduser('~/.local/share')), 'shell-assist', 'history.jsonl')
+)
+HISTORY_MAX_ENTRIES = _env_int('SHELL_ASSIST_HISTORY_MAX_ENTRIES', 1000)
+
+# Semantic cache: reuse answers for paraphrased requests, matched by local embeddings.
+# Needs an embedding model, e.g. `ollama pull nomic-embed-text`
+SEMANTIC_CACHE_ENABLED = _env_bool('SHELL_ASSIST_SEMANTIC_CACHE', False)
+SEMANTIC_CACHE_MODEL = os.environ.get('SHELL_ASSIST_EMBED_MODEL', 'nomic-embed-text')
+SEMANTIC_CACHE_THRESHOLD = _env_float('SHELL_ASSIST_SEMANTIC_THRESHOLD', 0.92)
+SEMANTIC_CACHE_PATH = os.environ.get('SHELL_ASSIST_SEMANTIC_CACHE_PATH', os.path.join(CACHE_DIR, 'semantic_cache.bin'))
+SEMANTIC_CACHE_MAX_ENTRIES = _env_int('SHELL_ASSIST_SEMANTIC_MAX_ENTRIES', 2000)
@@ -0,0 +1,151 @@
+import threading
+
+import metrics
+import settings
+
+
+def _event_key(event):
+    """What an event tells the consumer: its kind, and for field events which field"""
+    name, data = event
+    return name, data.get('field') if isinstance(data, dict) else None
+
+
+class _Flight:
+    """Events of one in-flight interpretation, shared with identical requests that arrive meanwhile"""
+
+    def __init__(self):
+        self.events = []
+        self.done = False
+        self.finished = False
+        self.error = None
+        self.condition = threading.Condition()
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent event streams into one.
+
+    The first caller for a key drives the generator and records its events;
+    callers arriving with the same key while it runs replay those events as
+    they come instead of starting their own generation. A stream ends at its
+    'done' event. If the first caller stops before 'done' without an error,
+    the others fall back to running their own generator, skipping the command and
+    fields they already replayed so consumers never see them twice; the new run
+    may produce its events in another order.
+    """
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._stats = {'leaders': 0, 'coalesced': 0}
+
+    def stream(self, key, make_generator):
+        """Yield the events of make_generator(), sharing them with identical concurrent calls"""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self._stats['leaders'] += 1
+
+        if leader:
+            yield from self._lead(key, flight, make_generator)
+            return
+        delivered = yield from self._follow(flight)
+        if delivered is None:
+            return
+        for event in make_generator():
+            key = _event_key(event)
+            if key in delivered and event[0] != 'done':
+                continue
+            delivered.add(key)
+            yield event
+
+    def _lead(self, key, flight, make_generator):
+        generator = make_generator()
+        try:
+            for event in generator:
+                with flight.condition:
+                    flight.events.append(event)
+                    flight.done = event[0] == 'done'
+                    flight.condition.notify_all()
+                if flight.done:
+                    # Later identical requests start afresh (and usually hit the cache)
+                    self._retire(key, flight)
+                yield event
+        except Exception as e:
+            with flight.condition:
+                flight.error = e
+            raise
+        finally:
+            generator.close()
+            self._retire(key, flight)
+
+    def _retire(self, key, flight):
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        with flight.condition:
+            flight.finished = True
+            flight.condition.notify_all()
+
+    def _follow(self, flight):
+        """
+        Replay a flight's events. Returns None once 'done' was replayed, or the keys
+        of the events replayed if the flight was abandoned before 'done'.
+        """
+        index = 0
+        delivered = set()
+        while True:
+            with flight.condition:
+                while index >= len(flight.events) and not flight.finished:
+                    flight.condition.wait()
+                events = flight.events[index:]
+                index = len(flight.events)
+                finished, error = flight.finished, flight.error
+            for event in events:
+                if event[0] == 'done':
+                    self._count_saved()
+                delivered.add(_event_key(event))
+                yield event
+                if event[0] == 'done':
+                    return None
+            if finished:
+                if error is not None:
+                    self._count_saved()
+                    raise error
+                return delivered
+
+    def _count_saved(self):
+        with self._lock:
+            self._stats['coalesced'] += 1
+        metrics.increment('shell_assist_coalesced_total')
+
+    def stats(self):
+        """Return how many streams ran and how many generations were saved by sharing them"""
+        with self._lock:
+            return {'enabled': True, 'in_flight': len(self._flights),
+                    'generations': self._stats['leaders'], 'saved_generations': self._stats['coalesced']}
+
+
+_single_flight = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight():
+    """Return the shared coalescer for interpretations, or None when coalescing is disabled"""
+    global _single_flight
+    if not settings.COALESCE_ENABLED:
+        return None
+    with _single_flight_lock:
+        if _single_flight is None:
+            _single_flight = SingleFlight()
+        return _single_flight
+
+
+def get_single_flight_stats():
+    """Return coalescing counters, including when coalescing is disabled"""
+    single_flight = get_single_flight()
+    if single_flight is None:
+        return {'enabled': False}
+    return single_flight.stats()
@@ -0,0 +1,165 @@
+import threading
+from collections import OrderedDict
+
+import metrics
+import settings
+from interpret_cache import normalize_input
+
+# Browser sessions whose latest speculation is remembered
+MAX_SESSIONS = 256
+
+
+class Speculation:
+    """One speculative interpretation of a partially typed request"""
+
+    def __init__(self, key):
+        self.key = key
+        self.result = None
+        self.store = None
+        self.error = None
+        self.cancelled = threading.Event()
+        self.finished = threading.Event()
+
+    def cancel(self):
+        self.cancelled.set()
+
+
+class SpeculativeInterpreter:
+    """
+    Interprets requests while they are being typed so the answer is ready on submit.
+
+    Each session has at most one speculation; a newer input cancels the older one,
+    which closes its model stream at the next event. At most `max_concurrent`
+    speculations run at once, counting cancelled ones until their model stream is
+    closed, and inputs arriving beyond that are dropped rather than queued, so fast
+    typing cannot flood Ollama. Speculations run on their own threads, so they never
+    hold a worker that a submitted request is waiting for.
+
+    Partial inputs are interpreted without touching the caches or any counters;
+    an answer is only stored and counted when take() hands it out.
+    """
+
+    def __init__(self, interpret_stream, max_concurrent, wait=None):
+        self.interpret_stream = interpret_stream
+        self.wait = settings.SPECULATIVE_WAIT if wait is None else wait
+        self._slots = threading.BoundedSemaphore(max(1, max_concurrent))
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'started': 0, 'cancelled': 0, 'busy': 0, 'hits': 0, 'misses': 0}
+
+    @staticmethod
+    def _key(user_input, fast):
+        return normalize_input(user_input), settings.FAST_MODE if fast is None else bool(fast)
+
+    def speculate(self, session, user_input, distro_info, user_info, fast=None):
+        """Start interpreting a partial input; returns 'started', 'running', 'ready' or 'busy'"""
+        key = self._key(user_input, fast)
+        with self._lock:
+            current = self._sessions.get(session)
+            if current is not None and current.key == key and not current.cancelled.is_set():
+                return 'ready' if current.finished.is_set() else 'running'
+            if current is not None:
+                current.cancel()
+                self._stats['cancelled'] += 1
+            if not self._slots.acquire(blocking=False):
+                self._sessions.pop(session, None)
+                self._stats['busy'] += 1
+                return 'busy'
+            speculation = Speculation(key)
+            self._sessions[session] = speculation
+            self._sessions.move_to_end(session)
+            while len(self._sessions) > MAX_SESSIONS:
+                self._sessions.popitem(last=False)[1].cancel()
+            self._stats['started'] += 1
+
+        threading.Thread(target=self._run, args=(speculation, user_input, distro_info, user_info, key[1]),
+                         name='speculate', daemon=True).start()
+        return 'started'
+
+    def _run(self, speculation, user_input, distro_info, user_info, fast):
+        generator = None
+        try:
+            if speculation.cancelled.is_set():
+                return
+            with metrics.suppressed():
+                generator = self.interpret_stream(user_input, distro_info, user_info, fast, speculative=True)
+                for event, data in generator:
+                    if speculation.cancelled.is_set():
+                        break
+                    if event == 'store':
+                        speculation.store = data
+                    elif event == 'done':
+                        speculation.result = data
+        except Exception as e:
+            speculation.error = e
+        finally:
+            if generator is not None:
+                # Closing the generator closes the model stream, so Ollama stops generating
+                generator.close()
+            # Only now has the generation stopped, so only now may another one start
+            self._slots.release()
+            speculation.finished.set()
+
+    def take(self, session, user_input, fast=None, timeout=None):
+        """
+        Return the session's speculative CommandOutput if it was for this input, or None.
+
+        A matching speculation that is still running is waited for, since it is
+        further along than a new interpretation would be, but for no longer than
+        `timeout` (the interpreter's `wait` by default); after that the caller
+        interprets the request normally.
+        """
+        key = self._key(user_input, fast)
+        with self._lock:
+            speculation = self._sessions.pop(session, None)
+            if speculation is None:
+                return None
+            if speculation.key != key:
+                speculation.cancel()
+                self._stats['misses'] += 1
+                return None
+        if not speculation.finished.wait(self.wait if timeout is None else timeout) or speculation.cancelled.is_set():
+            speculation.cancel()
+            with self._lock:
+                self._stats['misses'] += 1
+            return None
+        with self._lock:
+            self._stats['hits' if speculation.result is not None else 'misses'] += 1
+        if speculation.result is None:
+            return None
+        if speculation.store is not None:
+            try:
+                speculation.store()
+            except Exception as e:
+                print(f"Warning: could not cache speculative answer: {e}")
+        metrics.increment('shell_assist_interpretations_total', source='speculation')
+        return speculation.result
+
+    def stats(self):
+        with self._lock:
+            running = sum(1 for s in self._sessions.values() if not s.finished.is_set())
+            return {'enabled': True, 'running': running, **self._stats}
+
+
+_interpreter = None
+_interpreter_lock = threading.Lock()
+
+
+def get_speculative_interpreter():
+    """Return the shared speculative interpreter, or None when speculation is disabled"""
+    global _interpreter
+    if not settings.SPECULATIVE_ENABLED:
+        return None
+    with _interpreter_lock:
+        if _interpreter is None:
+            from ollama_interface import interpret_command_stream
+            _interpreter = SpeculativeInterpreter(interpret_command_stream, settings.SPECULATIVE_MAX_CONCURRENT)
+        return _interpreter
+
+
+def get_speculation_stats():
+    """Return speculation counters, including when speculation is disabled"""
+    interpreter = get_speculative_interpreter()
+    if interpreter is None:
+        return {'enabled': False}
+    return interpreter.stats()
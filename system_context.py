@@ -0,0 +1,16 @@
+import threading
+
+_context = None
+_context_lock = threading.Lock()
+
+
+def get_system_context():
+    """Detect distribution and user information on first use and reuse it afterwards"""
+    global _context
+    if _context is None:
+        with _context_lock:
+            if _context is None:
+                from distro_detector import get_distro_info
+                from user_info import get_user_info
+                _context = (get_distro_info(), get_user_info())
+    return _context
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Tests for load balancing Ollama calls over several hosts, using local mock servers
+"""
+
+import sys
+import os
+import socket
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from backend_pool import BackendPool
+from mock_ollama import MockOllamaServer
+
+MODEL = 'deepseek-coder:6.7b'
+MESSAGES = [{'role': 'user', 'content': 'list my files'}]
+
+def unused_url():
+    """Address of a port nothing listens on"""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return f"http://127.0.0.1:{s.getsockname()[1]}"
+
+def make_pool(*hosts):
+    return BackendPool(hosts, connect_timeout=1.0, read_timeout=5.0, probe_interval=0, probe_timeout=1.0)
+
+def test_least_loaded_backend():
+    """A backend with a stream in flight is skipped for the next request"""
+    with MockOllamaServer() as first, MockOllamaServer() as second:
+        pool = make_pool(first.url, second.url)
+        stream = pool.chat(MODEL, MESSAGES, stream=True)
+        next(stream)
+        pool.chat(MODEL, MESSAGES)
+        stream.close()
+        assert first.requests == 1 and second.requests == 1
+        assert all(backend['in_flight'] == 0 for backend in pool.stats().values())
+        pool.close()
+
+def test_failover_and_ejection():
+    """A dead backend is ejected and the request is retried on a healthy one"""
+    dead = unused_url()
+    with MockOllamaServer() as live:
+        pool = make_pool(dead, live.url)
+        for stream in (False, True):
+            response = pool.chat(MODEL, MESSAGES, stream=stream)
+            chunks = list(response) if stream else [response]
+            assert chunks[-1]['done']
+        stats = pool.stats()
+        assert stats[dead] == {**stats[dead], 'healthy': False, 'failures': 1}
+        assert stats[live.url]['healthy'] and stats[live.url]['requests'] == 2
+        pool.close()
+
+def test_probe_readmits_recovered_backend():
+    """Health probes eject a stopped backend and re-admit it once it answers again"""
+    server = MockOllamaServer().start()
+    port = server.server_address[1]
+    pool = make_pool(server.url)
+    server.stop()
+    pool.probe()
+    assert not pool.stats()[server.url]['healthy']
+
+    with MockOllamaServer(port=port):
+        pool.probe()
+        assert pool.stats()[server.url]['healthy']
+        assert pool.chat(MODEL, MESSAGES)['done']
+    pool.close()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Tests for batch interpretation
+"""
+
+import sys
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import settings
+from batch import interpret_batch, read_batch_file
+
+def test_results_in_input_order_with_errors():
+    """Results come back in input order and a failing request does not stop the batch"""
+    def interpret(request, distro_info, user_info):
+        # Later requests finish first
+        time.sleep(0.01 * (5 - int(request[-1])))
+        if request == 'req 2':
+            raise ValueError("no valid output")
+        return request.upper()
+
+    requests = [f'req {i}' for i in range(5)]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(interpret_batch(requests, interpret, 'Test Linux', {}, pool, concurrency=4))
+    assert [index for index, *_ in results] == list(range(5))
+    assert [output for _, _, output, _ in results] == ['REQ 0', 'REQ 1', None, 'REQ 3', 'REQ 4']
+    assert str(results[2][3]) == "no valid output"
+
+def test_batch_leaves_workers_free(monkeypatch):
+    """A batch never occupies more than half of the interpret workers"""
+    monkeypatch.setattr(settings, 'INTERPRET_WORKERS', 4)
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    def interpret(request, distro_info, user_info):
+        with lock:
+            running.append(request)
+            peak.append(len(running))
+        time.sleep(0.01)
+        with lock:
+            running.remove(request)
+        return request
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(interpret_batch([str(i) for i in range(8)], interpret, 'Test Linux', {}, pool, concurrency=8))
+    assert len(results) == 8
+    assert max(peak) == 2
+
+def test_read_batch_file(tmp_path):
+    """Blank lines and comments are skipped"""
+    path = tmp_path / 'runbook.txt'
+    path.write_text("# disk checks\nshow disk usage\n\n  list files  \n")
+    assert read_batch_file(str(path)) == ['show disk usage', 'list files']
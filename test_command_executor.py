@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Tests for streaming command execution
+"""
+
+import sys
+import os
+import shlex
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from command_executor import execute_command_stream
+
+USER_INFO = {'username': 'tester', 'home': os.getcwd(), 'folders': {}}
+
+def run(command, **kwargs):
+    events = list(execute_command_stream(command, USER_INFO, **kwargs))
+    stdout = ''.join(data for event, data in events if event == 'stdout')
+    stderr = ''.join(data for event, data in events if event == 'stderr')
+    return stdout, stderr, events[-1][1]
+
+def is_running(pid):
+    """True while a process exists and is not a zombie waiting to be reaped"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(')', 1)[1].split()[0] != 'Z'
+    except OSError:
+        return False
+
+def test_timeout_kills_process_group():
+    """A timed out command is killed together with the processes it started"""
+    started = time.monotonic()
+    stdout, _, result = run("sleep 30 & echo $!; wait", timeout=0.5)
+    assert time.monotonic() - started < 5
+    assert result['timed_out'] and result['returncode'] != 0
+    child = int(stdout.split()[0])
+    deadline = time.monotonic() + 2
+    while is_running(child) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not is_running(child)
+
+def test_output_truncated_with_marker():
+    """Output past the limit is dropped and the truncation is reported"""
+    stdout, stderr, result = run("head -c 100000 /dev/zero | tr '\\0' a", max_output_bytes=1000)
+    assert stdout == 'a' * 1000
+    assert stderr.endswith("[output truncated after 1000 bytes]\n")
+    assert result['truncated'] and result['returncode'] == 0
+
+def test_utf8_split_across_chunks():
+    """A character whose bytes arrive in separate reads is decoded intact"""
+    script = ("import sys, time; out = sys.stdout.buffer; out.write(b'caf\\xc3'); out.flush(); "
+              "time.sleep(0.2); out.write(b'\\xa9 ok'); out.flush()")
+    stdout, _, result = run(f"{shlex.quote(sys.executable)} -c {shlex.quote(script)}", timeout=10)
+    assert stdout == "café ok"
+    assert result['returncode'] == 0
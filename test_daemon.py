@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for the resident daemon and its Unix socket client
+"""
+
+import sys
+import os
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+import settings
+from daemon import ShellAssistDaemon
+import daemon_client
+from daemon_client import DaemonClient
+
+@pytest.fixture
+def socket_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'WARMUP_ENABLED', False)
+    # Detection stores the system profile; keep it out of the real cache directory
+    monkeypatch.setattr(settings, 'SYSTEM_PROFILE_PATH', str(tmp_path / 'system_profile.json'))
+    monkeypatch.setattr(settings, 'CACHE_ENABLED', False)
+    monkeypatch.setattr(settings, 'INTENT_MATCHER_ENABLED', True)
+    path = str(tmp_path / 'daemon.sock')
+    server = ShellAssistDaemon(path)
+    server.warm_up()
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+    thread.start()
+    yield path
+    server.shutdown()
+    server.server_close()
+    assert not os.path.exists(path)
+
+def test_concurrent_clients(socket_path):
+    """Several clients are served at once and counted in the stats"""
+    def interpret(_):
+        client = DaemonClient(socket_path)
+        try:
+            return client.call({'op': 'interpret', 'request': 'show disk usage'})
+        finally:
+            client.close()
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        responses = list(pool.map(interpret, range(4)))
+    assert all(r['ok'] and r['interpretation']['interpreted_command'] == 'df -h' for r in responses)
+
+    client = DaemonClient(socket_path)
+    stats = client.call({'op': 'stats'})
+    client.close()
+    assert stats['requests']['interpret'] == 4
+    assert stats['uptime_seconds'] > 0
+    assert 'hit_rate' in stats['intents']
+
+def test_execute_streams_output(socket_path):
+    """Execution output is streamed, and unsafe commands are refused"""
+    client = DaemonClient(socket_path)
+    lines = list(client.request({'op': 'execute', 'command': 'echo hello'}))
+    assert lines[0] == {'event': 'stdout', 'data': 'hello\n'}
+    assert lines[-1]['ok'] and lines[-1]['execution']['returncode'] == 0
+
+    blocked = client.call({'op': 'execute', 'command': 'rm -rf /'})
+    assert not blocked['ok'] and blocked['status'] == 'blocked'
+    client.close()
+
+def test_bad_requests(socket_path):
+    """Malformed requests get an error and the connection stays usable"""
+    client = DaemonClient(socket_path)
+    client.sock.sendall(b"not json\n")
+    assert json.loads(client.reader.readline())['ok'] is False
+    assert client.call({'op': 'nonsense'})['ok'] is False
+    assert client.call({'op': 'ping'})['ok'] is True
+    client.close()
+
+def test_fast_flag_only_overrides_when_given(socket_path, monkeypatch, capsys):
+    """Without --fast the client leaves fast mode to the daemon's setting"""
+    monkeypatch.setattr(settings, 'DAEMON_SOCKET', socket_path)
+    sent = []
+    call = DaemonClient.call
+    monkeypatch.setattr(DaemonClient, 'call', lambda self, payload: sent.append(payload) or call(self, payload))
+    assert daemon_client.main(['show', 'disk', 'usage']) == daemon_client.EXIT_OK
+    assert daemon_client.main(['--fast', 'show', 'disk', 'usage']) == daemon_client.EXIT_OK
+    assert [payload['fast'] for payload in sent] == [None, True]
+    assert capsys.readouterr().out.splitlines() == ['df -h', 'df -h']
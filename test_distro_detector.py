@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Tests for the cached, tiered system detection
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+import distro_detector
+import settings
+
+@pytest.fixture
+def probes(tmp_path, monkeypatch):
+    """Replace the Linux probes with recorded fakes and cache to a temporary file"""
+    calls = []
+    results = {'lsb_release': None, 'os_release': 'NAME="Test Linux"\n', 'neofetch': 'neofetch output'}
+
+    def probe(name):
+        def run(timeout):
+            calls.append(name)
+            return results[name]
+        return run
+
+    monkeypatch.setattr(distro_detector, '_PROBE_TIERS', {
+        'Linux': [[probe('lsb_release'), probe('os_release')], [probe('neofetch')]],
+    })
+    monkeypatch.setattr(distro_detector.platform, 'system', lambda: 'Linux')
+    monkeypatch.setattr(distro_detector, 'system_fingerprint', lambda system=None: results['fingerprint'])
+    monkeypatch.setattr(settings, 'SYSTEM_PROFILE_CACHE', True)
+    monkeypatch.setattr(settings, 'SYSTEM_PROFILE_PATH', str(tmp_path / 'profile' / 'system_profile.json'))
+    results['fingerprint'] = 'Linux:6.0:1'
+    return calls, results
+
+def test_slow_tier_only_runs_when_fast_probes_fail(probes):
+    """The first successful fast probe wins and neofetch is skipped"""
+    calls, results = probes
+    assert distro_detector.get_distro_info() == 'NAME="Test Linux"\n'
+    assert sorted(calls) == ['lsb_release', 'os_release']
+
+    calls.clear()
+    results['os_release'] = None
+    results['fingerprint'] = 'Linux:6.0:2'
+    assert distro_detector.get_distro_info() == 'neofetch output'
+    assert calls[-1] == 'neofetch'
+
+def test_profile_is_cached_until_fingerprint_changes(probes):
+    """A cached profile skips every probe; an OS upgrade detects again"""
+    calls, results = probes
+    first = distro_detector.get_distro_info()
+    calls.clear()
+    assert distro_detector.get_distro_info() == first
+    assert calls == []
+
+    results['fingerprint'] = 'Linux:6.1:1'
+    results['os_release'] = 'NAME="Upgraded Linux"\n'
+    assert distro_detector.get_distro_info() == 'NAME="Upgraded Linux"\n'
+    assert calls
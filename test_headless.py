@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for the headless --interpret/--exec mode
+"""
+
+import sys
+import os
+import io
+import json
+import subprocess
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+import headless
+import settings
+from mock_ollama import CANNED_RESPONSE
+
+@pytest.fixture
+def model(mock_ollama, monkeypatch, tmp_path):
+    """Answer requests from a mock server with a configurable canned response"""
+    # Detection stores the system profile; keep it out of the real cache directory
+    monkeypatch.setattr(settings, 'SYSTEM_PROFILE_PATH', str(tmp_path / 'system_profile.json'))
+    return lambda **changes: mock_ollama(canned={**CANNED_RESPONSE, **changes})
+
+def run(*argv):
+    out = io.StringIO()
+    code = headless.run(list(argv), out=out)
+    return code, [json.loads(line) for line in out.getvalue().splitlines()]
+
+def test_interpret_json(model):
+    """--interpret prints one JSON object with the interpretation"""
+    model()
+    code, lines = run('--interpret', 'list my files')
+    assert code == headless.EXIT_OK
+    assert len(lines) == 1
+    assert lines[0]['status'] == 'interpreted'
+    assert lines[0]['interpretation']['interpreted_command'] == CANNED_RESPONSE['command']
+
+def test_exec_ndjson(model):
+    """--exec --ndjson streams the interpretation, output and result as events"""
+    model(command='echo hello')
+    code, lines = run('--exec', 'say hello', '--ndjson')
+    assert code == headless.EXIT_OK
+    assert [line['event'] for line in lines] == ['interpretation', 'stdout', 'result']
+    assert lines[1]['data'] == 'hello\n'
+    assert lines[2]['execution']['returncode'] == 0
+
+@pytest.mark.parametrize('changes, argv, status, code', [
+    ({'command': 'sh -c "exit 3"'}, [], 'failed', headless.EXIT_COMMAND_FAILED),
+    ({'command': 'rm -rf /'}, ['--yes'], 'blocked', headless.EXIT_BLOCKED),
+    ({'command': 'echo risky', 'risk_score': 8,
+      'help': {**CANNED_RESPONSE['help'], 'risk_score': 8}}, [], 'needs_confirmation', headless.EXIT_BLOCKED),
+])
+def test_exit_codes(model, changes, argv, status, code):
+    """Failures, blocked commands and unconfirmed risky commands have their own exit codes"""
+    model(**changes)
+    exit_code, lines = run('--exec', 'do something', *argv)
+    assert (exit_code, lines[-1]['status']) == (code, status)
+
+def test_no_rich_import(tmp_path):
+    """The headless path does not load the interactive UI libraries"""
+    code = ("import sys, io, headless; headless.run(['--interpret', 'show disk usage'], out=io.StringIO()); "
+            "print(sorted(m for m in ('rich', 'colorama', 'flask') if m in sys.modules))")
+    env = {**os.environ, 'SHELL_ASSIST_INTENTS': '1', 'SHELL_ASSIST_CACHE_DIR': str(tmp_path),
+           'SHELL_ASSIST_PROFILE_PATH': str(tmp_path / 'system_profile.json')}
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, env=env,
+                            cwd=os.path.dirname(os.path.abspath(__file__)), timeout=60)
+    assert result.stdout.strip() == '[]', result.stderr
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent, searchable command history
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from history_store import HistoryStore
+
+def test_persists_across_sessions(tmp_path):
+    """Entries written in one session are loaded by the next"""
+    path = str(tmp_path / 'history.jsonl')
+    store = HistoryStore(path)
+    store.record("show disk usage", "df -h", "success", 0.01, 0)
+    store.record("delete everything", "rm -rf /", "blocked")
+
+    reloaded = HistoryStore(path)
+    entries = reloaded.recent()
+    assert [entry['command'] for entry in entries] == ["df -h", "rm -rf /"]
+    assert entries[0]['request'] == "show disk usage" and entries[0]['returncode'] == 0
+    assert reloaded.get(entries[1]['id'])['status'] == "blocked"
+
+def test_ring_buffer_and_compaction(tmp_path):
+    """Only the newest entries are kept in memory, and the file is compacted as it grows"""
+    path = str(tmp_path / 'history.jsonl')
+    store = HistoryStore(path, max_entries=5)
+    for i in range(12):
+        store.record(f"request {i}", f"echo {i}", "success")
+    assert len(store) == 5
+    assert [entry['command'] for entry in store.recent()] == [f"echo {i}" for i in range(7, 12)]
+    with open(path) as f:
+        assert sum(1 for _ in f) < 10
+    assert "echo 3" not in [entry['command'] for entry in store.search("echo 3")]
+    assert [entry['command'] for entry in HistoryStore(path, max_entries=5).recent()] == \
+        [f"echo {i}" for i in range(7, 12)]
+
+def test_fuzzy_search():
+    """Searches match requests and commands despite typos, best match first"""
+    store = HistoryStore()
+    store.record("find python files", "find . -name '*.py'", "success")
+    store.record("show disk usage", "df -h", "success")
+    store.record("show memory usage", "free -h", "success")
+
+    assert store.search("disk usge")[0]['command'] == "df -h"
+    assert store.search("pyhton files")[0]['command'] == "find . -name '*.py'"
+    assert [entry['command'] for entry in store.search("free")] == ["free -h"]
+    assert store.search("kubernetes") == []
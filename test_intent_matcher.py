@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests for the local intent matcher that answers common requests without the model
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from intent_matcher import INTENTS, IntentMatcher
+from safety_engine import check_command
+
+def test_common_requests_match():
+    """Requests listed in the README and demo scripts are answered locally"""
+    matcher = IntentMatcher()
+    expected = {
+        "show me disk usage": 'df -h',
+        "Show disk usage.": 'df -h',
+        "list files in current directory": 'ls -la',
+        "list running processes": 'ps aux',
+        "show system processes": 'ps aux',
+        "please show me the current date": 'date',
+        "find all Python files in my home directory": 'find ~ -type f -name "*.py"',
+        "check network connectivity": 'ping -c 4 8.8.8.8',
+    }
+    for request, command in expected.items():
+        name, output = matcher.match(request, 'Linux')
+        assert output['command'] == command, request
+        assert output['help']['description']
+
+def test_platform_specific_templates():
+    """Darwin gets its own command where it differs and shares the rest"""
+    matcher = IntentMatcher()
+    assert matcher.match("show memory usage", 'Linux')[1]['command'] == 'free -h'
+    assert matcher.match("show memory usage", 'Darwin')[1]['command'] == 'vm_stat'
+    assert matcher.match("show disk usage", 'Darwin')[1]['command'] == 'df -h'
+
+def test_other_requests_fall_through():
+    """Anything that is not a whole known phrasing goes to the model"""
+    matcher = IntentMatcher()
+    for request in ["delete all files in home directory", "show disk usage of /var sorted by size",
+                    "list files and delete them", "format the hard drive", ""]:
+        assert matcher.match(request, 'Linux') is None, request
+
+def test_hits_are_counted_per_intent():
+    """Lookups, hits and per-intent counters are tracked"""
+    matcher = IntentMatcher()
+    matcher.match("show disk usage", 'Linux')
+    matcher.match("how much disk space do i have", 'Linux')
+    matcher.match("who am i", 'Linux')
+    matcher.match("compress my photos", 'Linux')
+    stats = matcher.stats()
+    assert stats['lookups'] == 4
+    assert stats['hits'] == 3
+    assert stats['misses'] == 1
+    assert stats['intents']['disk_usage'] == 2
+    assert stats['intents']['username'] == 1
+
+def test_templates_pass_the_safety_checks():
+    """Every template can be executed without manual intervention"""
+    for intent in INTENTS:
+        for command in intent['commands'].values():
+            assert check_command(command).safe, command
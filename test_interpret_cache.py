@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent SQLite interpretation cache
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+import interpret_cache
+from interpret_cache import InterpretationCache, make_cache_key
+
+USER_INFO = {'username': 'tester', 'home': '/home/tester'}
+
+class Clock:
+    """Stands in for the time module so entries get distinct, controllable timestamps"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        self.now += 1
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(interpret_cache, 'time', clock)
+    return clock
+
+def test_lru_eviction(clock):
+    """The least recently used entry is evicted once the cache is full"""
+    cache = InterpretationCache(':memory:', max_entries=2, ttl_seconds=0)
+    cache.put('a', {'command': 'ls'})
+    cache.put('b', {'command': 'df -h'})
+    assert cache.get('a') == {'command': 'ls'}
+    cache.put('c', {'command': 'free -h'})
+    assert cache.get('b') is None
+    assert cache.get('a') and cache.get('c')
+    assert cache.stats()['entries'] == 2
+
+def test_unrecorded_lookup(clock):
+    """A lookup with record=False is not counted but still keeps the entry recently used"""
+    cache = InterpretationCache(':memory:', max_entries=2, ttl_seconds=0)
+    cache.put('a', {'command': 'ls'})
+    cache.put('b', {'command': 'df -h'})
+    assert cache.get('a', record=False) == {'command': 'ls'}
+    assert cache.get('missing', record=False) is None
+    cache.put('c', {'command': 'free -h'})
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses']) == (0, 0)
+    assert cache.get('a') and cache.get('b') is None
+
+def test_ttl_expiry(clock):
+    """Entries older than the TTL are treated as misses and removed"""
+    cache = InterpretationCache(':memory:', ttl_seconds=60)
+    cache.put('a', {'command': 'ls'}, generation_seconds=2.5)
+    assert cache.get('a') == {'command': 'ls'}
+    clock.now += 120
+    assert cache.get('a') is None
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 0)
+    assert stats['saved_model_seconds'] == 2.5
+
+def test_key_includes_model_and_prompt_version():
+    """Changing the model or the prompt version never reuses an old answer"""
+    key = make_cache_key("List files", 'Linux', 'Ubuntu', USER_INFO, 'model-a', 1)
+    assert key == make_cache_key("  list   FILES? ", 'Linux', 'Ubuntu', USER_INFO, 'model-a', 1)
+    assert key != make_cache_key("List files", 'Linux', 'Ubuntu', USER_INFO, 'model-b', 1)
+    assert key != make_cache_key("List files", 'Linux', 'Ubuntu', USER_INFO, 'model-a', 2)
+
+def test_persists_across_instances(tmp_path):
+    """Entries written by one instance are read by the next one using the same file"""
+    path = str(tmp_path / 'cache' / 'interpretations.sqlite3')
+    InterpretationCache(path).put('a', {'command': 'ls'})
+    assert InterpretationCache(path).get('a') == {'command': 'ls'}
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for the incremental JSON extractor used on streamed model output
+"""
+
+import sys
+import os
+import json
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from json_extractor import StreamingJSONParser, extract_json_object
+
+RESPONSE = {
+    "command": "find . -name \"*.py\" | xargs grep -n '{TODO}'",
+    "requires_sudo": False,
+    "notes": "braces } and \\\" quotes inside strings",
+    "help": {
+        "description": "Search Python files",
+        "parameters": ["-name: match {pattern}"],
+        "examples": [],
+        "risks": [],
+        "alternatives": [{"nested": ["}"]}],
+        "related_commands": ["grep"],
+        "risk_score": 1
+    }
+}
+
+def feed_in_chunks(parser, text, size=3):
+    completed = []
+    for i in range(0, len(text), size):
+        completed.extend(parser.feed(text[i:i + size]))
+    return completed
+
+def test_fields_are_reported_as_they_complete():
+    """Members are reported in order, including nested help fields"""
+    parser = StreamingJSONParser()
+    completed = feed_in_chunks(parser, json.dumps(RESPONSE))
+    paths = [path for path, _ in completed]
+    assert paths[0] == ('command',)
+    assert ('help', 'risk_score') in paths
+    assert dict(completed)[('command',)] == RESPONSE['command']
+    assert parser.complete
+    assert parser.root == RESPONSE
+
+def test_command_is_reported_before_the_object_closes():
+    """The command is available as soon as its string closes"""
+    text = json.dumps(RESPONSE)
+    cut = text.index('"requires_sudo"')
+    parser = StreamingJSONParser()
+    assert parser.feed(text[:cut]) == [(('command',), RESPONSE['command'])]
+    assert not parser.complete
+
+def test_trailing_output_is_ignored_once_complete():
+    """Nothing after the closing brace is consumed"""
+    parser = StreamingJSONParser()
+    parser.feed(json.dumps(RESPONSE) + "\n\n{\"another\": 1}")
+    assert parser.root == RESPONSE
+
+def test_markdown_wrapped_output():
+    """JSON inside a markdown code fence is recovered"""
+    text = "Here you go:\n```json\n" + json.dumps(RESPONSE, indent=2) + "\n```\nHope this helps {!}"
+    assert extract_json_object(text) == RESPONSE
+
+def test_prose_with_braces_before_the_object():
+    """Balanced braces that are not JSON are skipped"""
+    text = "Use {curly} braces: " + json.dumps(RESPONSE)
+    assert extract_json_object(text) == RESPONSE
+
+def test_incomplete_object():
+    """A truncated object is not returned"""
+    assert extract_json_object(json.dumps(RESPONSE)[:-5]) is None
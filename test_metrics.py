@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-stage latency metrics
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import metrics
+import settings
+
+def test_span_records_durations():
+    """Spans and direct observations feed the stage summary"""
+    metrics.reset()
+    with metrics.span('test.stage'):
+        pass
+    for value in (0.001, 0.002, 0.003):
+        metrics.observe('test.stage', value)
+    summary = metrics.stage_summary()['test.stage']
+    assert summary['count'] == 4
+    assert summary['p50_ms'] <= summary['p95_ms'] <= summary['p99_ms'] == 3.0
+
+def test_prometheus_histogram_is_cumulative():
+    """Bucket counts are cumulative and end with +Inf, _sum and _count"""
+    metrics.reset()
+    metrics.observe('test.stage', 0.0004)
+    metrics.observe('test.stage', 0.02)
+    metrics.observe('test.stage', 120.0)
+    metrics.increment('shell_assist_interpretations_total', source='cache')
+    text = metrics.render_prometheus()
+    assert '# TYPE shell_assist_stage_seconds histogram' in text
+    assert 'shell_assist_stage_seconds_bucket{stage="test.stage",le="0.0005"} 1' in text
+    assert 'shell_assist_stage_seconds_bucket{stage="test.stage",le="0.025"} 2' in text
+    assert 'shell_assist_stage_seconds_bucket{stage="test.stage",le="60.0"} 2' in text
+    assert 'shell_assist_stage_seconds_bucket{stage="test.stage",le="+Inf"} 3' in text
+    assert 'shell_assist_stage_seconds_count{stage="test.stage"} 3' in text
+    assert 'shell_assist_interpretations_total{source="cache"} 1' in text
+
+def test_disabled_metrics_record_nothing(monkeypatch):
+    """Nothing is recorded when metrics are turned off"""
+    metrics.reset()
+    monkeypatch.setattr(settings, 'METRICS_ENABLED', False)
+    metrics.observe('test.stage', 0.1)
+    metrics.increment('shell_assist_interpretations_total', source='model')
+    assert metrics.stage_summary() == {}
+    assert metrics.render_prometheus() == '\n'
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests that run the model interface through the real ollama client against the mock server
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import ollama
+import pytest
+
+import ollama_client
+import settings
+import ollama_interface
+from mock_ollama import MockOllamaServer, CANNED_RESPONSE, EMBEDDING_DIM
+
+USER_INFO = {'username': 'tester', 'home': '/home/tester', 'folders': {'Documents': '/home/tester/Documents'}}
+
+@pytest.fixture
+def client(mock_ollama):
+    mock_ollama()
+    return ollama_client._client
+
+def test_interpret_command(client):
+    """A streamed answer is parsed and validated into a CommandOutput"""
+    output = ollama_interface.interpret_command("list my files", "Test Linux", USER_INFO, fast=False)
+    assert output.command == CANNED_RESPONSE['command']
+    assert output.help.description == CANNED_RESPONSE['help']['description']
+
+def test_fast_mode_schema(client):
+    """Fast mode asks for the summary schema and leaves the help for later"""
+    output = ollama_interface.interpret_command("list my files", "Test Linux", USER_INFO, fast=True)
+    assert output.command == CANNED_RESPONSE['command']
+    assert output.help.description == ""
+
+    command_help = ollama_interface.fetch_command_help(output.command, "Test Linux", USER_INFO)
+    assert command_help.parameters == CANNED_RESPONSE['help']['parameters']
+
+def test_embed_and_metadata(client):
+    """The embedding and metadata endpoints answer like Ollama"""
+    embeddings = client.embed('nomic-embed-text', ["show disk usage", "list files"])
+    assert len(embeddings) == 2
+    assert len(embeddings[0]) == EMBEDDING_DIM
+    models = ollama.Client(host=client.host).list().models
+    assert any(model.model == 'deepseek-coder:6.7b' for model in models)
+
+def test_normalized_stream_and_connection_reuse():
+    """Chunks are normalized and every request reuses one kept-alive connection"""
+    with MockOllamaServer() as server:
+        client = ollama_client.OllamaClient(server.url)
+        messages = [{'role': 'user', 'content': 'list files'}]
+        for _ in range(3):
+            chunks = list(client.chat('deepseek-coder:6.7b', messages, stream=True))
+            assert ''.join(chunk['content'] for chunk in chunks).startswith('{"command"')
+            assert chunks[-1]['done'] and chunks[-1]['prompt_eval_count'] is not None
+        response = client.chat('deepseek-coder:6.7b', messages)
+        assert response['done'] and response['content'].startswith('{"command"')
+        client.close()
+    assert server.connections == 1
+
+def test_stream_events_in_order(client):
+    """The command is streamed first, then the remaining fields, then the validated answer"""
+    events = list(ollama_interface.interpret_command_stream("list my files", "Test Linux", USER_INFO, fast=False))
+    names = [event for event, _ in events]
+    assert names[0] == 'command' and names[-1] == 'done'
+    assert set(names[1:-1]) == {'field'}
+    assert events[0][1]['command'] == CANNED_RESPONSE['command']
+    fields = {data['field'] for event, data in events if event == 'field'}
+    assert {'notes', 'help.description', 'help.risk_score'} <= fields
+    assert events[-1][1].help.risks == CANNED_RESPONSE['help']['risks']
+
+def test_help_on_demand_is_cached_per_command(mock_ollama, monkeypatch):
+    """fetch_command_help asks the model once per exact command string"""
+    import interpret_cache
+    server = mock_ollama()
+    monkeypatch.setattr(settings, 'CACHE_ENABLED', True)
+    monkeypatch.setattr(interpret_cache, '_cache', interpret_cache.InterpretationCache(':memory:'))
+    first = ollama_interface.fetch_command_help("ls -la", "Test Linux", USER_INFO)
+    requests = server.requests
+    assert ollama_interface.fetch_command_help("ls -la", "Test Linux", USER_INFO) == first
+    assert server.requests == requests
+    # Commands are not normalized like requests: a different spelling is a different command
+    ollama_interface.fetch_command_help("LS -la", "Test Linux", USER_INFO)
+    assert server.requests == requests + 1
+    # Help lookups do not count toward the interpretation hit rate
+    stats = interpret_cache._cache.stats()
+    assert (stats['hits'], stats['misses']) == (0, 0)
+
+def test_speculative_answer_is_stored_only_on_request(mock_ollama, monkeypatch):
+    """A speculative interpretation leaves the cache untouched until its store event is called"""
+    import interpret_cache
+    mock_ollama()
+    monkeypatch.setattr(settings, 'CACHE_ENABLED', True)
+    cache = interpret_cache.InterpretationCache(':memory:')
+    monkeypatch.setattr(interpret_cache, '_cache', cache)
+    events = list(ollama_interface.interpret_command_stream("list my fi", "Test Linux", USER_INFO,
+                                                            fast=False, speculative=True))
+    assert [event for event, _ in events][-2:] == ['store', 'done']
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (0, 0, 0)
+    events[-2][1]()
+    assert cache.stats()['entries'] == 1
+
+def test_prompt_eval_stats_recorded(client):
+    """The final chunk with Ollama's prompt counters is read even though the stream is cut early"""
+    before = ollama_interface.get_prompt_eval_stats()['requests']
+    ollama_interface.interpret_command("list my files", "Test Linux", USER_INFO, fast=False)
+    stats = ollama_interface.get_prompt_eval_stats()
+    assert stats['requests'] == before + 1
+    assert stats['last']['prompt_tokens'] > 0
+
+def test_warm_up_evaluates_prompt_prefix(mock_ollama, monkeypatch):
+    """After warm-up the first request neither loads the model nor re-evaluates the system prompt"""
+    server = mock_ollama(load_time=0.05)
+    monkeypatch.setattr(settings, 'FAST_MODE', False)
+    ollama_interface.warm_up("Test Linux", USER_INFO)
+    assert server.loaded
+    ollama_interface.interpret_command("list my files", "Test Linux", USER_INFO)
+    last = ollama_interface.get_prompt_eval_stats()['last']
+    # Only the user's request is left to evaluate
+    assert 0 < last['prompt_tokens'] < 20
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Tests for choosing between the small and large models
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import model_router
+import settings
+import ollama_interface
+from mock_ollama import CANNED_RESPONSE
+from model_router import ModelRouter, estimate_complexity
+from ollama_interface import CommandHelp, CommandOutput
+
+USER_INFO = {'username': 'tester', 'home': '/home/tester', 'folders': {}}
+
+def make_output(command, risk_score=0):
+    return CommandOutput(command=command, requires_sudo=False,
+                         help=CommandHelp(description="", risk_score=risk_score))
+
+def test_complexity():
+    """Short requests score low, multi-step requests and shell syntax score high"""
+    assert estimate_complexity("show disk usage") == 0
+    assert estimate_complexity("find python files larger than 1MB and then sort them by size") >= 3
+    assert estimate_complexity("grep 'TODO' in *.py | wc -l") >= 3
+
+def test_candidates():
+    """Simple requests try every model in order; complex ones go to the largest"""
+    router = ModelRouter(['small', 'large'], max_simple_score=1)
+    assert router.candidates("list files") == ['small', 'large']
+    assert router.candidates("delete every log file older than a week except today's") == ['large']
+
+def test_review():
+    """Placeholders, missing programs and risky commands are escalated"""
+    router = ModelRouter(['small', 'large'], max_risk=7)
+    assert router.review(make_output("ls -la")) is None
+    assert router.review(make_output("cat <file>")) == 'low_confidence'
+    assert router.review(make_output("definitely-not-a-program --help")) == 'low_confidence'
+    assert router.review(make_output("ls -la", risk_score=8)) == 'high_risk'
+
+def test_escalation_through_interface(mock_ollama, monkeypatch):
+    """An unsure answer from the small model is redone by the large model"""
+    server = mock_ollama(canned={**CANNED_RESPONSE, 'command': 'cat path/to/file'})
+    monkeypatch.setattr(settings, 'ROUTER_ENABLED', True)
+    monkeypatch.setattr(settings, 'ROUTER_SMALL_MODELS', ['small-model'])
+    monkeypatch.setattr(model_router, '_router', None)
+
+    events = list(ollama_interface.interpret_command_stream("show a file", "Test Linux", USER_INFO, fast=False))
+
+    assert server.requests == 2
+    assert [kind for kind, _ in events].count('command') == 1
+    assert events[-1][1].command == 'cat path/to/file'
+    stats = model_router.get_router_stats()['models']
+    assert stats['small-model']['reasons'] == {'low_confidence': 1}
+    assert stats[settings.OLLAMA_MODEL]['requests'] == 1
+    assert stats[settings.OLLAMA_MODEL]['escalations'] == 0
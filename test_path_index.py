@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests for the in-process $PATH executable index
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from path_index import PathIndex
+
+def make_executable(directory, name):
+    path = os.path.join(directory, name)
+    with open(path, 'w') as f:
+        f.write('#!/bin/sh\n')
+    os.chmod(path, 0o755)
+    return path
+
+def test_lookup_respects_path_order(tmp_path):
+    """The first $PATH directory containing a program wins"""
+    first, second = tmp_path / 'first', tmp_path / 'second'
+    first.mkdir()
+    second.mkdir()
+    expected = make_executable(str(first), 'tool')
+    make_executable(str(second), 'tool')
+    index = PathIndex(path=f"{first}{os.pathsep}{second}")
+    assert index.lookup('tool') == expected
+    assert not index.exists('missing')
+
+def test_new_executables_are_noticed(tmp_path):
+    """A directory mtime change rebuilds the index"""
+    index = PathIndex(path=str(tmp_path), check_interval=0)
+    assert not index.exists('fresh')
+    make_executable(str(tmp_path), 'fresh')
+    os.utime(tmp_path, ns=(0, 1))
+    assert index.exists('fresh')
+
+def test_non_executables_are_ignored(tmp_path):
+    """Plain files are not treated as programs"""
+    (tmp_path / 'notes.txt').write_text('hello')
+    index = PathIndex(path=str(tmp_path))
+    assert not index.exists('notes.txt')
+
+def test_suggest_close_matches(tmp_path):
+    """Misspelled programs get close matches"""
+    make_executable(str(tmp_path), 'grep')
+    make_executable(str(tmp_path), 'python3')
+    index = PathIndex(path=str(tmp_path))
+    assert index.suggest('gerp') == ['grep']
+    assert index.suggest('pythn3') == ['python3']
+
+def test_interpretation_looks_up_missing_programs_once(monkeypatch):
+    """The notes and the missing_programs field share one set of lookups"""
+    import command_executor
+    from ollama_interface import CommandOutput
+    from responses import format_interpretation
+    lookups = []
+    monkeypatch.setattr(command_executor, 'command_exists', lambda program: lookups.append(program) or False)
+    response = format_interpretation(CommandOutput(command="gerp x notes.txt", requires_sudo=False, notes="",
+                                                   help={"description": "Searches notes"}))
+    assert lookups == ['gerp']
+    assert 'gerp' in response['missing_programs']
+    assert "'gerp' is not installed" in response['notes']
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tests for the shell-aware command safety engine
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from safety_engine import check_command, tokenize, split_segments
+
+def test_tokenizer_splits_operators():
+    """Pipes, chains and redirections become separate tokens"""
+    assert tokenize("ls -la|grep x&&echo 'a b'>out") == ['ls', '-la', '|', 'grep', 'x', '&&', 'echo', 'a b', '>', 'out']
+    assert split_segments(tokenize("a | b && c; d")) == [['a'], ['b'], ['c'], ['d']]
+
+def test_safe_commands():
+    """Ordinary user-space commands are allowed"""
+    for command in ["ls -la", "df -h", "du -sh ~/* | sort -h", "find . -name '*.py' | xargs wc -l"]:
+        assert check_command(command).safe, command
+
+def test_every_pipeline_segment_is_checked():
+    """A dangerous command anywhere in a pipeline or chain is rejected"""
+    for command in ["ls | sudo rm x", "echo ok && rm -rf /", "true; mkfs.ext4 disk.img", "ls\nrm -rf /"]:
+        assert not check_command(command).safe, command
+
+def test_quoting_does_not_hide_dangerous_commands():
+    """Quotes and extra whitespace are normalized before the rules run"""
+    assert not check_command("rm  -rf   '/'").safe
+    assert not check_command('rm -rf "/"').safe
+
+def test_redirection_without_space():
+    """Redirections into protected paths are caught even without whitespace"""
+    assert not check_command("echo x >/etc/hosts").safe
+
+def test_redirection_to_standard_devices():
+    """Discarding output or reading from /dev/null is not a file access outside home"""
+    for command in ["find . -name '*.log' 2>/dev/null", "cp a b 2>/dev/null", "cmd </dev/null",
+                    "ls > /dev/null 2>&1", "make &>/dev/null", "echo err >/dev/stderr",
+                    "sh -c 'ls 2>/dev/null'"]:
+        assert check_command(command).safe, command
+    assert not check_command("cat /dev/sda >/dev/null").safe
+    assert not check_command("echo x >/dev/sda").safe
+
+def test_leading_assignments_are_not_file_accesses():
+    """VAR=/path before the program only sets its environment"""
+    assert check_command("PATH=/usr/bin ls").safe
+    assert check_command("LANG=C PATH=/usr/bin:/bin ls -la").safe
+    assert not check_command("PATH=/usr/bin cat /etc/hosts").safe
+    assert not check_command("ls --output=/etc/hosts").safe
+
+def test_command_substitution():
+    """Commands inside $(...) and backticks are checked too"""
+    assert not check_command("echo $(rm -rf /)").safe
+    assert not check_command("echo `mkfs.ext4 disk.img`").safe
+
+def test_paths_outside_home():
+    """Absolute paths outside the home directory are rejected, including key=/path"""
+    assert not check_command("cat /etc/hosts").safe
+    assert not check_command("tool --output=/etc/hosts").safe
+
+def test_unparseable_commands_are_rejected():
+    """Commands with unbalanced quotes cannot be reasoned about"""
+    verdict = check_command('echo "unterminated')
+    assert not verdict.safe
+    assert 'parsed' in verdict.reason
+
+def test_scripts_passed_to_shells_and_ssh():
+    """Paths inside sh -c, bash -c and ssh remote commands are checked"""
+    for command in ["sh -c 'cat /etc/shadow'", 'bash -c "rm -f /etc/hosts"', 'ssh host "ls /var/log"']:
+        assert not check_command(command).safe, command
+    assert not check_command("bash -lc 'ls; rm -rf /'").safe
+    assert check_command("bash -c 'ls ~ && echo done'").safe
+
+def test_path_checks_are_not_memoized(tmp_path, monkeypatch):
+    """A symlink that is repointed outside the home directory is noticed"""
+    monkeypatch.setenv('HOME', str(tmp_path))
+    (tmp_path / 'docs').mkdir()
+    link = tmp_path / 'current'
+    link.symlink_to(tmp_path / 'docs')
+    command = f"cat {link}/notes.txt"
+    assert check_command(command).safe
+    link.unlink()
+    link.symlink_to('/etc')
+    assert not check_command(command).safe
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tests for resource-limited command execution
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import settings
+from command_executor import execute_command_stream
+from sandbox import run_sandboxed
+
+LIMITS = {'cpu_seconds': 1, 'memory_bytes': 0, 'open_files': 64, 'file_bytes': 1024 * 1024}
+
+def run(command, timeout=10, max_output_bytes=4 * 1024 * 1024, limits=LIMITS):
+    events = list(run_sandboxed(command, os.getcwd(), dict(os.environ), timeout, max_output_bytes, limits))
+    stdout = ''.join(data for event, data in events if event == 'stdout')
+    stderr = ''.join(data for event, data in events if event == 'stderr')
+    return stdout, stderr, events[-1][1]
+
+def test_output_and_usage():
+    """Output is streamed back and the exit event carries the run's resource usage"""
+    stdout, stderr, result = run("echo out; echo err >&2; ulimit -n; exit 3")
+    assert stdout == "out\n64\n"
+    assert stderr == "err\n"
+    assert result['returncode'] == 3 and result['limit_exceeded'] is None
+    assert result['rusage']['max_rss_kb'] > 0
+
+def test_cpu_and_file_limits():
+    """A busy loop is stopped by the CPU limit and runaway output by the file size limit"""
+    started = time.monotonic()
+    _, _, result = run("while :; do :; done")
+    assert time.monotonic() - started < 5
+    assert result['limit_exceeded'] == 'cpu_seconds'
+
+    stdout, _, result = run("yes")
+    assert result['limit_exceeded'] == 'file_bytes'
+    assert len(stdout) <= LIMITS['file_bytes'] and not result['truncated']
+
+def test_truncation_stops_command():
+    """Once the output cap is reached the command is killed instead of running to the timeout"""
+    started = time.monotonic()
+    stdout, stderr, result = run("yes", timeout=5, max_output_bytes=1000)
+    assert time.monotonic() - started < 2
+    assert len(stdout) == 1000 and result['truncated']
+    assert stderr.endswith("[output truncated after 1000 bytes]\n")
+
+def test_limits_set_by_shell():
+    """Soft and hard limits are in place for the command, with one spare CPU second"""
+    stdout, _, _ = run("grep -E 'cpu time|file size|open files' /proc/self/limits")
+    limits = {line[:26].strip(): line[26:].split()[:2] for line in stdout.splitlines()}
+    assert limits['Max cpu time'] == ['1', '2']
+    assert limits['Max file size'] == [str(LIMITS['file_bytes'])] * 2
+    assert limits['Max open files'] == ['64', '64']
+
+def test_timeout_kills_process_group():
+    """A timed out command is killed together with the processes it started"""
+    started = time.monotonic()
+    stdout, _, result = run("sleep 30 & echo $!; wait", timeout=0.5)
+    assert time.monotonic() - started < 5
+    assert result['timed_out'] and result['limit_exceeded'] == 'timeout'
+    child = int(stdout.split()[0])
+    time.sleep(0.1)
+    assert not os.path.exists(f"/proc/{child}") or open(f"/proc/{child}/stat").read().split()[2] == 'Z'
+
+def test_executor_uses_sandbox(monkeypatch):
+    """execute_command_stream runs through the sandbox when it is enabled"""
+    monkeypatch.setattr(settings, 'SANDBOX_ENABLED', True)
+    user_info = {'username': 'tester', 'home': os.getcwd(), 'folders': {}}
+    events = list(execute_command_stream("echo hello", user_info, timeout=5))
+    assert events[0] == ('stdout', "hello\n")
+    assert events[-1][0] == 'exit' and 'rusage' in events[-1][1]
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for the semantic cache, using a deterministic stub embedder instead of a live model
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from semantic_cache import SemanticCache, literal_tokens
+
+# Fixed vectors standing in for an embedding model: paraphrases point the same way
+VECTORS = {
+    "show disk usage": [1.0, 0.0, 0.0],
+    "how much disk space do i have": [0.97, 0.24, 0.0],
+    "list files": [0.0, 1.0, 0.0],
+    "delete notes1.txt": [0.0, 0.0, 1.0],
+    "delete notes2.txt": [0.0, 0.0, 1.0],
+}
+
+def stub_embedder(text):
+    return VECTORS[text]
+
+DISK = {'command': 'df -h'}
+
+def make_cache(tmp_path, **kwargs):
+    return SemanticCache(str(tmp_path / 'semantic.bin'), stub_embedder, threshold=0.9, **kwargs)
+
+def store(cache, request, value, context='linux'):
+    cache.add(cache.embed(request), context, request, value)
+
+def lookup(cache, request, context='linux'):
+    return cache.search(cache.embed(request), context, request)
+
+def test_paraphrase_hits(tmp_path):
+    """A paraphrase above the threshold returns the stored answer"""
+    cache = make_cache(tmp_path)
+    store(cache, "show disk usage", DISK)
+    value, similarity = lookup(cache, "How much disk space do I have?")
+    assert value == DISK
+    assert similarity > 0.9
+    assert lookup(cache, "list files") is None
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+def test_context_is_respected(tmp_path):
+    """Answers for another platform or user are never returned"""
+    cache = make_cache(tmp_path)
+    store(cache, "show disk usage", DISK, context='darwin')
+    assert lookup(cache, "show disk usage", context='linux') is None
+
+def test_specific_tokens_must_match(tmp_path):
+    """Requests naming different files do not share an answer"""
+    cache = make_cache(tmp_path)
+    store(cache, "delete notes1.txt", {'command': 'rm notes1.txt'})
+    assert lookup(cache, "delete notes2.txt") is None
+    assert lookup(cache, "delete notes1.txt")[0] == {'command': 'rm notes1.txt'}
+    assert literal_tokens("copy ~/a.txt to 'my dir'") == ["'my dir'", "~/a.txt"]
+
+def test_index_is_persisted(tmp_path):
+    """Entries survive a restart once flushed"""
+    cache = make_cache(tmp_path)
+    store(cache, "show disk usage", DISK)
+    cache.flush()
+    reloaded = make_cache(tmp_path)
+    assert reloaded.stats()['entries'] == 1
+    assert lookup(reloaded, "how much disk space do i have")[0] == DISK
+
+def test_oldest_entries_are_evicted(tmp_path):
+    """The index never grows beyond max_entries"""
+    cache = make_cache(tmp_path, max_entries=2)
+    store(cache, "show disk usage", DISK)
+    store(cache, "list files", {'command': 'ls -la'})
+    store(cache, "delete notes1.txt", {'command': 'rm notes1.txt'})
+    assert cache.stats()['entries'] == 2
+    assert lookup(cache, "show disk usage") is None
+    assert lookup(cache, "list files")[0] == {'command': 'ls -la'}
+
+def test_additions_are_saved_in_the_background(tmp_path):
+    """add() does not write the index itself; one background save covers a burst of additions"""
+    cache = make_cache(tmp_path, flush_delay=0.2)
+    store(cache, "show disk usage", DISK)
+    store(cache, "list files", {'command': 'ls -la'})
+    assert not (tmp_path / 'semantic.bin').exists()
+    deadline = time.monotonic() + 5
+    while not (tmp_path / 'semantic.bin').exists() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert make_cache(tmp_path).stats()['entries'] == 2
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Tests for coalescing identical in-flight interpretations
+"""
+
+import sys
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+import singleflight
+import ollama_interface
+from singleflight import SingleFlight
+
+USER_INFO = {'username': 'tester', 'home': '/home/tester', 'folders': {}}
+
+def blocking_stream(started, release, calls, fail=False):
+    def make():
+        calls.append(1)
+        started.set()
+        yield 'command', {'command': 'ls', 'elapsed': 0.0}
+        release.wait(5)
+        if fail:
+            raise ValueError("model failed")
+        yield 'done', 'answer'
+    return make
+
+def test_identical_requests_share_one_generation():
+    """Requests joining an in-flight stream get its events without a second generation"""
+    single_flight = SingleFlight()
+    started, release, calls = threading.Event(), threading.Event(), []
+    make = blocking_stream(started, release, calls)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        leader = pool.submit(lambda: list(single_flight.stream('key', make)))
+        started.wait(5)
+        followers = [single_flight.stream('key', make) for _ in range(3)]
+        # Each follower has joined once it has replayed the first event
+        firsts = [next(follower) for follower in followers]
+        release.set()
+        results = [leader.result()] + [[first] + list(follower) for first, follower in zip(firsts, followers)]
+    assert len(calls) == 1
+    assert all(result[-1] == ('done', 'answer') for result in results)
+    assert single_flight.stats()['saved_generations'] == 3
+    assert single_flight.stats()['in_flight'] == 0
+
+def test_errors_are_shared():
+    """A failed generation fails every request that shared it"""
+    single_flight = SingleFlight()
+    started, release, calls = threading.Event(), threading.Event(), []
+    make = blocking_stream(started, release, calls, fail=True)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        leader = pool.submit(lambda: list(single_flight.stream('key', make)))
+        started.wait(5)
+        follower = single_flight.stream('key', make)
+        next(follower)
+        release.set()
+        with pytest.raises(ValueError):
+            leader.result()
+        with pytest.raises(ValueError):
+            list(follower)
+    assert len(calls) == 1
+
+def test_abandoned_leader():
+    """When the first caller stops early, waiting callers run their own generation without repeating events"""
+    single_flight = SingleFlight()
+    started, release, calls = threading.Event(), threading.Event(), []
+    make = blocking_stream(started, release, calls)
+    leader = single_flight.stream('key', make)
+    next(leader)
+    follower = single_flight.stream('key', make)
+    events = [next(follower)]
+    leader.close()
+    release.set()
+    events.extend(follower)
+    assert events == [('command', {'command': 'ls', 'elapsed': 0.0}), ('done', 'answer')]
+    assert len(calls) == 2
+
+def test_abandoned_leader_retry_differs():
+    """A retry that streams other events in another order fills in only what the follower has not seen"""
+    single_flight = SingleFlight()
+    release = threading.Event()
+    runs = []
+
+    def make():
+        runs.append(1)
+        if len(runs) == 1:
+            yield 'command', {'command': 'ls', 'elapsed': 0.0}
+            yield 'field', {'field': 'notes', 'value': 'first'}
+            release.wait(5)
+            yield 'done', 'first answer'
+        else:
+            # Like a cache hit replaying every field of a different answer
+            yield 'field', {'field': 'help.description', 'value': 'second'}
+            yield 'field', {'field': 'notes', 'value': 'second'}
+            yield 'command', {'command': 'ls -a', 'elapsed': 0.0}
+            yield 'field', {'field': 'requires_sudo', 'value': False}
+            yield 'done', 'second answer'
+
+    leader = single_flight.stream('key', make)
+    next(leader)
+    next(leader)
+    follower = single_flight.stream('key', make)
+    events = [next(follower), next(follower)]
+    leader.close()
+    release.set()
+    events.extend(follower)
+    assert events == [
+        ('command', {'command': 'ls', 'elapsed': 0.0}),
+        ('field', {'field': 'notes', 'value': 'first'}),
+        ('field', {'field': 'help.description', 'value': 'second'}),
+        ('field', {'field': 'requires_sudo', 'value': False}),
+        ('done', 'second answer'),
+    ]
+
+def test_concurrent_interpretations(mock_ollama, monkeypatch):
+    """Concurrent identical requests reach the model once"""
+    server = mock_ollama(latency=0.3)
+    monkeypatch.setattr(singleflight, '_single_flight', None)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        outputs = list(pool.map(lambda text: ollama_interface.interpret_command(text, "Test Linux", USER_INFO, False),
+                                ["list my files", "List my files", "list my files?", "list my files"]))
+    assert server.requests == 1
+    assert len({output.command for output in outputs}) == 1
+    assert singleflight.get_single_flight_stats()['saved_generations'] == 3
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Tests for interpreting requests while they are being typed
+"""
+
+import sys
+import os
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from speculation import SpeculativeInterpreter
+
+class FakeModel:
+    """Stands in for interpret_command_stream; generations block until released"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.calls = []
+        self.closed = []
+        self.stored = []
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, user_input, distro_info, user_info, fast, speculative=False):
+        assert speculative
+        self.calls.append(user_input)
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            yield 'command', {'command': f"echo {user_input}", 'elapsed': 0.0}
+            self.release.wait(5)
+            yield 'store', lambda: self.stored.append(user_input)
+            yield 'done', f"answer for {user_input}"
+        finally:
+            with self._lock:
+                self.running -= 1
+            self.closed.append(user_input)
+
+def wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+def test_reused_when_submitted_text_matches():
+    """A submit of the same text waits for and returns the speculative answer"""
+    model = FakeModel()
+    interpreter = SpeculativeInterpreter(model, max_concurrent=2)
+    assert interpreter.speculate('s1', "show disk usage", {}, {}, False) == 'started'
+    assert interpreter.speculate('s1', "Show disk usage ", {}, {}, False) == 'running'
+    model.release.set()
+    assert interpreter.take('s1', "show disk usage", False, timeout=5) == "answer for show disk usage"
+    assert model.calls == ["show disk usage"]
+    assert interpreter.stats()['hits'] == 1
+
+def test_newer_input_cancels_older():
+    """Typing more cancels the in-flight speculation for the shorter text"""
+    model = FakeModel()
+    interpreter = SpeculativeInterpreter(model, max_concurrent=2)
+    interpreter.speculate('s1', "show disk", {}, {}, False)
+    interpreter.speculate('s1', "show disk usage", {}, {}, False)
+    model.release.set()
+    assert interpreter.take('s1', "show disk usage", False, timeout=5) == "answer for show disk usage"
+    assert wait_for(lambda: "show disk" in model.closed)
+    assert interpreter.stats()['cancelled'] == 1
+
+def test_cancelled_generations_count_toward_cap():
+    """Fast typing never runs more generations at once than the cap, cancelled ones included"""
+    model = FakeModel()
+    interpreter = SpeculativeInterpreter(model, max_concurrent=2)
+    text = "show disk usage"
+    statuses = [interpreter.speculate('s1', text[:length], {}, {}, False) for length in range(5, 15)]
+    assert statuses[:2] == ['started', 'started']
+    assert set(statuses[2:]) == {'busy'}
+    assert wait_for(lambda: model.running == 2)
+    model.release.set()
+    assert wait_for(lambda: model.running == 0)
+    assert model.peak == 2
+    assert interpreter.speculate('s1', text, {}, {}, False) == 'started'
+
+def test_concurrency_cap():
+    """Speculations beyond the cap are dropped instead of queued"""
+    model = FakeModel()
+    interpreter = SpeculativeInterpreter(model, max_concurrent=1)
+    assert interpreter.speculate('s1', "list files", {}, {}, False) == 'started'
+    assert interpreter.speculate('s2', "list processes", {}, {}, False) == 'busy'
+    model.release.set()
+    assert interpreter.take('s2', "list processes", False) is None
+
+def test_mismatch_is_not_reused():
+    """A submit of different text ignores the speculation"""
+    model = FakeModel()
+    model.release.set()
+    interpreter = SpeculativeInterpreter(model, max_concurrent=2)
+    interpreter.speculate('s1', "list files", {}, {}, False)
+    assert interpreter.take('s1', "list all files", False) is None
+    assert interpreter.take('s1', "list files", False) is None
+    assert interpreter.stats()['misses'] == 1
+
+def test_take_gives_up_after_wait():
+    """A speculation that does not finish in time is cancelled so the request is interpreted normally"""
+    model = FakeModel()
+    interpreter = SpeculativeInterpreter(model, max_concurrent=1, wait=0.1)
+    interpreter.speculate('s1', "list files", {}, {}, False)
+    started = time.monotonic()
+    assert interpreter.take('s1', "list files", False) is None
+    assert time.monotonic() - started < 2
+    model.release.set()
+    # The abandoned generation stops at its next event and gives back its slot
+    assert wait_for(lambda: "list files" in model.closed)
+    assert model.stored == []
+    deadline = time.monotonic() + 2
+    while interpreter.speculate('s2', "list processes", {}, {}, False) == 'busy' and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert interpreter.stats()['started'] == 2
+
+def test_answer_stored_only_when_taken():
+    """Only a speculation that a submit uses is written to the caches"""
+    model = FakeModel()
+    model.release.set()
+    interpreter = SpeculativeInterpreter(model, max_concurrent=2)
+    interpreter.speculate('s1', "list fi", {}, {}, False)
+    interpreter.speculate('s2', "list files", {}, {}, False)
+    assert wait_for(lambda: len(model.closed) == 2)
+    assert model.stored == []
+    assert interpreter.take('s1', "list files and folders", False) is None
+    assert interpreter.take('s2', "list files", False) == "answer for list files"
+    assert model.stored == ["list files"]
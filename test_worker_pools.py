@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for the bounded worker pools
+"""
+
+import sys
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from worker_pools import run_in_pool, stream_in_pool
+
+def test_pool_bounds_concurrency():
+    """No more calls run at once than the pool has workers"""
+    pool = ThreadPoolExecutor(max_workers=2)
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    def work(i):
+        with lock:
+            running.append(i)
+            peak.append(len(running))
+        threading.Event().wait(0.02)
+        with lock:
+            running.remove(i)
+        return i
+
+    with ThreadPoolExecutor(max_workers=6) as callers:
+        results = list(callers.map(lambda i: run_in_pool(pool, work, i), range(6)))
+    pool.shutdown()
+    assert results == list(range(6))
+    assert max(peak) == 2
+
+def test_stream_stops_when_consumer_goes_away():
+    """The worker closes the generator instead of running it to completion"""
+    pool = ThreadPoolExecutor(max_workers=1)
+    produced = []
+    closed = threading.Event()
+
+    def numbers():
+        try:
+            for i in range(1000):
+                produced.append(i)
+                yield i
+                # Like a model producing tokens
+                threading.Event().wait(0.005)
+        finally:
+            closed.set()
+
+    stream = stream_in_pool(pool, numbers)
+    assert next(stream) == 0
+    stream.close()
+    assert closed.wait(2)
+    pool.shutdown()
+    assert len(produced) < 10
+
+def test_stream_reraises_errors():
+    """An exception in the generator surfaces in the consuming thread"""
+    pool = ThreadPoolExecutor(max_workers=1)
+
+    def failing():
+        yield 1
+        raise ValueError("model went away")
+
+    stream = stream_in_pool(pool, failing)
+    assert next(stream) == 1
+    with pytest.raises(ValueError, match="model went away"):
+        next(stream)
+    pool.shutdown()
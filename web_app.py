@@ -0,0 +1,206 @@
+from flask import Flask, request, render_template, jsonify, Response, stream_with_context, g
+import json
+import time
+
+# Import our custom modules
+from command_executor import execute_command, execute_command_stream, is_safe_command
+from ollama_interface import interpret_command, interpret_command_stream, fetch_command_help
+from interpret_cache import get_cache_stats
+from semantic_cache import get_semantic_cache_stats
+from singleflight import get_single_flight_stats
+from intent_matcher import get_intent_stats
+from model_router import get_router_stats
+from ollama_client import get_backend_stats
+from speculation import get_speculative_interpreter, get_speculation_stats
+from batch import interpret_batch
+from responses import format_interpretation, format_error, format_help, sse_event, format_batch_item
+from system_context import get_system_context
+from worker_pools import get_interpret_pool, get_execute_pool, run_in_pool, stream_in_pool
+import metrics
+import settings
+
+app = Flask(__name__)
+
+@app.before_request
+def start_timer():
+    g.started = time.perf_counter()
+
+@app.after_request
+def record_request_time(response):
+    # For streamed responses this is the time until the response started
+    if request.endpoint and 'started' in g:
+        metrics.observe(request.endpoint, time.perf_counter() - g.started,
+                        metric='shell_assist_http_request_seconds', label='endpoint')
+    return response
+
+@app.route('/')
+def index():
+    return render_template('index.html')
+
+def take_speculation(session, user_input, fast):
+    """Return the session's speculative interpretation if it was for this input"""
+    interpreter = get_speculative_interpreter()
+    if not session or interpreter is None:
+        return None
+    return interpreter.take(session, user_input, fast)
+
+@app.route('/interpret', methods=['POST'])
+def interpret():
+    user_input = request.json.get('command', '')
+    fast = request.json.get('fast')
+    print(f"User input (interpret): {user_input}")
+    distro_info, user_info = get_system_context()
+    try:
+        command_output = take_speculation(request.json.get('session'), user_input, fast)
+        if command_output is None:
+            command_output = run_in_pool(get_interpret_pool(), interpret_command,
+                                         user_input, distro_info, user_info, fast)
+        result = format_interpretation(command_output)
+        print(f"Interpreted command: {result['interpreted_command']}")
+        print(f"Notes: {result['notes']}")
+        return jsonify(result)
+    except Exception as e:
+        return jsonify(format_error(e)), 400
+
+@app.route('/interpret/stream', methods=['POST'])
+def interpret_stream():
+    """Server-sent events variant of /interpret that emits fields as the model generates them"""
+    user_input = request.json.get('command', '')
+    fast = request.json.get('fast')
+    session = request.json.get('session')
+    print(f"User input (interpret/stream): {user_input}")
+    distro_info, user_info = get_system_context()
+
+    def generate():
+        try:
+            speculated = take_speculation(session, user_input, fast)
+            if speculated is not None:
+                print(f"Interpreted command: {speculated.command} (speculative)")
+                yield sse_event('command', {'command': speculated.command, 'elapsed': 0.0})
+                yield sse_event('done', format_interpretation(speculated))
+                return
+            events = stream_in_pool(get_interpret_pool(),
+                                    lambda: interpret_command_stream(user_input, distro_info, user_info, fast))
+            for event, data in events:
+                if event == 'command':
+                    print(f"Interpreted command: {data['command']} (after {data['elapsed']:.2f}s)")
+                    yield sse_event('command', data)
+                elif event == 'field':
+                    yield sse_event('field', data)
+                elif event == 'done':
+                    yield sse_event('done', format_interpretation(data))
+        except Exception as e:
+            yield sse_event('error', format_error(e))
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/interpret/speculate', methods=['POST'])
+def interpret_speculate():
+    """Start interpreting partially typed input; a later submit of the same text reuses the result"""
+    session = request.json.get('session')
+    user_input = request.json.get('command', '')
+    if not session or not user_input.strip():
+        return jsonify({'error': "'session' and 'command' are required"}), 400
+    interpreter = get_speculative_interpreter()
+    if interpreter is None:
+        return jsonify({'status': 'disabled'})
+    distro_info, user_info = get_system_context()
+    status = interpreter.speculate(session, user_input, distro_info, user_info, request.json.get('fast'))
+    return jsonify({'status': status}), 202 if status == 'started' else 200
+
+@app.route('/interpret/speculate/stats', methods=['GET'])
+def speculation_stats():
+    return jsonify(get_speculation_stats())
+
+@app.route('/help', methods=['POST'])
+def command_help():
+    """Generate the detailed help for a command, e.g. one interpreted in fast mode"""
+    shell_command = request.json.get('command', '')
+    if not shell_command.strip():
+        return jsonify({'error': "'command' is required"}), 400
+    print(f"User input (help): {shell_command}")
+    distro_info, user_info = get_system_context()
+    try:
+        help_output = run_in_pool(get_interpret_pool(), fetch_command_help,
+                                  shell_command, distro_info, user_info)
+        return jsonify({'command': shell_command, 'help': format_help(help_output)})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/interpret/batch', methods=['POST'])
+def interpret_batch_route():
+    """Interpret a list of requests, streaming NDJSON results in input order as they finish"""
+    requests = request.json.get('commands', [])
+    if not isinstance(requests, list) or not all(isinstance(r, str) for r in requests):
+        return jsonify({'error': "'commands' must be a list of strings"}), 400
+    if len(requests) > settings.BATCH_MAX_ITEMS:
+        return jsonify({'error': f"Batches are limited to {settings.BATCH_MAX_ITEMS} requests"}), 400
+    print(f"User input (interpret/batch): {len(requests)} requests")
+    distro_info, user_info = get_system_context()
+
+    def generate():
+        results = interpret_batch(requests, interpret_command, distro_info, user_info, get_interpret_pool())
+        for index, user_input, command_output, error in results:
+            yield json.dumps(format_batch_item(index, user_input, command_output, error)) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/execute', methods=['POST'])
+def execute():
+    shell_command = request.json.get('command', '')
+    print(f"User input (execute): {shell_command}")
+    user_info = get_system_context()[1]
+    # Check if command is safe and execute
+    if not is_safe_command(shell_command):
+        result = "This command requires manual intervention for safety reasons."
+    else:
+        result = run_in_pool(get_execute_pool(), execute_command, shell_command, user_info, checked=True)
+    return jsonify({
+        'interpreted_command': shell_command,
+        'result': result
+    })
+
+@app.route('/execute/stream', methods=['POST'])
+def execute_stream():
+    """Server-sent events variant of /execute that emits output as the command produces it"""
+    shell_command = request.json.get('command', '')
+    print(f"User input (execute/stream): {shell_command}")
+    user_info = get_system_context()[1]
+
+    def generate():
+        if not is_safe_command(shell_command):
+            yield sse_event('error', {'message': "This command requires manual intervention for safety reasons."})
+            return
+        try:
+            events = stream_in_pool(get_execute_pool(),
+                                    lambda: execute_command_stream(shell_command, user_info))
+            for event, data in events:
+                yield sse_event(event, data)
+        except Exception as e:
+            yield sse_event('error', {'message': f"Error executing command: {str(e)}"})
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify({**get_cache_stats(), 'semantic': get_semantic_cache_stats(),
+                    'coalescing': get_single_flight_stats()})
+
+@app.route('/intents/stats', methods=['GET'])
+def intent_stats():
+    return jsonify(get_intent_stats())
+
+@app.route('/backends/stats', methods=['GET'])
+def backend_stats():
+    return jsonify(get_backend_stats())
+
+@app.route('/router/stats', methods=['GET'])
+def router_stats():
+    return jsonify(get_router_stats())
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,81 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import settings
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+_DONE = object()
+
+
+def _get_pool(name, max_workers):
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"shell-assist-{name}")
+            _pools[name] = pool
+        return pool
+
+
+def get_interpret_pool():
+    """Pool that bounds how many Ollama generations run at once"""
+    return _get_pool('interpret', settings.INTERPRET_WORKERS)
+
+
+def get_execute_pool():
+    """Pool that bounds how many shell commands run at once"""
+    return _get_pool('execute', settings.EXECUTE_WORKERS)
+
+
+def run_in_pool(pool, func, *args, **kwargs):
+    """Run func on the pool and wait for its result"""
+    return pool.submit(func, *args, **kwargs).result()
+
+
+def stream_in_pool(pool, make_generator):
+    """
+    Drive a generator on a pool worker and yield its items in the calling thread.
+
+    Exceptions raised by the generator are re-raised here. If the caller stops
+    consuming (e.g. the HTTP client disconnects), the worker closes the generator
+    at its next item instead of running it to completion.
+    """
+    items = queue.Queue()
+    cancelled = threading.Event()
+
+    def drive():
+        generator = make_generator()
+        try:
+            for item in generator:
+                if cancelled.is_set():
+                    break
+                items.put((item, None))
+        except BaseException as e:
+            items.put((_DONE, e))
+            return
+        finally:
+            generator.close()
+        items.put((_DONE, None))
+
+    pool.submit(drive)
+    try:
+        while True:
+            item, error = items.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        cancelled.set()
+
+
+def shutdown_pools(wait=True):
+    """Shut down every pool, e.g. when the server exits"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=wait)